@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from datetime import date
 from typing import List
 
 
@@ -19,6 +20,34 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     use_mock_prices: bool = False  # Set to True to use mock prices instead of Yahoo Finance
 
+    # Price provider: "yfinance", or "simulated" for deterministic offline prices (benchmarks, load tests)
+    price_provider: str = "yfinance"
+    sim_seed: int = 42  # Same seed, same prices
+    sim_start_date: date = date(2015, 1, 1)  # First simulated trading day
+    sim_correlation: float = 0.5  # Return correlation within a market (half of it across markets)
+    sim_latency_ms: int = 0  # Added to every simulated provider call
+    sim_latency_jitter_ms: int = 0  # Plus up to this much, drawn from the seeded stream
+    sim_failure_rate: float = 0.0  # Fraction of provider calls that raise
+
+    # Imports
+    import_max_workers: int = 4  # Process pool size for parsing multi-file uploads
+
+    # Ledger sync (derived data recomputed for holdings/dates touched by transaction writes)
+    ledger_sync_seconds: int = 300  # Poll for leftover changes; 0 disables the poll
+
+    # Live updates (Server-Sent Events)
+    stream_refresh_seconds: int = 60  # How often prices/summaries are recomputed while clients are connected
+    stream_keepalive_seconds: int = 15
+
+    # Exchange rates (fetched in the background; request handlers only read stored rates)
+    fx_api_url: str = "https://api.exchangerate-api.com/v4/latest/{base}"  # Must return {"rates": {...}}
+    fx_base_currencies: str = "CAD,USD,INR"  # One API call per base fetches all of its pairs
+    fx_refresh_minutes: int = 360  # 0 disables the refresher
+
+    # Daily briefing (generated per region after its market closes, then served from storage)
+    briefing_schedule_enabled: bool = True
+    briefing_delay_minutes: int = 15  # Wait after the close so closing prices have settled
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -48,4 +48,20 @@ def get_db():
 
 # Initialize database tables
 def init_db():
+    # Imported here: the service (and its model) import this module
+    from .services.data_version_service import DataVersionService
+    from .services.holding_recompute_service import HoldingRecomputeService
+
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes declared after a table was created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Triggers that bump data versions on writes (ETags for conditional GETs)
+    DataVersionService.install(engine)
+    # Holdings given transactions before opening positions were recorded
+    db = SessionLocal()
+    try:
+        HoldingRecomputeService.backfill_openings(db)
+    finally:
+        db.close()
@@ -1,12 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .database import init_db, SessionLocal
-from .routers import holdings, transactions, prices, analytics, snapshots, imports
+from .database import init_db, SessionLocal, engine
+from .routers import holdings, transactions, prices, analytics, snapshots, imports, stream
 from .services.snapshot_service import SnapshotService
 from .services.price_service import PriceService
+from .services.fx_refresh_service import FxRefreshService
+from .services.briefing_service import BriefingService
+from .services.ledger_sync_service import LedgerSyncService
+from .services.import_service import ImportService
 from .models.holding import Holding
 from .models.price import CurrentPriceCache
+from .utils.responses import FastJSONResponse
+from .utils.http_client import SharedHttpClient
+from .utils.metrics import MetricsMiddleware, instrument_engine, render_metrics
 import logging
 import asyncio
 from datetime import datetime
@@ -33,7 +40,8 @@ app = FastAPI(
     title="Portfolio Tracker API",
     description="API for tracking Canadian and Indian stock investments",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -45,6 +53,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and per-request query counts for /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
 # Include routers
 app.include_router(holdings.router, prefix="/api/v1")
 app.include_router(transactions.router, prefix="/api/v1")
@@ -52,6 +64,7 @@ app.include_router(prices.router, prefix="/api/v1")
 app.include_router(analytics.router, prefix="/api/v1")
 app.include_router(snapshots.router, prefix="/api/v1")
 app.include_router(imports.router, prefix="/api/v1")
+app.include_router(stream.router, prefix="/api/v1")
 
 
 def save_prices_to_cache(db, holdings, prices):
@@ -100,6 +113,12 @@ async def load_initial_data():
 
     db = SessionLocal()
     try:
+        # Fill region totals for snapshots taken before they were stored
+        try:
+            SnapshotService.rebuild_region_values(db)
+        except Exception as e:
+            logger.warning(f"Could not rebuild region values: {e}")
+
         holdings = db.query(Holding).filter(Holding.is_active == True).all()
         holdings_count = len(holdings)
         app_state.holdings_count = holdings_count
@@ -173,6 +192,25 @@ async def startup_event():
     # Start background task to load initial data (non-blocking)
     asyncio.create_task(load_initial_data())
 
+    # Keep stored exchange rates current so requests never fetch them
+    FxRefreshService.start()
+
+    # Generate each region's daily briefing once its market has closed
+    BriefingService.start()
+
+    # Catch up derived data for transaction changes not yet synced
+    LedgerSyncService.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, close outbound HTTP clients and the import parse pool"""
+    await FxRefreshService.stop()
+    await BriefingService.stop()
+    await LedgerSyncService.stop()
+    await SharedHttpClient.close_all()
+    ImportService.shutdown_parse_pool()
+
 
 @app.get("/")
 async def root():
@@ -184,6 +222,13 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/api/v1/health")
 async def health_check():
     """Health check endpoint"""
@@ -206,5 +251,10 @@ async def app_status():
         "loading_started_at": app_state.loading_started_at.isoformat() if app_state.loading_started_at else None,
         "loading_completed_at": app_state.loading_completed_at.isoformat() if app_state.loading_completed_at else None,
         "error": app_state.error,
-        "ready": not app_state.is_loading and app_state.error is None
+        "ready": not app_state.is_loading and app_state.error is None,
+        "http_clients": SharedHttpClient.all_stats(),
+        "ledger_sync": {
+            "last_synced_at": LedgerSyncService.last_synced_at.isoformat() if LedgerSyncService.last_synced_at else None,
+            "last_error": LedgerSyncService.last_error,
+        }
     }
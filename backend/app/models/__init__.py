@@ -3,5 +3,11 @@ from .transaction import Transaction
 from .price import PriceHistory, ExchangeRate, CurrentPriceCache
 from .insight import AIInsight
 from .portfolio_snapshot import PortfolioSnapshot
+from .holding_daily_value import HoldingDailyValue
+from .portfolio_region_value import PortfolioRegionValue
+from .daily_briefing import DailyBriefing
+from .ledger_change import LedgerChange
+from .holding_opening import HoldingOpening
+from .data_version import DataVersion
 
-__all__ = ["Holding", "Transaction", "PriceHistory", "ExchangeRate", "CurrentPriceCache", "AIInsight", "PortfolioSnapshot"]
+__all__ = ["Holding", "Transaction", "PriceHistory", "ExchangeRate", "CurrentPriceCache", "AIInsight", "PortfolioSnapshot", "HoldingDailyValue", "PortfolioRegionValue", "DailyBriefing", "LedgerChange", "HoldingOpening", "DataVersion"]
@@ -0,0 +1,31 @@
+"""
+Daily Briefing Model
+
+Briefings generated after market close per region, so delivery reads a
+stored payload instead of fetching live prices for every holding.
+"""
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class DailyBriefing(Base):
+    """Briefing payload (summary, movers, alerts) for one region on one day"""
+
+    __tablename__ = "daily_briefings"
+    __table_args__ = (
+        UniqueConstraint('region', 'briefing_date', name='uix_daily_briefing_region_date'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    region = Column(String(10), nullable=False)
+    # Market-local date the briefing covers
+    briefing_date = Column(Date, nullable=False, index=True)
+
+    # JSON payload as returned by /analytics/briefing
+    payload = Column(Text, nullable=False)
+
+    generated_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<DailyBriefing(region={self.region}, date={self.briefing_date})>"
@@ -0,0 +1,25 @@
+"""
+Data Version Model
+
+One row per data domain (holdings, prices, snapshots, fx), bumped by database
+triggers on the domain's tables in the same transaction as the write. Read
+endpoints build their ETags from these rows, so every writer (API workers,
+scripts, raw SQL) invalidates cached responses.
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class DataVersion(Base):
+    """Current version of one data domain"""
+
+    __tablename__ = "data_versions"
+
+    domain = Column(String(20), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # UTC, set by the triggers (CURRENT_TIMESTAMP)
+    modified_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<DataVersion(domain={self.domain}, version={self.version})>"
@@ -24,6 +24,14 @@ ACCOUNT_TYPES = {
     "NRE": "Non-Resident External Account",
 }
 
+# Dashboard regions and the holding countries they cover ('all' = no filter)
+# CA = North America (CA + US holdings in Canadian accounts)
+# IN = India (DEMAT + MF_INDIA)
+REGION_COUNTRIES = {
+    "CA": ("CA", "US"),
+    "IN": ("IN",),
+}
+
 
 class Holding(Base):
     __tablename__ = "holdings"
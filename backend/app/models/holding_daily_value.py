@@ -0,0 +1,36 @@
+"""
+Holding Daily Value Model
+
+Per-holding value for each snapshot date, written alongside portfolio snapshots
+so history can be sliced by account, country, symbol or currency without
+replaying transactions.
+"""
+from sqlalchemy import Column, Integer, Numeric, DECIMAL, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class HoldingDailyValue(Base):
+    """Value of one holding on one snapshot date"""
+
+    __tablename__ = "holding_daily_values"
+    __table_args__ = (
+        UniqueConstraint('value_date', 'holding_id', name='uix_holding_daily_value_date_holding'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    value_date = Column(Date, nullable=False, index=True)
+    holding_id = Column(Integer, ForeignKey("holdings.id"), nullable=False, index=True)
+
+    # Position on that date (quantity and price in the holding's currency)
+    quantity = Column(Numeric(15, 4), nullable=False)
+    price = Column(Numeric(15, 4), nullable=False)
+
+    # Values in CAD
+    value_cad = Column(DECIMAL(15, 2), nullable=False)
+    cost_cad = Column(DECIMAL(15, 2), nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<HoldingDailyValue(date={self.value_date}, holding_id={self.holding_id}, value={self.value_cad})>"
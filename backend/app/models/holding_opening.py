@@ -0,0 +1,32 @@
+"""
+Holding Opening Model
+
+The part of a holding's position that its transactions don't account for:
+shares entered manually or imported from a holdings statement before (or
+without) their purchases being in the ledger. Recorded when the holding's
+transactions are first written and replayed before them whenever the holding
+is rebuilt from the ledger. A zero row marks a holding whose position comes
+entirely from its transactions.
+"""
+from sqlalchemy import Column, Integer, Numeric, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class HoldingOpening(Base):
+    """Opening position a holding's transactions are replayed from"""
+
+    __tablename__ = "holding_openings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    holding_id = Column(Integer, ForeignKey("holdings.id"), nullable=False, unique=True, index=True)
+
+    quantity = Column(Numeric(15, 4), nullable=False)
+    avg_purchase_price = Column(Numeric(15, 4), nullable=False)
+    first_purchase_date = Column(Date, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<HoldingOpening(holding_id={self.holding_id}, quantity={self.quantity})>"
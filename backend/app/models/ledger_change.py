@@ -0,0 +1,27 @@
+"""
+Ledger Change Model
+
+Pending changes to the transaction ledger. Each transaction write records the
+holding and the earliest date it affects; the ledger sync worker recomputes
+derived data (holding daily values, region totals, snapshots) from that date
+on and then removes the mark.
+"""
+from sqlalchemy import Column, Integer, Date, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class LedgerChange(Base):
+    """Holding whose derived data is stale from from_date onwards"""
+
+    __tablename__ = "ledger_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: the mark must outlive the rows it refers to
+    holding_id = Column(Integer, nullable=False, index=True)
+    from_date = Column(Date, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<LedgerChange(holding_id={self.holding_id}, from={self.from_date})>"
@@ -0,0 +1,33 @@
+"""
+Portfolio Region Value Model
+
+Daily portfolio totals per dashboard region ('all', 'CA', 'IN'), written by the
+snapshot job so region value history is a range read instead of a replay.
+"""
+from sqlalchemy import Column, Integer, String, DECIMAL, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class PortfolioRegionValue(Base):
+    """Portfolio value for one region on one snapshot date"""
+
+    __tablename__ = "portfolio_region_values"
+    __table_args__ = (
+        # Leading region column serves (region, date range) lookups
+        UniqueConstraint('region', 'value_date', name='uix_portfolio_region_value_region_date'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    region = Column(String(10), nullable=False)
+    value_date = Column(Date, nullable=False, index=True)
+
+    # Values in CAD
+    value_cad = Column(DECIMAL(15, 2), nullable=False)
+    cost_cad = Column(DECIMAL(15, 2), nullable=False)
+    holdings_count = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<PortfolioRegionValue(region={self.region}, date={self.value_date}, value={self.value_cad})>"
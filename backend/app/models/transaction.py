@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from ..database import Base
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination walks (transaction_date, id), optionally within a holding or symbol
+        Index('ix_transactions_date_id', 'transaction_date', 'id'),
+        Index('ix_transactions_holding_date_id', 'holding_id', 'transaction_date', 'id'),
+        Index('ix_transactions_symbol_date_id', 'symbol', 'transaction_date', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     holding_id = Column(Integer, ForeignKey("holdings.id"), nullable=False, index=True)
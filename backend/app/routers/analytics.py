@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional
 from datetime import datetime, date, timedelta
@@ -6,18 +6,24 @@ from decimal import Decimal
 from collections import defaultdict
 import asyncio
 import threading
+import numpy as np
 from ..database import get_db
-from ..models.holding import Holding
+from ..models.holding import Holding, REGION_COUNTRIES
 from ..models.transaction import Transaction
 from ..models.price import PriceHistory, CurrentPriceCache
 from ..services.price_service import PriceService
-from ..services.currency_service import CurrencyService
+from ..services.currency_service import CurrencyService, FxSnapshot
+from ..services.valuation_service import Valuation, ValuationService, snapshot_value_from_notes
 from ..services.snapshot_service import SnapshotService
+from ..services.data_version_service import DataVersionService
+from ..services.briefing_service import BriefingService
+from ..utils.responses import FastRoute
+from ..utils.metrics import record_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/analytics", tags=["analytics"])
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=FastRoute)
 
 # Lock to prevent multiple concurrent yfinance requests
 _price_fetch_lock = threading.Lock()
@@ -122,6 +128,7 @@ def get_prices_with_dedup(symbols: list, with_change: bool = False) -> Dict:
 
     if not symbols_to_fetch:
         logger.info("All prices served from in-memory dedup cache")
+        record_cache("price_dedup", hits=len(results))
         return results
 
     # Acquire lock to prevent duplicate fetches
@@ -146,6 +153,8 @@ def get_prices_with_dedup(symbols: list, with_change: bool = False) -> Dict:
                     continue
             final_to_fetch.append((symbol, exchange))
 
+        # Symbols another thread fetched while we waited count as hits
+        record_cache("price_dedup", hits=len(symbols) - len(final_to_fetch), misses=len(final_to_fetch))
         if not final_to_fetch:
             return results
 
@@ -190,7 +199,12 @@ def get_prices_with_dedup(symbols: list, with_change: bool = False) -> Dict:
     return results
 
 
-async def calculate_portfolio_summary(db: Session, fast: bool = False, region: str = 'all') -> Dict:
+def calculate_portfolio_summary(
+    db: Session,
+    fast: bool = False,
+    region: str = 'all',
+    fx: Optional[FxSnapshot] = None
+) -> Dict:
     """
     Internal function to calculate portfolio summary.
     Can be called from routes or other modules.
@@ -199,17 +213,13 @@ async def calculate_portfolio_summary(db: Session, fast: bool = False, region: s
         db: Database session
         fast: If True, use cached prices for instant response (no daily change data)
         region: Filter by region: 'all', 'CA' (Canada), or 'IN' (India)
+        fx: Exchange rates to reuse across calls (looked up if not given)
     """
     query = db.query(Holding).filter(Holding.is_active == True)
     
-    # Filter by region
-    # CA = North America (CA + US holdings in Canadian accounts)
-    # IN = India (DEMAT + MF_INDIA)
-    if region == 'CA':
-        query = query.filter(Holding.country.in_(['CA', 'US']))
-    elif region == 'IN':
-        query = query.filter(Holding.country == 'IN')
-    # 'all' = no additional filter
+    # Filter by region ('all' = no additional filter)
+    if region in REGION_COUNTRIES:
+        query = query.filter(Holding.country.in_(REGION_COUNTRIES[region]))
     
     holdings = query.all()
 
@@ -242,71 +252,71 @@ async def calculate_portfolio_summary(db: Session, fast: bool = False, region: s
         # Save fetched prices to DB cache for future fast=true requests
         save_prices_to_db_cache(db, holdings, current_prices)
 
-    # Calculate totals in CAD
-    total_value_cad = Decimal("0")
-    total_cost_cad = Decimal("0")
-    total_previous_value_cad = Decimal("0")  # For accurate daily change
-    countries = defaultdict(int)
+    # Value all holdings at once in CAD (float64); see ValuationService
+    if fx is None:
+        fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+    previous_closes = None
+    if price_data:
+        previous_closes = {sym: data.get('previous_close') for sym, data in price_data.items() if data}
+    valuation = ValuationService.value_holdings(holdings, current_prices, fx, previous_closes)
 
-    for holding in holdings:
-        countries[holding.country] += 1
+    for holding, priced in zip(holdings, valuation.priced):
+        if not priced:
+            # Holdings without live prices (FDs, PPF, etc.) are valued at cost basis
+            logger.info(f"Using cost basis for {holding.symbol} (no live price)")
 
-        # Get current price
-        current_price = current_prices.get(holding.symbol)
-        
-        # For holdings without live prices (e.g., mutual funds), try snapshot value from notes
-        if current_price is None:
-            import re
-            snapshot_value = None
-            if holding.notes and "Snapshot:" in holding.notes:
-                match = re.search(r'Snapshot: ₹([\d,]+)', holding.notes)
-                if match:
-                    try:
-                        snapshot_value = Decimal(match.group(1).replace(',', ''))
-                    except:
-                        pass
-            
-            if snapshot_value is None:
-                # Fall back to cost basis for holdings without live prices (FDs, PPF, etc.)
-                logger.info(f"Using cost basis for {holding.symbol} (no live price)")
-                market_value = holding.quantity * holding.avg_purchase_price
-            else:
-                # Use snapshot value directly as market value
-                market_value = snapshot_value
-            total_cost = holding.quantity * holding.avg_purchase_price
-        else:
-            # Calculate market value in holding's currency
-            market_value = holding.quantity * current_price
-            total_cost = holding.quantity * holding.avg_purchase_price
-        
-        # Calculate previous value for daily change (if we have the data)
-        # For holdings without previous close (FDs, PPF, etc.), use current value
-        # so they contribute 0 to daily change
-        previous_value = market_value  # Default to current value (0 change)
-        if price_data and holding.symbol in price_data:
-            prev_close = price_data[holding.symbol].get('previous_close')
-            if prev_close:
-                previous_value = holding.quantity * prev_close
+    return summarize_valuation(holdings, valuation, live=bool(price_data), fast=fast)
 
-        # Convert to CAD
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                market_value = market_value * rate
-                total_cost = total_cost * rate
-                previous_value = previous_value * rate
 
-        total_value_cad += market_value
-        total_cost_cad += total_cost
-        total_previous_value_cad += previous_value
+def summarize_valuation(
+    holdings: list,
+    valuation: Valuation,
+    live: bool,
+    fast: bool = False,
+    mask: Optional[np.ndarray] = None
+) -> Dict:
+    """
+    Portfolio summary for the holdings selected by mask (default: all) from
+    one valuation of them, so several regions can share a single pricing and
+    valuation pass.
+
+    Args:
+        live: Prices came with previous closes, so today's change is known
+        fast: Prices came from the cache (reported as the source)
+    """
+    if mask is not None:
+        holdings = [h for h, selected in zip(holdings, mask) if selected]
+    source = "cache" if fast else "live"
+    if not holdings:
+        return {
+            "total_value_cad": 0,
+            "total_cost_cad": 0,
+            "unrealized_gain_cad": 0,
+            "unrealized_gain_pct": 0,
+            "today_change_cad": 0,
+            "today_change_pct": 0,
+            "holdings_count": 0,
+            "countries": {},
+            "last_updated": datetime.now(),
+            "source": source
+        }
+
+    selected = slice(None) if mask is None else mask
+    total_value_cad = float(valuation.market_value_cad[selected].sum())
+    total_cost_cad = float(valuation.cost_cad[selected].sum())
+    total_previous_value_cad = float(valuation.previous_value_cad[selected].sum())
+
+    countries = defaultdict(int)
+    for holding in holdings:
+        countries[holding.country] += 1
 
     # Calculate gains
     unrealized_gain_cad = total_value_cad - total_cost_cad
-    unrealized_gain_pct = (unrealized_gain_cad / total_cost_cad * 100) if total_cost_cad > 0 else Decimal("0")
+    unrealized_gain_pct = (unrealized_gain_cad / total_cost_cad * 100) if total_cost_cad > 0 else 0.0
 
     # Calculate today's change - only use accurate method with live price data
     # Don't use snapshot-based change as it's misleading when holdings are added/removed
-    if price_data and total_previous_value_cad > 0:
+    if live and total_previous_value_cad > 0:
         # Accurate daily change from previous close prices
         today_change_cad = total_value_cad - total_previous_value_cad
         today_change_pct = (today_change_cad / total_previous_value_cad * 100)
@@ -314,25 +324,25 @@ async def calculate_portfolio_summary(db: Session, fast: bool = False, region: s
     else:
         # In fast mode without live prices, we can't reliably calculate daily change
         # (snapshot-based change is misleading when holdings are added/removed)
-        today_change_cad = Decimal("0")
-        today_change_pct = Decimal("0")
+        today_change_cad = 0.0
+        today_change_pct = 0.0
 
     return {
-        "total_value_cad": float(total_value_cad),
-        "total_cost_cad": float(total_cost_cad),
-        "unrealized_gain_cad": float(unrealized_gain_cad),
-        "unrealized_gain_pct": float(unrealized_gain_pct),
-        "today_change_cad": float(today_change_cad),
-        "today_change_pct": float(today_change_pct),
+        "total_value_cad": round(total_value_cad, 2),
+        "total_cost_cad": round(total_cost_cad, 2),
+        "unrealized_gain_cad": round(unrealized_gain_cad, 2),
+        "unrealized_gain_pct": unrealized_gain_pct,
+        "today_change_cad": round(today_change_cad, 2),
+        "today_change_pct": today_change_pct,
         "holdings_count": len(holdings),
         "countries": dict(countries),
-        "source": "cache" if fast else "live",
+        "source": source,
         "last_updated": datetime.now()
     }
 
 
 @router.get("/portfolio/summary")
-async def get_portfolio_summary(
+def get_portfolio_summary(
     db: Session = Depends(get_db),
     fast: bool = Query(False, description="Use cached prices for instant response"),
     region: str = Query('all', description="Filter by region: 'all', 'CA' (Canada), or 'IN' (India)")
@@ -344,25 +354,33 @@ async def get_portfolio_summary(
     Use fast=false (default) for fresh prices from market data API.
     Use region to filter: 'all' (default), 'CA' (Canada only), 'IN' (India only).
     """
-    return await calculate_portfolio_summary(db, fast, region)
+    return calculate_portfolio_summary(db, fast, region)
 
 
 @router.get("/allocation")
-async def get_allocation(
+def get_allocation(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     fast: bool = Query(False, description="Use cached prices for instant response"),
     region: str = Query('all', description="Filter by region: 'all', 'CA' (Canada), or 'IN' (India)")
 ) -> Dict:
-    """Get portfolio allocation by country, exchange, and top holdings"""
+    """
+    Get portfolio allocation by country, exchange, and top holdings.
+
+    With fast=true the result depends only on stored data, so it carries an
+    ETag and returns 304 if If-None-Match matches.
+    """
+    if fast:
+        not_modified = DataVersionService.not_modified(request, response, ("prices", "holdings", "fx"), region)
+        if not_modified:
+            return not_modified
+
     query = db.query(Holding).filter(Holding.is_active == True)
     
-    # Filter by region
-    # CA = North America (CA + US holdings in Canadian accounts)
-    # IN = India (DEMAT + MF_INDIA)
-    if region == 'CA':
-        query = query.filter(Holding.country.in_(['CA', 'US']))
-    elif region == 'IN':
-        query = query.filter(Holding.country == 'IN')
+    # Filter by region ('all' = no additional filter)
+    if region in REGION_COUNTRIES:
+        query = query.filter(Holding.country.in_(REGION_COUNTRIES[region]))
     
     holdings = query.all()
 
@@ -385,46 +403,30 @@ async def get_allocation(
         # Save fetched prices to DB cache for future fast=true requests
         save_prices_to_db_cache(db, holdings, current_prices)
 
+    # Value all holdings at once in CAD (float64); see ValuationService
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+    valuation = ValuationService.value_holdings(holdings, current_prices, fx)
+
     # Calculate allocations
-    by_country = defaultdict(lambda: Decimal("0"))
-    by_exchange = defaultdict(lambda: Decimal("0"))
+    by_country = defaultdict(float)
+    by_exchange = defaultdict(float)
     holdings_with_value = []
 
-    total_portfolio_value = Decimal("0")
+    # Holdings with neither a live price nor a snapshot value are left out
+    total_portfolio_value = float(valuation.market_value_cad[valuation.priced].sum())
 
-    for holding in holdings:
+    for i, holding in enumerate(holdings):
+        if not valuation.priced[i]:
+            continue
+
+        market_value = float(valuation.market_value_cad[i])
         current_price = current_prices.get(holding.symbol)
-        
-        # For holdings without live prices (e.g., mutual funds), try snapshot value from notes
-        if current_price is None:
-            import re
-            snapshot_value = None
-            if holding.notes and "Snapshot:" in holding.notes:
-                match = re.search(r'Snapshot: ₹([\d,]+)', holding.notes)
-                if match:
-                    try:
-                        snapshot_value = Decimal(match.group(1).replace(',', ''))
-                    except:
-                        pass
-            
-            if snapshot_value is None:
-                continue
-            
-            # Use snapshot value directly as market value (already in holding currency)
-            market_value = snapshot_value
-            display_price = float(snapshot_value / holding.quantity) if holding.quantity > 0 else 0
-        else:
-            # Calculate market value in CAD
-            market_value = holding.quantity * current_price
+        if current_price is not None:
             display_price = float(current_price)
-
-        # Convert to CAD
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                market_value = market_value * rate
-
-        total_portfolio_value += market_value
+        else:
+            # Valued from the snapshot in notes (already in holding currency)
+            snapshot_value = snapshot_value_from_notes(holding.notes)
+            display_price = snapshot_value / float(holding.quantity) if holding.quantity > 0 else 0
 
         by_country[holding.country] += market_value
         by_exchange[holding.exchange] += market_value
@@ -432,7 +434,7 @@ async def get_allocation(
         holdings_with_value.append({
             "symbol": holding.symbol,
             "company_name": holding.company_name,
-            "market_value": float(market_value),
+            "market_value": market_value,
             "quantity": float(holding.quantity),
             "current_price": display_price,
             "currency": holding.currency
@@ -440,12 +442,12 @@ async def get_allocation(
 
     # Convert to percentages
     by_country_pct = {
-        country: float(value / total_portfolio_value * 100) if total_portfolio_value > 0 else 0
+        country: value / total_portfolio_value * 100 if total_portfolio_value > 0 else 0
         for country, value in by_country.items()
     }
 
     by_exchange_pct = {
-        exchange: float(value / total_portfolio_value * 100) if total_portfolio_value > 0 else 0
+        exchange: value / total_portfolio_value * 100 if total_portfolio_value > 0 else 0
         for exchange, value in by_exchange.items()
     }
 
@@ -455,21 +457,21 @@ async def get_allocation(
 
     # Add percentage to top holdings
     for holding in top_holdings:
-        holding['percentage'] = float(
-            Decimal(str(holding['market_value'])) / total_portfolio_value * 100
+        holding['percentage'] = (
+            holding['market_value'] / total_portfolio_value * 100
         ) if total_portfolio_value > 0 else 0
 
     return {
         "by_country": by_country_pct,
         "by_exchange": by_exchange_pct,
         "top_holdings": top_holdings,
-        "total_value_cad": float(total_portfolio_value),
+        "total_value_cad": round(total_portfolio_value, 2),
         "source": "cache" if fast else "live"
     }
 
 
 @router.get("/performance")
-async def get_performance(
+def get_performance(
     db: Session = Depends(get_db),
     fast: bool = Query(False, description="Use cached prices for instant response")
 ) -> Dict:
@@ -531,20 +533,62 @@ async def get_performance(
 
 
 @router.get("/portfolio-value")
-async def get_portfolio_value_history(days: int = 30, db: Session = Depends(get_db)) -> Dict:
-    """Get portfolio value over time"""
-    # This is a simplified version
-    # In a real implementation, you'd calculate historical portfolio value
-    # using historical prices and holdings at each point in time
+def get_portfolio_value_history(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=3650, description="Number of days of history"),
+    region: str = Query('all', description="Filter by region: 'all', 'CA' (Canada), or 'IN' (India)"),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Get daily portfolio value over the last N days for a region.
+
+    Reads the per-region totals stored by the snapshot job, so any window is a
+    single range query with no transaction replay. Dates without a snapshot
+    are not included.
+    """
+    if region not in REGION_COUNTRIES:
+        region = 'all'
+
+    not_modified = DataVersionService.not_modified(request, response, ("snapshots",), days, region, date.today())
+    if not_modified:
+        return not_modified
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    rows = SnapshotService.get_region_value_history(db, region, start_date, end_date)
+
+    data_points = []
+    for row in rows:
+        gain = row.value_cad - row.cost_cad
+        data_points.append({
+            "date": row.value_date,
+            "value_cad": row.value_cad,
+            "cost_cad": row.cost_cad,
+            "gain_cad": gain,
+            "gain_pct": (gain / row.cost_cad * 100).quantize(Decimal('0.01')) if row.cost_cad > 0 else Decimal('0'),
+            "holdings_count": row.holdings_count,
+        })
+
+    value_change = Decimal('0')
+    value_change_pct = Decimal('0')
+    if len(rows) > 1:
+        value_change = rows[-1].value_cad - rows[0].value_cad
+        if rows[0].value_cad > 0:
+            value_change_pct = (value_change / rows[0].value_cad * 100).quantize(Decimal('0.01'))
 
     return {
-        "message": "Portfolio value history coming soon",
-        "note": "This requires storing historical portfolio snapshots"
+        "region": region,
+        "start_date": start_date,
+        "end_date": end_date,
+        "data_points": data_points,
+        "value_change": value_change,
+        "value_change_pct": value_change_pct,
     }
 
 
 @router.get("/daily-movers")
-async def get_daily_movers(
+def get_daily_movers(
     db: Session = Depends(get_db),
     limit: int = Query(5, description="Number of top movers to return per direction")
 ) -> Dict:
@@ -570,53 +614,43 @@ async def get_daily_movers(
     # Get prices with daily change data
     price_data = PriceService.get_prices_with_change_bulk(symbols)
     
+    priced = [
+        (holding, price_data[holding.symbol]) for holding in holdings
+        if price_data.get(holding.symbol) and price_data[holding.symbol].get('price') is not None
+    ]
+
+    # Market value, day change and cost in CAD for all holdings at once
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h, _ in priced))
+    rates = fx.rates_to(h.currency for h, _ in priced)
+    quantity = np.array([float(h.quantity) for h, _ in priced], dtype=np.float64)
+    market_value = quantity * np.array([float(d['price']) for _, d in priced], dtype=np.float64) * rates
+    day_change_value = quantity * np.array([float(d.get('change') or 0) for _, d in priced], dtype=np.float64) * rates
+    cost_basis = quantity * np.array([float(h.avg_purchase_price) for h, _ in priced], dtype=np.float64) * rates
+    unrealized_gain = market_value - cost_basis
+    unrealized_gain_pct = np.divide(
+        unrealized_gain * 100, cost_basis, out=np.zeros_like(cost_basis), where=cost_basis > 0
+    )
+
     holdings_with_change = []
-    
-    for holding in holdings:
-        data = price_data.get(holding.symbol)
-        if not data or data.get('price') is None:
-            continue
-        
-        current_price = data['price']
+    for i, (holding, data) in enumerate(priced):
         previous_close = data.get('previous_close')
-        change = data.get('change', Decimal('0'))
-        change_pct = data.get('change_pct', Decimal('0'))
-        
-        # Calculate market value and change in CAD
-        market_value = holding.quantity * current_price
-        day_change_value = holding.quantity * change if change else Decimal('0')
-        
-        # Convert to CAD
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                market_value = market_value * rate
-                day_change_value = day_change_value * rate
-        
-        # Calculate unrealized gain
-        cost_basis = holding.quantity * holding.avg_purchase_price
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                cost_basis = cost_basis * rate
-        
-        unrealized_gain = market_value - cost_basis
-        unrealized_gain_pct = (unrealized_gain / cost_basis * 100) if cost_basis > 0 else Decimal('0')
-        
+        change = data.get('change')
+        change_pct = data.get('change_pct')
+
         holdings_with_change.append({
             "symbol": holding.symbol,
             "company_name": holding.company_name,
             "exchange": holding.exchange,
             "currency": holding.currency,
             "quantity": float(holding.quantity),
-            "current_price": float(current_price),
+            "current_price": float(data['price']),
             "previous_close": float(previous_close) if previous_close else None,
             "day_change": float(change) if change else 0,
             "day_change_pct": float(change_pct) if change_pct else 0,
-            "day_change_cad": float(day_change_value),
-            "market_value_cad": float(market_value),
-            "unrealized_gain_cad": float(unrealized_gain),
-            "unrealized_gain_pct": float(unrealized_gain_pct)
+            "day_change_cad": float(day_change_value[i]),
+            "market_value_cad": float(market_value[i]),
+            "unrealized_gain_cad": float(unrealized_gain[i]),
+            "unrealized_gain_pct": float(unrealized_gain_pct[i])
         })
     
     # Sort by day change percentage
@@ -636,28 +670,220 @@ async def get_daily_movers(
     }
 
 
-@router.get("/briefing")
-async def get_portfolio_briefing(db: Session = Depends(get_db)) -> Dict:
+OVERVIEW_FIELDS = ("summary", "holdings", "allocation", "movers", "recommendations", "alerts")
+
+
+def build_portfolio_overview(
+    db: Session,
+    fast: bool = False,
+    region: str = 'all',
+    fields: Optional[set] = None,
+    movers_limit: int = 5
+) -> Dict:
     """
-    Get a complete portfolio briefing suitable for daily summary.
-    
-    Combines portfolio summary, daily movers, and allocation data
-    into a single response optimized for generating a text briefing.
+    Summary, per-holding rows, allocation, movers, recommendations and alerts
+    from a single price lookup and valuation pass.
+
+    Args:
+        db: Database session
+        fast: Use cached prices (no daily change, so no movers)
+        region: Filter by region: 'all', 'CA' (Canada), or 'IN' (India)
+        fields: Sections to include (default: all of OVERVIEW_FIELDS)
+        movers_limit: Gainers/losers to return per direction
     """
-    # Get all the data we need
-    summary = await calculate_portfolio_summary(db, fast=False)
-    movers = await get_daily_movers(db, limit=4)
-    
-    # Get allocation for concentration analysis
-    holdings = db.query(Holding).filter(Holding.is_active == True).all()
-    symbols = [(h.symbol, h.exchange) for h in holdings]
-    current_prices = PriceService.get_prices_bulk(symbols)
-    
-    total_value = Decimal(str(summary['total_value_cad']))
-    
+    fields = set(fields or OVERVIEW_FIELDS)
+    query = db.query(Holding).filter(Holding.is_active == True)
+    if region in REGION_COUNTRIES:
+        query = query.filter(Holding.country.in_(REGION_COUNTRIES[region]))
+    holdings = query.all()
+
+    if fast:
+        current_prices = get_prices_from_cache(db, holdings)
+        price_data = {}
+    else:
+        symbols = [(h.symbol, h.exchange) for h in holdings]
+        price_data = get_prices_with_dedup(symbols, with_change=True) if symbols else {}
+        current_prices = {sym: data['price'] for sym, data in price_data.items()}
+        save_prices_to_db_cache(db, holdings, current_prices)
+
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+    previous_closes = {sym: data.get('previous_close') for sym, data in price_data.items() if data}
+    valuation = ValuationService.value_holdings(holdings, current_prices, fx, previous_closes or None)
+
+    total_value_cad = valuation.total_value_cad
+    total_cost_cad = valuation.total_cost_cad
+    priced_value_cad = float(valuation.market_value_cad[valuation.priced].sum())
+    unrealized = valuation.market_value_cad - valuation.cost_cad
+    unrealized_pct = np.divide(
+        unrealized * 100, valuation.cost_cad, out=np.zeros_like(unrealized), where=valuation.cost_cad > 0
+    )
+    day_change = valuation.market_value_cad - valuation.previous_value_cad
+
+    rows = []
+    for i, holding in enumerate(holdings):
+        price = current_prices.get(holding.symbol)
+        data = price_data.get(holding.symbol) or {}
+        previous_close = data.get('previous_close')
+        market_value = float(valuation.market_value_cad[i])
+        rows.append({
+            "symbol": holding.symbol,
+            "company_name": holding.company_name,
+            "exchange": holding.exchange,
+            "country": holding.country,
+            "currency": holding.currency,
+            "account_type": holding.account_type,
+            "quantity": float(holding.quantity),
+            "current_price": float(price) if price is not None else None,
+            "previous_close": float(previous_close) if previous_close else None,
+            "day_change": float(data['change']) if data.get('change') else 0,
+            "day_change_pct": float(data['change_pct']) if data.get('change_pct') else 0,
+            "day_change_cad": float(day_change[i]),
+            "market_value_cad": market_value,
+            "cost_basis_cad": float(valuation.cost_cad[i]),
+            "unrealized_gain_cad": float(unrealized[i]),
+            "unrealized_gain_pct": float(unrealized_pct[i]),
+            "allocation_pct": market_value / priced_value_cad * 100
+            if valuation.priced[i] and priced_value_cad > 0 else 0,
+            "has_price": price is not None,
+            "priced": bool(valuation.priced[i]),
+        })
+    # Rows valued from a live or cached price (what movers, recommendations and alerts use)
+    with_price = [row for row in rows if row["has_price"]]
+
+    result = {
+        "region": region,
+        "source": "cache" if fast else "live",
+        "fields": [f for f in OVERVIEW_FIELDS if f in fields],
+    }
+
+    if "summary" in fields:
+        gain = total_value_cad - total_cost_cad
+        previous_total = valuation.total_previous_value_cad
+        has_change = bool(price_data) and previous_total > 0
+        today_change = total_value_cad - previous_total if has_change else 0.0
+        countries = defaultdict(int)
+        for holding in holdings:
+            countries[holding.country] += 1
+        result["summary"] = {
+            "total_value_cad": round(total_value_cad, 2),
+            "total_cost_cad": round(total_cost_cad, 2),
+            "unrealized_gain_cad": round(gain, 2),
+            "unrealized_gain_pct": (gain / total_cost_cad * 100) if total_cost_cad > 0 else 0.0,
+            "today_change_cad": round(today_change, 2),
+            "today_change_pct": (today_change / previous_total * 100) if has_change else 0.0,
+            "holdings_count": len(holdings),
+            "countries": dict(countries),
+            "last_updated": datetime.now(),
+            "source": result["source"],
+        }
+
+    if "holdings" in fields:
+        result["holdings"] = sorted(rows, key=lambda r: r["market_value_cad"], reverse=True)
+
+    if "allocation" in fields:
+        by_country = defaultdict(float)
+        by_exchange = defaultdict(float)
+        by_account = defaultdict(float)
+        for row in rows:
+            if row["priced"]:
+                by_country[row["country"]] += row["allocation_pct"]
+                by_exchange[row["exchange"]] += row["allocation_pct"]
+                by_account[row["account_type"] or "UNASSIGNED"] += row["allocation_pct"]
+        result["allocation"] = {
+            "by_country": dict(by_country),
+            "by_exchange": dict(by_exchange),
+            "by_account_type": dict(by_account),
+            "total_value_cad": round(priced_value_cad, 2),
+        }
+
+    if "movers" in fields:
+        changed = sorted(
+            (row for row in with_price if row["previous_close"] is not None),
+            key=lambda r: r["day_change_pct"], reverse=True
+        )
+        gainers = [row for row in changed if row["day_change_pct"] > 0]
+        losers = [row for row in reversed(changed) if row["day_change_pct"] < 0]
+        result["movers"] = {
+            "top_gainers": gainers[:movers_limit],
+            "top_losers": losers[:movers_limit],
+        }
+
+    if "recommendations" in fields:
+        recommendation_rows = [
+            {
+                "symbol": row["symbol"],
+                "company_name": row["company_name"],
+                "market_value_cad": row["market_value_cad"],
+                "cost_basis_cad": row["cost_basis_cad"],
+                "gain_pct": row["unrealized_gain_pct"],
+                "day_change_pct": row["day_change_pct"],
+                "currency": row["currency"],
+                "exchange": row["exchange"],
+                "country": row["country"],
+            }
+            for row in with_price
+        ]
+        total_priced = sum(row["market_value_cad"] for row in recommendation_rows)
+        result["recommendations"] = build_recommendations(db, recommendation_rows, total_priced)
+
+    if "alerts" in fields:
+        result["alerts"] = portfolio_alerts(with_price, total_value_cad)
+
+    result["generated_at"] = datetime.now()
+    return result
+
+
+@router.get("/overview")
+def get_portfolio_overview(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    fast: bool = Query(False, description="Use cached prices for instant response (no movers)"),
+    region: str = Query('all', description="Filter by region: 'all', 'CA' (Canada), or 'IN' (India)"),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated sections to include: {', '.join(OVERVIEW_FIELDS)} (default: all)"
+    ),
+    movers_limit: int = Query(5, ge=1, le=50, description="Number of top movers to return per direction")
+) -> Dict:
+    """
+    Get everything an agent or briefing needs in one call.
+
+    Prices are looked up and holdings valued once, then summary, per-holding
+    rows, allocation (by country, exchange and account type), movers,
+    recommendations and alerts are derived from that single valuation.
+    With fast=true the result carries an ETag and returns 304 if unchanged.
+    """
+    selected = set(OVERVIEW_FIELDS)
+    if fields:
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - set(OVERVIEW_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Choose from: {', '.join(OVERVIEW_FIELDS)}"
+            )
+
+    if fast:
+        not_modified = DataVersionService.not_modified(
+            request, response, ("prices", "holdings", "fx"), region, ",".join(sorted(selected)), movers_limit
+        )
+        if not_modified:
+            return not_modified
+
+    return build_portfolio_overview(db, fast, region, selected, movers_limit)
+
+
+def portfolio_alerts(rows: List[Dict], total_value) -> List[Dict]:
+    """
+    Concentration, big daily loss and underwater alerts.
+
+    Each row needs symbol, market_value_cad, day_change_pct and unrealized_gain_pct.
+    """
+    total_value = Decimal(str(total_value))
+
     # Build concentration alerts
     alerts = []
-    for holding_data in movers['all_holdings']:
+    for holding_data in rows:
         pct = Decimal(str(holding_data['market_value_cad'])) / total_value * 100 if total_value > 0 else Decimal('0')
         
         # Alert if single position > 15%
@@ -686,20 +912,31 @@ async def get_portfolio_briefing(db: Session = Depends(get_db)) -> Dict:
                 "message": f"{holding_data['symbol']} down {abs(holding_data['unrealized_gain_pct']):.1f}% from cost",
                 "severity": "info"
             })
+
+    return alerts
+
+
+@router.get("/briefing")
+def get_portfolio_briefing(
+    db: Session = Depends(get_db),
+    region: str = Query('all', description="Filter by region: 'all', 'CA' (Canada), or 'IN' (India)"),
+    refresh: bool = Query(False, description="Regenerate from live prices instead of serving the stored briefing")
+) -> Dict:
+    """
+    Get a complete portfolio briefing suitable for daily summary.
     
-    return {
-        "summary": summary,
-        "movers": {
-            "top_gainers": movers['top_gainers'],
-            "top_losers": movers['top_losers']
-        },
-        "alerts": alerts,
-        "generated_at": datetime.now()
-    }
+    Combines portfolio summary, daily movers, and alerts into a single
+    response optimized for generating a text briefing. Briefings are
+    generated after each region's market close and stored (see
+    BriefingService), so this is normally a database read. If the latest
+    one is missing it is built from live prices; it is stored only after
+    the market has closed, before that it is returned dated today.
+    """
+    return BriefingService.get_briefing(db, region, refresh)
 
 
 @router.get("/realized-gains")
-async def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
+def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
     """
     Calculate realized gains/losses from completed (SELL) transactions.
 
@@ -756,6 +993,9 @@ async def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
     by_holding = []
     by_year = defaultdict(lambda: Decimal("0"))
 
+    # One rate per currency for every transaction below
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+
     for holding in holdings:
         # Get all transactions for this holding, ordered by date and id
         transactions = db.query(Transaction).filter(
@@ -834,21 +1074,11 @@ async def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
                 # Track by year
                 year = txn.transaction_date.year
 
-                # Convert to CAD if needed
-                if holding.currency != "CAD":
-                    rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-                    if rate:
-                        realized_gain_cad = realized_gain * rate
-                        proceeds_cad = proceeds * rate
-                        cost_basis_cad_val = cost_basis * rate
-                    else:
-                        realized_gain_cad = realized_gain
-                        proceeds_cad = proceeds
-                        cost_basis_cad_val = cost_basis
-                else:
-                    realized_gain_cad = realized_gain
-                    proceeds_cad = proceeds
-                    cost_basis_cad_val = cost_basis
+                # Convert to CAD
+                rate = fx.rate_decimal(holding.currency, "CAD")
+                realized_gain_cad = realized_gain * rate
+                proceeds_cad = proceeds * rate
+                cost_basis_cad_val = cost_basis * rate
 
                 by_year[year] += realized_gain_cad
                 total_realized_gain_cad += realized_gain_cad
@@ -872,14 +1102,7 @@ async def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
         # Only add holdings with sell transactions
         if sell_transactions:
             # Convert holding totals to CAD
-            if holding.currency != "CAD":
-                rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-                if rate:
-                    holding_realized_gain_cad = holding_realized_gain * rate
-                else:
-                    holding_realized_gain_cad = holding_realized_gain
-            else:
-                holding_realized_gain_cad = holding_realized_gain
+            holding_realized_gain_cad = holding_realized_gain * fx.rate_decimal(holding.currency, "CAD")
 
             by_holding.append({
                 "symbol": holding.symbol,
@@ -906,95 +1129,14 @@ async def get_realized_gains(db: Session = Depends(get_db)) -> Dict:
     }
 
 
-@router.get("/recommendations")
-async def get_recommendations(
-    db: Session = Depends(get_db),
-    fast: bool = Query(True, description="Use cached prices for faster response")
-) -> Dict:
+def build_recommendations(db: Session, holdings_data: List[Dict], total_value) -> Dict:
     """
-    Get actionable portfolio recommendations based on current holdings.
-    
-    Returns categorized recommendations:
-    - take_profit: Holdings with significant gains (>40%)
-    - review: Holdings with significant losses (>20%)
-    - rebalance: Holdings that are overweight (>12% of portfolio)
-    - watch: Holdings with big daily moves (>3%)
-    
-    Also returns a portfolio health score (0-100).
+    Recommendations and portfolio health score from per-holding metrics.
+
+    Each row needs symbol, company_name, market_value_cad, gain_pct,
+    day_change_pct and country; allocation_pct is added to it.
+    Used by /recommendations and /overview.
     """
-    holdings = db.query(Holding).filter(Holding.is_active == True).all()
-    
-    if not holdings:
-        return {
-            "recommendations": [],
-            "health_score": 100,
-            "health_grade": "A",
-            "summary": {
-                "take_profit": 0,
-                "review": 0,
-                "rebalance": 0,
-                "watch": 0
-            },
-            "generated_at": datetime.now()
-        }
-    
-    # Get prices - prefer cache for speed
-    if fast:
-        current_prices = get_prices_from_cache(db, holdings)
-        price_data = None
-    else:
-        symbols = [(h.symbol, h.exchange) for h in holdings]
-        price_data = PriceService.get_prices_with_change_bulk(symbols)
-        current_prices = {sym: data['price'] for sym, data in price_data.items()}
-    
-    # Calculate portfolio total and per-holding metrics
-    total_value = Decimal("0")
-    holdings_data = []
-    
-    for holding in holdings:
-        price = current_prices.get(holding.symbol)
-        if price is None:
-            continue
-        
-        market_value = holding.quantity * price
-        cost_basis = holding.quantity * holding.avg_purchase_price
-        
-        # Convert to CAD
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                market_value_cad = market_value * rate
-                cost_basis_cad = cost_basis * rate
-            else:
-                market_value_cad = market_value
-                cost_basis_cad = cost_basis
-        else:
-            market_value_cad = market_value
-            cost_basis_cad = cost_basis
-        
-        gain_pct = ((market_value_cad - cost_basis_cad) / cost_basis_cad * 100) if cost_basis_cad > 0 else Decimal("0")
-        
-        # Get daily change if available
-        day_change_pct = Decimal("0")
-        if price_data and holding.symbol in price_data:
-            change_pct = price_data[holding.symbol].get('change_pct')
-            if change_pct:
-                day_change_pct = change_pct
-        
-        total_value += market_value_cad
-        
-        holdings_data.append({
-            "symbol": holding.symbol,
-            "company_name": holding.company_name,
-            "market_value_cad": market_value_cad,
-            "cost_basis_cad": cost_basis_cad,
-            "gain_pct": float(gain_pct),
-            "day_change_pct": float(day_change_pct),
-            "currency": holding.currency,
-            "exchange": holding.exchange,
-            "country": holding.country
-        })
-    
     # Calculate allocation percentages
     for h in holdings_data:
         h["allocation_pct"] = float(h["market_value_cad"] / total_value * 100) if total_value > 0 else 0
@@ -1178,8 +1320,93 @@ async def get_recommendations(
     }
 
 
+@router.get("/recommendations")
+def get_recommendations(
+    db: Session = Depends(get_db),
+    fast: bool = Query(True, description="Use cached prices for faster response")
+) -> Dict:
+    """
+    Get actionable portfolio recommendations based on current holdings.
+    
+    Returns categorized recommendations:
+    - take_profit: Holdings with significant gains (>40%)
+    - review: Holdings with significant losses (>20%)
+    - rebalance: Holdings that are overweight (>12% of portfolio)
+    - watch: Holdings with big daily moves (>3%)
+    
+    Also returns a portfolio health score (0-100).
+    """
+    holdings = db.query(Holding).filter(Holding.is_active == True).all()
+    
+    if not holdings:
+        return {
+            "recommendations": [],
+            "health_score": 100,
+            "health_grade": "A",
+            "summary": {
+                "take_profit": 0,
+                "review": 0,
+                "rebalance": 0,
+                "watch": 0
+            },
+            "generated_at": datetime.now()
+        }
+    
+    # Get prices - prefer cache for speed
+    if fast:
+        current_prices = get_prices_from_cache(db, holdings)
+        price_data = None
+    else:
+        symbols = [(h.symbol, h.exchange) for h in holdings]
+        price_data = PriceService.get_prices_with_change_bulk(symbols)
+        current_prices = {sym: data['price'] for sym, data in price_data.items()}
+    
+    # Calculate portfolio total and per-holding metrics
+    total_value = Decimal("0")
+    holdings_data = []
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+    
+    for holding in holdings:
+        price = current_prices.get(holding.symbol)
+        if price is None:
+            continue
+        
+        market_value = holding.quantity * price
+        cost_basis = holding.quantity * holding.avg_purchase_price
+        
+        # Convert to CAD
+        rate = fx.rate_decimal(holding.currency, "CAD")
+        market_value_cad = market_value * rate
+        cost_basis_cad = cost_basis * rate
+        
+        gain_pct = ((market_value_cad - cost_basis_cad) / cost_basis_cad * 100) if cost_basis_cad > 0 else Decimal("0")
+        
+        # Get daily change if available
+        day_change_pct = Decimal("0")
+        if price_data and holding.symbol in price_data:
+            change_pct = price_data[holding.symbol].get('change_pct')
+            if change_pct:
+                day_change_pct = change_pct
+        
+        total_value += market_value_cad
+        
+        holdings_data.append({
+            "symbol": holding.symbol,
+            "company_name": holding.company_name,
+            "market_value_cad": market_value_cad,
+            "cost_basis_cad": cost_basis_cad,
+            "gain_pct": float(gain_pct),
+            "day_change_pct": float(day_change_pct),
+            "currency": holding.currency,
+            "exchange": holding.exchange,
+            "country": holding.country
+        })
+    
+    return build_recommendations(db, holdings_data, total_value)
+
+
 @router.get("/insights")
-async def get_ai_insights(db: Session = Depends(get_db)) -> Dict:
+def get_ai_insights(db: Session = Depends(get_db)) -> Dict:
     """
     Get AI-generated insights about the portfolio.
     
@@ -1207,7 +1434,7 @@ async def get_ai_insights(db: Session = Depends(get_db)) -> Dict:
 
 
 @router.get("/account-breakdown")
-async def get_account_breakdown(
+def get_account_breakdown(
     db: Session = Depends(get_db),
     fast: bool = Query(True, description="Use cached prices for faster response")
 ) -> Dict:
@@ -1244,52 +1471,26 @@ async def get_account_breakdown(
     # Account types that are tax-advantaged
     TAX_ADVANTAGED = {"TFSA", "RRSP", "SDRSP", "FHSA", "RESP", "LIRA", "RRIF", "PPF_INDIA"}
 
+    # Value all holdings at once in CAD (float64); holdings without a price
+    # use the snapshot value in notes, then cost basis
+    fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+    valuation = ValuationService.value_holdings(holdings, current_prices, fx)
+
     # Calculate breakdown
     by_account = defaultdict(lambda: {
-        "value_cad": Decimal("0"),
-        "cost_cad": Decimal("0"),
+        "value_cad": 0.0,
+        "cost_cad": 0.0,
         "holdings_count": 0,
         "holdings": []
     })
 
-    total_value = Decimal("0")
-    tax_advantaged_total = Decimal("0")
-    taxable_total = Decimal("0")
-
-    for holding in holdings:
-        price = current_prices.get(holding.symbol)
-        
-        # For holdings without live prices (e.g., mutual funds), use snapshot or cost basis
-        if price is None:
-            # Try to extract snapshot value from notes if available
-            # Format: "... | Snapshot: ₹XXX,XXX | ..."
-            snapshot_value = None
-            if holding.notes and "Snapshot:" in holding.notes:
-                import re
-                match = re.search(r'Snapshot: ₹([\d,]+)', holding.notes)
-                if match:
-                    try:
-                        snapshot_value = Decimal(match.group(1).replace(',', ''))
-                    except:
-                        pass
-            
-            if snapshot_value:
-                market_value = snapshot_value
-            else:
-                # Fall back to cost basis
-                market_value = holding.quantity * holding.avg_purchase_price
-        else:
-            market_value = holding.quantity * price
-        
-        cost_basis = holding.quantity * holding.avg_purchase_price
-
-        # Convert to CAD
-        if holding.currency != "CAD":
-            rate = CurrencyService.get_exchange_rate_sync(holding.currency, "CAD", db)
-            if rate:
-                market_value = market_value * rate
-                cost_basis = cost_basis * rate
+    total_value = 0.0
+    tax_advantaged_total = 0.0
+    taxable_total = 0.0
 
+    for holding, market_value, cost_basis in zip(
+        holdings, valuation.market_value_cad.tolist(), valuation.cost_cad.tolist()
+    ):
         total_value += market_value
 
         # Use account_type or default to "UNASSIGNED"
@@ -1317,29 +1518,29 @@ async def get_account_breakdown(
     result = {}
     for account_type, data in by_account.items():
         gain = data["value_cad"] - data["cost_cad"]
-        gain_pct = (gain / data["cost_cad"] * 100) if data["cost_cad"] > 0 else Decimal("0")
-        allocation_pct = (data["value_cad"] / total_value * 100) if total_value > 0 else Decimal("0")
+        gain_pct = (gain / data["cost_cad"] * 100) if data["cost_cad"] > 0 else 0.0
+        allocation_pct = (data["value_cad"] / total_value * 100) if total_value > 0 else 0.0
 
         result[account_type] = {
             "name": data.get("name", account_type),
-            "value_cad": float(data["value_cad"]),
-            "cost_cad": float(data["cost_cad"]),
-            "gain_cad": float(gain),
-            "gain_pct": float(gain_pct),
-            "allocation_pct": float(allocation_pct),
+            "value_cad": round(data["value_cad"], 2),
+            "cost_cad": round(data["cost_cad"], 2),
+            "gain_cad": round(gain, 2),
+            "gain_pct": gain_pct,
+            "allocation_pct": allocation_pct,
             "holdings_count": data["holdings_count"],
             "holdings": sorted(data["holdings"], key=lambda x: x["value_cad"], reverse=True),
             "is_tax_advantaged": account_type in TAX_ADVANTAGED
         }
 
-    tax_advantaged_pct = (tax_advantaged_total / total_value * 100) if total_value > 0 else Decimal("0")
+    tax_advantaged_pct = (tax_advantaged_total / total_value * 100) if total_value > 0 else 0.0
 
     return {
         "by_account_type": result,
-        "tax_advantaged_total": float(tax_advantaged_total),
-        "taxable_total": float(taxable_total),
-        "tax_advantaged_pct": float(tax_advantaged_pct),
-        "total_value_cad": float(total_value),
+        "tax_advantaged_total": round(tax_advantaged_total, 2),
+        "taxable_total": round(taxable_total, 2),
+        "tax_advantaged_pct": tax_advantaged_pct,
+        "total_value_cad": round(total_value, 2),
         "account_types_available": list(ACCOUNT_TYPES.keys()),
         "source": "cache" if fast else "live"
     }
@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import Float, Integer, and_, case, cast, func, select, type_coerce
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
+from decimal import Decimal
 from ..database import get_db
 from ..models.holding import Holding, ACCOUNT_TYPES
-from ..schemas.holding import HoldingCreate, HoldingUpdate, HoldingResponse
+from ..models.price import CurrentPriceCache, ExchangeRate
+from ..schemas.holding import (
+    HoldingCreate,
+    HoldingUpdate,
+    HoldingResponse,
+    HoldingEnriched,
+    HoldingRecomputeResult,
+    HoldingConsistencyReport,
+)
+from ..services.holding_recompute_service import HoldingRecomputeService
+from ..services.data_version_service import DataVersionService
+from ..services.currency_service import CurrencyService
+from ..services.valuation_service import SNAPSHOT_MARKER
+from ..utils.responses import FastRoute
 from datetime import datetime
 
-router = APIRouter(prefix="/holdings", tags=["holdings"])
+router = APIRouter(prefix="/holdings", tags=["holdings"], route_class=FastRoute)
+
+ENRICHED_SORT_COLUMNS = (
+    "symbol", "current_price", "market_value_cad", "total_cost_cad", "unrealized_gain_cad", "unrealized_gain_pct",
+)
 
 
 @router.get("/account-types")
@@ -22,6 +41,8 @@ def get_account_types():
 
 @router.get("/", response_model=List[HoldingResponse])
 def get_holdings(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     country: Optional[str] = Query(None, description="Filter by country code (CA, US, IN)"),
@@ -30,7 +51,17 @@ def get_holdings(
     account_id: Optional[str] = Query(None, description="Filter by account ID (71XW74U, HQ8BRWQ48CAD, etc.)"),
     db: Session = Depends(get_db)
 ):
-    """Get all active holdings with optional filters"""
+    """
+    Get all active holdings with optional filters.
+
+    Supports conditional requests: returns 304 if If-None-Match matches the current ETag.
+    """
+    not_modified = DataVersionService.not_modified(
+        request, response, ("holdings",), skip, limit, country, exchange, account_type, account_id
+    )
+    if not_modified:
+        return not_modified
+
     query = db.query(Holding).filter(Holding.is_active == True)
 
     if country:
@@ -46,6 +77,206 @@ def get_holdings(
     return holdings
 
 
+def _snapshot_value(notes):
+    """
+    SQL version of snapshot_value_from_notes: the statement value an import
+    recorded in notes, or NULL. With commas removed, the cast reads the leading
+    integer, where the pattern stops at the first other character.
+    """
+    start = func.instr(notes, SNAPSHOT_MARKER)
+    digits = func.replace(func.substr(notes, start + len(SNAPSHOT_MARKER)), ",", "")
+    return case(
+        (and_(start > 0, digits.op("GLOB")("[0-9]*")), cast(cast(digits, Integer), Float)),
+        else_=None,
+    )
+
+
+def _enriched_columns(pivot: str = "CAD") -> Tuple[dict, Any]:
+    """
+    Valuation columns for a holdings query joined to the price cache and to
+    each currency's latest stored rate to pivot (see _enriched_query).
+
+    Rates follow CurrencyService.get_exchange_rate_sync: latest stored rate,
+    then the fallback rate, then 1.0. As in ValuationService, holdings without
+    a cached price are valued at the snapshot value in their notes (price is
+    that value per share); with neither they have no market value or gain
+    (they sort last).
+    """
+    latest = select(
+        ExchangeRate.from_currency,
+        func.max(ExchangeRate.date).label("date"),
+    ).where(ExchangeRate.to_currency == pivot).group_by(ExchangeRate.from_currency).subquery()
+    fx = select(ExchangeRate.from_currency, ExchangeRate.rate).join(
+        latest, and_(ExchangeRate.from_currency == latest.c.from_currency, ExchangeRate.date == latest.c.date)
+    ).where(ExchangeRate.to_currency == pivot).subquery("fx")
+
+    fallback = {
+        key.split(":")[0]: float(rate)
+        for key, rate in CurrencyService.FALLBACK_RATES.items() if key.endswith(f":{pivot}")
+    }
+    rate = case(
+        (Holding.currency == pivot, 1.0),
+        else_=func.coalesce(fx.c.rate, case(fallback, value=Holding.currency, else_=1.0)),
+    )
+
+    snapshot_value = _snapshot_value(Holding.notes)
+    price = func.coalesce(CurrentPriceCache.price, snapshot_value / Holding.quantity)
+    market_value = func.coalesce(Holding.quantity * CurrentPriceCache.price, snapshot_value)
+    total_cost = Holding.quantity * Holding.avg_purchase_price
+    gain = market_value - total_cost
+    columns = {
+        "current_price": price,
+        "price_updated_at": CurrentPriceCache.updated_at,
+        "fx_rate_to_cad": rate,
+        "market_value": market_value,
+        "total_cost": total_cost,
+        "unrealized_gain": gain,
+        "unrealized_gain_pct": case((total_cost > 0, gain * 100.0 / total_cost), else_=None),
+        "market_value_cad": market_value * rate,
+        "total_cost_cad": total_cost * rate,
+        "unrealized_gain_cad": gain * rate,
+    }
+    # SQLite returns float arithmetic; read it as such and round on the way out
+    columns = {
+        name: column if name == "price_updated_at" else type_coerce(column, Float).label(name)
+        for name, column in columns.items()
+    }
+    return columns, fx
+
+
+def _enriched_query(db: Session, columns: dict, fx):
+    return db.query(Holding, *columns.values()).outerjoin(
+        CurrentPriceCache,
+        and_(CurrentPriceCache.symbol == Holding.symbol, CurrentPriceCache.exchange == Holding.exchange),
+    ).outerjoin(
+        fx, fx.c.from_currency == Holding.currency
+    ).filter(Holding.is_active == True)
+
+
+def _rounded(value: Optional[float], places: int = 2) -> Optional[Decimal]:
+    return None if value is None else Decimal(str(round(value, places)))
+
+
+@router.get("/enriched", response_model=List[HoldingEnriched])
+def get_enriched_holdings(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    country: Optional[str] = Query(None, description="Filter by country code (CA, US, IN)"),
+    exchange: Optional[str] = Query(None, description="Filter by exchange (TSX, NYSE, etc.)"),
+    account_type: Optional[str] = Query(None, description="Filter by account type (TFSA, RRSP, FHSA, NON_REG)"),
+    account_id: Optional[str] = Query(None, description="Filter by account ID"),
+    min_value_cad: Optional[float] = Query(None, description="Minimum market value in CAD"),
+    max_value_cad: Optional[float] = Query(None, description="Maximum market value in CAD"),
+    min_gain_pct: Optional[float] = Query(None, description="Minimum unrealized gain %"),
+    max_gain_pct: Optional[float] = Query(None, description="Maximum unrealized gain %"),
+    priced: Optional[bool] = Query(
+        None, description="Only holdings with (true) or without (false) a market value (cached price or snapshot)"
+    ),
+    sort_by: str = Query("market_value_cad", description=f"One of: {', '.join(ENRICHED_SORT_COLUMNS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get active holdings with current price, market value, cost and gain.
+
+    One SQL statement joins the price cache and each currency's latest
+    stored CAD rate and computes the values, so filtering and sorting by
+    them happen in the database. Prices are the cached ones (as fast=true
+    elsewhere), or the imported snapshot value for holdings without one;
+    refresh them via /prices. Supports conditional requests.
+    """
+    if sort_by not in ENRICHED_SORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by {sort_by}. Choose from: {', '.join(ENRICHED_SORT_COLUMNS)}"
+        )
+
+    not_modified = DataVersionService.not_modified(
+        request, response, ("holdings", "prices", "fx"),
+        skip, limit, country, exchange, account_type, account_id,
+        min_value_cad, max_value_cad, min_gain_pct, max_gain_pct, priced, sort_by, order,
+    )
+    if not_modified:
+        return not_modified
+
+    columns, fx = _enriched_columns()
+    query = _enriched_query(db, columns, fx)
+
+    if country:
+        query = query.filter(Holding.country == country)
+    if exchange:
+        query = query.filter(Holding.exchange == exchange)
+    if account_type:
+        query = query.filter(Holding.account_type == account_type)
+    if account_id:
+        query = query.filter(Holding.account_id == account_id)
+    if priced is not None:
+        market_value = columns["market_value"]
+        query = query.filter(market_value.isnot(None) if priced else market_value.is_(None))
+
+    value_cad = columns["market_value_cad"]
+    gain_pct = columns["unrealized_gain_pct"]
+    if min_value_cad is not None:
+        query = query.filter(value_cad >= min_value_cad)
+    if max_value_cad is not None:
+        query = query.filter(value_cad <= max_value_cad)
+    if min_gain_pct is not None:
+        query = query.filter(gain_pct >= min_gain_pct)
+    if max_gain_pct is not None:
+        query = query.filter(gain_pct <= max_gain_pct)
+
+    sort_column = Holding.symbol if sort_by == "symbol" else columns[sort_by]
+    sort_column = sort_column.desc() if order == "desc" else sort_column.asc()
+    rows = query.order_by(sort_column.nulls_last(), Holding.id).offset(skip).limit(limit).all()
+
+    results = []
+    for holding, *values in rows:
+        computed = dict(zip(columns, values))
+        for name, value in computed.items():
+            if name == "price_updated_at":
+                continue
+            places = 6 if name == "fx_rate_to_cad" else 4 if name == "current_price" else 2
+            computed[name] = _rounded(value, places)
+        results.append(HoldingEnriched(**HoldingResponse.model_validate(holding).model_dump(), **computed))
+    return results
+
+
+@router.post("/recompute", response_model=HoldingRecomputeResult)
+def recompute_holdings(
+    holding_id: Optional[int] = Query(None, description="Recompute a single holding (default: all)"),
+    dry_run: bool = Query(False, description="Report changes without saving"),
+    db: Session = Depends(get_db)
+):
+    """
+    Rebuild quantity, average cost and first purchase date from transactions.
+
+    Fixes holdings left inconsistent by out-of-order imports or transaction
+    edits. Each holding is replayed from its opening position (shares entered
+    outside the transaction log), so one whose transactions were all deleted
+    returns to that position; holdings never given transactions are not
+    changed.
+    """
+    if holding_id is not None and not db.query(Holding.id).filter(Holding.id == holding_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Holding with id {holding_id} not found"
+        )
+
+    return HoldingRecomputeService.recompute(
+        db,
+        holding_ids=[holding_id] if holding_id is not None else None,
+        dry_run=dry_run,
+    )
+
+
+@router.get("/consistency", response_model=HoldingConsistencyReport)
+def check_holdings_consistency(db: Session = Depends(get_db)):
+    """List holdings whose stored values disagree with their transaction history."""
+    return HoldingRecomputeService.check_consistency(db)
+
+
 @router.get("/{holding_id}", response_model=HoldingResponse)
 def get_holding(holding_id: int, db: Session = Depends(get_db)):
     """Get a single holding by ID"""
@@ -2,8 +2,9 @@
 Import router for handling CSV file imports from various brokers.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from decimal import Decimal
 
@@ -14,11 +15,13 @@ from ..schemas.import_schema import (
     ImportRequest,
     ImportPreviewResponse,
     ImportResult,
+    BulkImportResult,
     SupportedFormat,
 )
 from ..services.import_service import ImportService
 from ..services.kite_import_service import KiteImportService
 from ..models.holding import Holding
+from ..utils.responses import FastRoute
 
 
 class KiteImportRequest(BaseModel):
@@ -36,7 +39,74 @@ class KiteImportResult(BaseModel):
     warnings: List[str]
     holdings: List[dict]
 
-router = APIRouter(prefix="/import", tags=["import"])
+router = APIRouter(prefix="/import", tags=["import"], route_class=FastRoute)
+
+
+def _existing_holdings_by_symbol(db: Session, symbols: List[str], account_type: str) -> Dict[str, Holding]:
+    """Load existing holdings for an account type in one query, keyed by symbol."""
+    existing = db.query(Holding).filter(
+        Holding.symbol.in_(symbols),
+        Holding.account_type == account_type
+    ).order_by(Holding.id).all()
+
+    by_symbol = {}
+    for holding in existing:
+        by_symbol.setdefault(holding.symbol, holding)
+    return by_symbol
+
+
+def _upsert_kite_holdings(db: Session, holdings: list, account_type: str) -> Tuple[int, int]:
+    """Create or update holdings from aggregated Kite data. Returns (created, updated)."""
+    existing_by_symbol = _existing_holdings_by_symbol(db, [h.symbol for h in holdings], account_type)
+    created = 0
+    updated = 0
+
+    for h in holdings:
+        existing = existing_by_symbol.get(h.symbol)
+
+        if existing:
+            existing.quantity = h.quantity
+            existing.avg_purchase_price = h.avg_cost
+            existing.exchange = h.exchange
+            existing.is_active = True
+            updated += 1
+        else:
+            new_holding = Holding(
+                symbol=h.symbol,
+                company_name=h.symbol,  # Will be enriched later
+                exchange=h.exchange,
+                country="IN",
+                quantity=h.quantity,
+                avg_purchase_price=h.avg_cost,
+                currency="INR",
+                account_type=account_type,
+                is_active=True,
+            )
+            db.add(new_holding)
+            existing_by_symbol[h.symbol] = new_holding
+            created += 1
+
+    return created, updated
+
+
+def _import_prepared_batch(
+    db: Session,
+    preview_token: str,
+    platform: ImportPlatform,
+    account_type: Optional[str],
+    skip_duplicates: bool
+) -> ImportResult:
+    """Apply a batch stored by a preview, or raise if it has expired or its options differ."""
+    try:
+        batch = ImportService.take_prepared_batch(preview_token, platform, account_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if batch is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Import preview has expired. Please upload the file again."
+        )
+    return ImportService.import_prepared_batch(db, batch, skip_duplicates)
 
 
 @router.get("/formats", response_model=List[SupportedFormat])
@@ -83,16 +153,29 @@ def import_transactions(
 
     Creates holdings for new symbols and updates existing holdings.
     Skips duplicate transactions if skip_duplicates is True.
+    Pass preview_token from /preview instead of file_content to import the
+    already-parsed batch.
     """
-    try:
-        result = ImportService.import_transactions(
-            db=db,
-            content=request.file_content,
-            platform=request.platform,
-            account_type=request.account_type,
-            skip_duplicates=request.skip_duplicates,
+    if not request.preview_token and not request.file_content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either file_content or preview_token is required"
         )
 
+    try:
+        if request.preview_token:
+            result = _import_prepared_batch(
+                db, request.preview_token, request.platform, request.account_type, request.skip_duplicates
+            )
+        else:
+            result = ImportService.import_transactions(
+                db=db,
+                content=request.file_content,
+                platform=request.platform,
+                account_type=request.account_type,
+                skip_duplicates=request.skip_duplicates,
+            )
+
         if not result.success:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -112,35 +195,50 @@ def import_transactions(
 
 @router.post("/upload", response_model=ImportResult)
 async def upload_and_import(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
     platform: ImportPlatform = Form(...),
     account_type: Optional[str] = Form(None),
     skip_duplicates: bool = Form(True),
+    preview_token: Optional[str] = Form(None),
     db: Session = Depends(get_db)
 ):
     """
     Upload a CSV file and import transactions.
 
     Alternative endpoint that accepts file upload directly instead of base64-encoded content.
+    If preview_token from /upload/preview is given, the file can be omitted and the
+    batch parsed during preview is imported directly.
     """
-    # Validate file type
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only CSV files are supported"
-        )
+    if preview_token is None:
+        if file is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Either file or preview_token is required"
+            )
+        # Validate file type
+        if not file.filename.endswith('.csv'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only CSV files are supported"
+            )
 
     try:
-        content = await file.read()
-        content_str = content.decode('utf-8')
+        if preview_token:
+            result = await run_in_threadpool(
+                _import_prepared_batch, db, preview_token, platform, account_type, skip_duplicates
+            )
+        else:
+            content = await file.read()
+            content_str = content.decode('utf-8')
 
-        result = ImportService.import_transactions(
-            db=db,
-            content=content_str,
-            platform=platform,
-            account_type=account_type,
-            skip_duplicates=skip_duplicates,
-        )
+            result = await run_in_threadpool(
+                ImportService.import_transactions,
+                db=db,
+                content=content_str,
+                platform=platform,
+                account_type=account_type,
+                skip_duplicates=skip_duplicates,
+            )
 
         if not result.success:
             raise HTTPException(
@@ -187,7 +285,8 @@ async def upload_and_preview(
         content = await file.read()
         content_str = content.decode('utf-8')
 
-        return ImportService.preview_import(
+        return await run_in_threadpool(
+            ImportService.preview_import,
             db=db,
             content=content_str,
             platform=platform,
@@ -206,7 +305,7 @@ async def upload_and_preview(
         )
 
 
-@router.post("/upload/bulk", response_model=ImportResult)
+@router.post("/upload/bulk", response_model=BulkImportResult)
 async def upload_bulk_import(
     files: List[UploadFile] = File(...),
     platform: ImportPlatform = Form(...),
@@ -217,7 +316,9 @@ async def upload_bulk_import(
     """
     Upload multiple CSV files and import all transactions.
 
-    Processes all files in order and combines results.
+    Files are parsed in parallel (off the event loop), merged and sorted by date before holdings are
+    updated, and written in one database transaction with per-file isolation.
+    The response includes a per-file breakdown with parse and write timings.
     """
     # Validate all files are CSV
     for file in files:
@@ -227,50 +328,25 @@ async def upload_bulk_import(
                 detail=f"Only CSV files are supported. Got: {file.filename}"
             )
 
-    total_result = ImportResult(
-        success=True,
-        transactions_imported=0,
-        holdings_created=0,
-        holdings_updated=0,
-        duplicates_skipped=0,
-        account_types_updated=0,
-        errors=[],
-        warnings=[],
-    )
-
-    for file in files:
-        try:
-            content = await file.read()
-            content_str = content.decode('utf-8')
-
-            result = ImportService.import_transactions(
-                db=db,
-                content=content_str,
-                platform=platform,
-                account_type=account_type,
-                skip_duplicates=skip_duplicates,
-            )
-
-            # Aggregate results
-            total_result.transactions_imported += result.transactions_imported
-            total_result.holdings_created += result.holdings_created
-            total_result.holdings_updated += result.holdings_updated
-            total_result.duplicates_skipped += result.duplicates_skipped
-            total_result.account_types_updated += result.account_types_updated
-            total_result.errors.extend([f"{file.filename}: {e}" for e in result.errors])
-            total_result.warnings.extend([f"{file.filename}: {w}" for w in result.warnings])
-
-            if not result.success:
-                total_result.success = False
-
-        except UnicodeDecodeError:
-            total_result.errors.append(f"{file.filename}: File encoding not supported")
-            total_result.success = False
-        except Exception as e:
-            total_result.errors.append(f"{file.filename}: {str(e)}")
-            total_result.success = False
+    try:
+        contents = [(file.filename, await file.read()) for file in files]
+        parsed = await ImportService.parse_files_async(contents, platform, account_type)
+
+        return await run_in_threadpool(
+            ImportService.import_transactions_bulk,
+            db,
+            contents,
+            platform,
+            account_type,
+            skip_duplicates,
+            parsed,
+        )
 
-    return total_result
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Import error: {str(e)}"
+        )
 
 
 @router.post("/kite", response_model=KiteImportResult)
@@ -301,40 +377,10 @@ def import_kite_holdings(
                 holdings=[],
             )
         
-        created = 0
-        updated = 0
+        created, updated = _upsert_kite_holdings(db, holdings, request.account_type)
         result_holdings = []
         
         for h in holdings:
-            # Check if holding exists
-            existing = db.query(Holding).filter(
-                Holding.symbol == h.symbol,
-                Holding.account_type == request.account_type
-            ).first()
-            
-            if existing:
-                # Update existing
-                existing.quantity = h.quantity
-                existing.avg_purchase_price = h.avg_cost
-                existing.exchange = h.exchange
-                existing.is_active = True
-                updated += 1
-            else:
-                # Create new holding
-                new_holding = Holding(
-                    symbol=h.symbol,
-                    company_name=h.symbol,  # Will be enriched later
-                    exchange=h.exchange,
-                    country="IN",
-                    quantity=h.quantity,
-                    avg_purchase_price=h.avg_cost,
-                    currency="INR",
-                    account_type=request.account_type,
-                    is_active=True,
-                )
-                db.add(new_holding)
-                created += 1
-            
             result_holdings.append({
                 "symbol": h.symbol,
                 "exchange": h.exchange,
@@ -389,7 +435,7 @@ async def upload_kite_files(
             file_bytes.append(content)
         
         # Parse and aggregate holdings
-        holdings, warnings = KiteImportService.parse_multiple_files(file_bytes)
+        holdings, warnings = await run_in_threadpool(KiteImportService.parse_multiple_files, file_bytes)
         
         if not holdings:
             return KiteImportResult(
@@ -401,38 +447,10 @@ async def upload_kite_files(
                 holdings=[],
             )
         
-        created = 0
-        updated = 0
+        created, updated = await run_in_threadpool(_upsert_kite_holdings, db, holdings, account_type)
         result_holdings = []
         
         for h in holdings:
-            # Check if holding exists
-            existing = db.query(Holding).filter(
-                Holding.symbol == h.symbol,
-                Holding.account_type == account_type
-            ).first()
-            
-            if existing:
-                existing.quantity = h.quantity
-                existing.avg_purchase_price = h.avg_cost
-                existing.exchange = h.exchange
-                existing.is_active = True
-                updated += 1
-            else:
-                new_holding = Holding(
-                    symbol=h.symbol,
-                    company_name=h.symbol,
-                    exchange=h.exchange,
-                    country="IN",
-                    quantity=h.quantity,
-                    avg_purchase_price=h.avg_cost,
-                    currency="INR",
-                    account_type=account_type,
-                    is_active=True,
-                )
-                db.add(new_holding)
-                created += 1
-            
             # Calculate invested value (remaining cost basis)
             invested = float(h.quantity * h.avg_cost)
             result_holdings.append({
@@ -443,7 +461,7 @@ async def upload_kite_files(
                 "invested_value": invested,
             })
         
-        db.commit()
+        await run_in_threadpool(db.commit)
         
         return KiteImportResult(
             success=True,
@@ -527,18 +545,15 @@ def import_groww_holdings(
         total_current = Decimal("0")
         total_returns = Decimal("0")
         
-        for h in holdings:
-            # Generate symbol (include folio to distinguish same fund in different accounts)
-            symbol = GrowwImportService.generate_symbol(h.scheme_name, h.amc, h.folio_no)
-            
+        # Generate symbols (include folio to distinguish same fund in different accounts)
+        symbols = [GrowwImportService.generate_symbol(h.scheme_name, h.amc, h.folio_no) for h in holdings]
+        existing_by_symbol = _existing_holdings_by_symbol(db, symbols, request.account_type)
+        
+        for h, symbol in zip(holdings, symbols):
             # Calculate avg price (NAV at purchase)
             avg_nav = h.invested_value / h.units if h.units > 0 else Decimal("0")
             
-            # Check if holding exists
-            existing = db.query(Holding).filter(
-                Holding.symbol == symbol,
-                Holding.account_type == request.account_type
-            ).first()
+            existing = existing_by_symbol.get(symbol)
             
             # Calculate P&L percentage
             pnl_pct = (h.returns / h.invested_value * 100) if h.invested_value > 0 else Decimal("0")
@@ -570,6 +585,7 @@ def import_groww_holdings(
                     notes=notes,
                 )
                 db.add(new_holding)
+                existing_by_symbol[symbol] = new_holding
                 created += 1
             
             total_invested += h.invested_value
@@ -11,11 +11,12 @@ from ..services.price_service import PriceService
 from ..services.mock_price_service import MockPriceService
 from ..services.snapshot_service import SnapshotService
 from ..config import settings
+from ..utils.responses import FastRoute
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/prices", tags=["prices"])
+router = APIRouter(prefix="/prices", tags=["prices"], route_class=FastRoute)
 
 # Select price service based on config
 def get_price_service():
@@ -69,10 +70,11 @@ def save_prices_to_cache(db: Session, holdings: list, prices: Dict):
 
 
 @router.get("/cached")
-async def get_cached_prices(db: Session = Depends(get_db)) -> Dict:
+def get_cached_prices(db: Session = Depends(get_db)) -> Dict:
     """
     Get cached prices from database - INSTANT response, no external API calls.
     Use this for initial page load, then refresh with /current in background.
+    Staleness is judged against the current time, so this has no ETag.
     """
     holdings = db.query(Holding).filter(Holding.is_active == True).all()
     
@@ -138,7 +140,7 @@ async def get_cached_prices(db: Session = Depends(get_db)) -> Dict:
 
 
 @router.get("/current")
-async def get_current_prices(db: Session = Depends(get_db)) -> Dict:
+def get_current_prices(db: Session = Depends(get_db)) -> Dict:
     """Get current prices for all active holdings (fetches from yfinance)"""
     holdings = db.query(Holding).filter(Holding.is_active == True).all()
 
@@ -176,7 +178,7 @@ async def get_current_prices(db: Session = Depends(get_db)) -> Dict:
 
 
 @router.get("/{symbol}")
-async def get_price_by_symbol(
+def get_price_by_symbol(
     symbol: str,
     exchange: str = "TSX",
     db: Session = Depends(get_db)
@@ -199,7 +201,7 @@ async def get_price_by_symbol(
 
 
 @router.post("/refresh")
-async def refresh_prices(db: Session = Depends(get_db)) -> Dict:
+def refresh_prices(db: Session = Depends(get_db)) -> Dict:
     """Force refresh all prices (clear cache and fetch new)"""
     PriceService.clear_cache()
 
@@ -256,7 +258,7 @@ async def refresh_prices(db: Session = Depends(get_db)) -> Dict:
 
 
 @router.get("/history/{symbol}")
-async def get_price_history(
+def get_price_history(
     symbol: str,
     exchange: str = "TSX",
     days: int = 30,
@@ -3,25 +3,31 @@ Portfolio Snapshots Router
 
 API endpoints for portfolio value snapshots and historical data.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Literal, Optional
 import logging
 
 from ..database import get_db
 from ..models.portfolio_snapshot import PortfolioSnapshot
+from ..models.holding_daily_value import HoldingDailyValue
+from ..models.portfolio_region_value import PortfolioRegionValue
 from ..schemas.snapshot import (
     PortfolioSnapshotResponse,
-    PortfolioHistoryResponse
+    PortfolioHistoryResponse,
+    PortfolioHistoryCompactResponse,
+    PortfolioHistoryBreakdownResponse,
 )
 from ..services.snapshot_service import SnapshotService
+from ..services.data_version_service import DataVersionService
 from ..routers.analytics import calculate_portfolio_summary
+from ..utils.responses import FastRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["snapshots"])
+router = APIRouter(tags=["snapshots"], route_class=FastRoute)
 
 
 @router.post("/snapshots/create", response_model=PortfolioSnapshotResponse)
@@ -78,7 +84,7 @@ def get_snapshot_by_date(
 
 
 @router.get("/portfolio/history", response_model=PortfolioHistoryResponse)
-async def get_portfolio_history(
+def get_portfolio_history(
     days: int = Query(default=30, ge=1, le=3650, description="Number of days of history"),
     db: Session = Depends(get_db)
 ):
@@ -89,6 +95,9 @@ async def get_portfolio_history(
     - List of snapshots
     - Date range
     - Current value and change from start
+
+    The current value comes from live prices, so unlike the compact and
+    breakdown endpoints this one has no ETag.
     """
     try:
         # Get snapshots for the requested period
@@ -96,7 +105,7 @@ async def get_portfolio_history(
 
         if not snapshots:
             # No snapshots exist yet, return empty history
-            summary = await calculate_portfolio_summary(db)
+            summary = calculate_portfolio_summary(db)
             return PortfolioHistoryResponse(
                 snapshots=[],
                 start_date=date.today() - timedelta(days=days),
@@ -108,7 +117,7 @@ async def get_portfolio_history(
             )
 
         # Get current portfolio value
-        summary = await calculate_portfolio_summary(db)
+        summary = calculate_portfolio_summary(db)
         current_value = Decimal(str(summary['total_value_cad']))
 
         # Calculate change from first snapshot
@@ -134,6 +143,63 @@ async def get_portfolio_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/portfolio/history/compact", response_model=PortfolioHistoryCompactResponse)
+def get_portfolio_history_compact(
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=3650, description="Number of days of history"),
+    interval: Literal["daily", "weekly", "monthly"] = Query(
+        default="daily", description="Keep one point per day, week or month"
+    ),
+    since: Optional[date] = Query(default=None, description="Only return points from this date's period onward"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get portfolio value history as compact, delta-encoded columns.
+
+    Reads only snapshot dates and totals, so ten years of history is a few KB.
+    Pass the last date the client has as since to fetch just the new points.
+    Returns 304 if If-None-Match matches the current ETag.
+    """
+    not_modified = DataVersionService.not_modified(
+        request, response, ("snapshots",), days, interval, since, date.today()
+    )
+    if not_modified:
+        return not_modified
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    return SnapshotService.get_compact_history(db, start_date, end_date, interval, since)
+
+
+@router.get("/portfolio/history/breakdown", response_model=PortfolioHistoryBreakdownResponse)
+def get_portfolio_history_breakdown(
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=3650, description="Number of days of history"),
+    group_by: Literal["account_type", "country", "symbol", "currency"] = Query(
+        default="account_type", description="Holding attribute to split history by"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Get portfolio value history split by account type, country, symbol or currency.
+
+    Reads the per-holding values stored with each snapshot, so no transactions
+    are replayed. Dates without a snapshot are not included.
+    Returns 304 if If-None-Match matches the current ETag.
+    """
+    not_modified = DataVersionService.not_modified(
+        request, response, ("snapshots", "holdings"), days, group_by, date.today()
+    )
+    if not_modified:
+        return not_modified
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    return SnapshotService.get_history_breakdown(db, start_date, end_date, group_by)
+
+
 @router.post("/snapshots/backfill")
 def backfill_snapshots(
     start_date: date = Query(..., description="Start date for backfill"),
@@ -175,6 +241,8 @@ def clear_all_snapshots(db: Session = Depends(get_db)):
     """
     try:
         count = db.query(PortfolioSnapshot).delete()
+        db.query(HoldingDailyValue).delete()
+        db.query(PortfolioRegionValue).delete()
         db.commit()
         logger.info(f"Deleted {count} snapshots")
         return {
@@ -0,0 +1,60 @@
+"""
+Stream Router
+
+Server-Sent Events endpoint for live portfolio updates.
+"""
+import asyncio
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..services.stream_service import StreamService
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+
+@router.get("")
+async def stream_updates(request: Request):
+    """
+    Subscribe to live portfolio updates (text/event-stream).
+
+    Events:
+    - prices: {symbol: {price, change, change_pct}} for symbols whose price changed
+    - summary: {region, summary} when a region's portfolio summary changed
+
+    The latest known values are sent on connect. All connected clients share
+    one refresh cycle, so open dashboards don't need to poll.
+    """
+    queue = StreamService.subscribe()
+
+    async def event_generator():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield f"retry: {settings.stream_keepalive_seconds * 1000}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.stream_keepalive_seconds)
+                    yield message
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+        finally:
+            StreamService.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        },
+    )
+
+
+@router.get("/status")
+def stream_status():
+    """Number of connected stream subscribers."""
+    return {
+        "subscribers": StreamService.subscriber_count(),
+        "refresh_seconds": settings.stream_refresh_seconds,
+    }
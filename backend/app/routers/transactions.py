@@ -1,47 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.orm import Query as SqlQuery, Session
+from typing import List, Optional, Tuple
 from datetime import date
+from decimal import Decimal
+import base64
 from ..database import get_db
 from ..models.transaction import Transaction
 from ..models.holding import Holding
-from ..schemas.transaction import TransactionCreate, TransactionResponse
+from ..schemas.transaction import TransactionCreate, TransactionResponse, TransactionPage, TransactionTotals
+from ..services.holding_recompute_service import HoldingRecomputeService
+from ..services.ledger_sync_service import LedgerSyncService
+from ..utils.responses import FastRoute
 
-router = APIRouter(prefix="/transactions", tags=["transactions"])
+router = APIRouter(prefix="/transactions", tags=["transactions"], route_class=FastRoute)
 
 
-@router.get("/", response_model=List[TransactionResponse])
-def get_transactions(
-    skip: int = 0,
-    limit: int = 100,
+def _apply_filters(
+    query: SqlQuery,
     holding_id: Optional[int] = None,
+    symbol: Optional[str] = None,
     transaction_type: Optional[str] = None,
     start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db)
-):
-    """Get all transactions with optional filters"""
-    query = db.query(Transaction)
-
+    end_date: Optional[date] = None
+) -> SqlQuery:
     if holding_id:
         query = query.filter(Transaction.holding_id == holding_id)
+    if symbol:
+        query = query.filter(Transaction.symbol == symbol.upper())
     if transaction_type:
         query = query.filter(Transaction.transaction_type == transaction_type.upper())
     if start_date:
         query = query.filter(Transaction.transaction_date >= start_date)
     if end_date:
         query = query.filter(Transaction.transaction_date <= end_date)
+    return query
+
+
+def _encode_cursor(transaction_date: date, transaction_id: int) -> str:
+    raw = f"{transaction_date.isoformat()}:{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        transaction_date, transaction_id = raw.split(":")
+        return date.fromisoformat(transaction_date), int(transaction_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _totals(db: Session, **filters) -> TransactionTotals:
+    """Counts and amounts for the filtered transactions in one aggregate query."""
+    amount = Transaction.quantity * Transaction.price_per_share
+    is_buy = Transaction.transaction_type == "BUY"
+    count, buy_count, buy_amount, sell_amount, fees, first_date, last_date = _apply_filters(
+        db.query(
+            func.count(Transaction.id),
+            func.sum(case((is_buy, 1), else_=0)),
+            func.sum(case((is_buy, amount), else_=0)),
+            func.sum(case((is_buy, 0), else_=amount)),
+            func.sum(Transaction.fees),
+            func.min(Transaction.transaction_date),
+            func.max(Transaction.transaction_date),
+        ),
+        **filters
+    ).one()
+
+    # Decimal(str()) since SQLite returns sums as floats
+    return TransactionTotals(
+        count=count,
+        buy_count=buy_count or 0,
+        sell_count=count - (buy_count or 0),
+        buy_amount=Decimal(str(buy_amount or 0)).quantize(Decimal("0.01")),
+        sell_amount=Decimal(str(sell_amount or 0)).quantize(Decimal("0.01")),
+        fees=Decimal(str(fees or 0)).quantize(Decimal("0.01")),
+        first_date=first_date,
+        last_date=last_date,
+    )
+
+
+@router.get("/", response_model=List[TransactionResponse])
+def get_transactions(
+    skip: int = 0,
+    limit: int = 100,
+    holding_id: Optional[int] = None,
+    transaction_type: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Get all transactions with optional filters (offset paging; prefer /page for long histories)"""
+    query = _apply_filters(
+        db.query(Transaction),
+        holding_id=holding_id,
+        transaction_type=transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
 
     transactions = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
     return transactions
 
 
+@router.get("/page", response_model=TransactionPage)
+def get_transactions_page(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort by date (then id): newest or oldest first"),
+    holding_id: Optional[int] = None,
+    symbol: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    include_totals: bool = Query(True, description="Add totals for all matching transactions to the first page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get transactions one page at a time using keyset pagination.
+
+    Pages are ordered by (transaction_date, id) and each one continues after
+    the last row of the previous page instead of skipping an offset, so every
+    page is an index range scan regardless of how deep it is. Pass the same
+    filters and order with each cursor. Totals are aggregated over all
+    matching transactions and returned with the first page only.
+    """
+    filters = dict(
+        holding_id=holding_id,
+        symbol=symbol,
+        transaction_type=transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    query = _apply_filters(db.query(Transaction), **filters)
+
+    key = tuple_(Transaction.transaction_date, Transaction.id)
+    if cursor:
+        after = tuple_(*_decode_cursor(cursor))
+        query = query.filter(key < after if order == "desc" else key > after)
+
+    if order == "desc":
+        query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+    else:
+        query = query.order_by(Transaction.transaction_date, Transaction.id)
+
+    # One extra row tells whether another page follows
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    return TransactionPage(
+        items=items,
+        next_cursor=_encode_cursor(items[-1].transaction_date, items[-1].id) if has_more else None,
+        has_more=has_more,
+        totals=_totals(db, **filters) if include_totals and not cursor else None,
+    )
+
+
 @router.get("/holding/{holding_id}", response_model=List[TransactionResponse])
 def get_transactions_by_holding(
     holding_id: int,
+    limit: Optional[int] = Query(None, ge=1, description="Most recent N transactions (default: all)"),
     db: Session = Depends(get_db)
 ):
-    """Get all transactions for a specific holding"""
+    """Get transactions for a specific holding, newest first (use /page?holding_id= to page through)"""
     # Verify holding exists
     holding = db.query(Holding).filter(Holding.id == holding_id).first()
     if not holding:
@@ -50,16 +176,28 @@ def get_transactions_by_holding(
             detail=f"Holding with id {holding_id} not found"
         )
 
-    transactions = db.query(Transaction).filter(
+    query = db.query(Transaction).filter(
         Transaction.holding_id == holding_id
-    ).order_by(Transaction.transaction_date.desc()).all()
+    ).order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+    if limit:
+        query = query.limit(limit)
+    transactions = query.all()
 
     return transactions
 
 
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
-    """Create a new transaction"""
+def create_transaction(
+    transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Create a new transaction.
+
+    The holding is updated immediately; snapshots and per-holding history
+    from the transaction date on are recomputed after the response.
+    """
     # Verify holding exists
     holding = db.query(Holding).filter(
         Holding.id == transaction.holding_id,
@@ -79,35 +217,60 @@ def create_transaction(transaction: TransactionCreate, db: Session = Depends(get
             detail=f"Symbol mismatch: holding has {holding.symbol}, transaction has {transaction.symbol}"
         )
 
+    if transaction.transaction_type == "SELL" and holding.quantity < transaction.quantity:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sell {transaction.quantity} shares, only {holding.quantity} available"
+        )
+
+    latest_date = db.query(func.max(Transaction.transaction_date)).filter(
+        Transaction.holding_id == holding.id
+    ).scalar()
+
+    # Keep shares entered outside the ledger when the holding is rebuilt from it
+    HoldingRecomputeService.record_openings(db, [holding])
+
     # Create transaction
     db_transaction = Transaction(**transaction.model_dump())
     db.add(db_transaction)
 
-    # Update holding's average cost and quantity
-    if transaction.transaction_type == "BUY":
-        total_cost = (holding.quantity * holding.avg_purchase_price) + \
-                     (transaction.quantity * transaction.price_per_share) + \
-                     transaction.fees
-        holding.quantity += transaction.quantity
-        holding.avg_purchase_price = total_cost / holding.quantity
-    elif transaction.transaction_type == "SELL":
-        if holding.quantity < transaction.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Cannot sell {transaction.quantity} shares, only {holding.quantity} available"
-            )
-        holding.quantity -= transaction.quantity
-        # Average cost stays the same on sell
+    if latest_date is not None and transaction.transaction_date < latest_date:
+        # Backdated: average cost depends on order, so rebuild from the full history
+        db.flush()
+        HoldingRecomputeService.recompute(db, holding_ids=[holding.id], commit=False)
+    else:
+        HoldingRecomputeService.apply_transaction(
+            holding,
+            transaction.transaction_type,
+            transaction.quantity,
+            transaction.price_per_share,
+            transaction.fees,
+            transaction.transaction_date,
+            transaction.symbol,
+        )
 
+    LedgerSyncService.mark_dirty(db, holding.id, transaction.transaction_date)
     db.commit()
     db.refresh(db_transaction)
+    background_tasks.add_task(LedgerSyncService.process_quietly)
 
     return db_transaction
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    """Delete a transaction"""
+def delete_transaction(
+    transaction_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Delete a transaction.
+
+    The holding is rebuilt immediately; snapshots and per-holding history
+    from the transaction date on are recomputed after the response. Deleting
+    a holding's last transaction returns it to its opening position, and
+    closes it if it had none.
+    """
     db_transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id
     ).first()
@@ -118,7 +281,20 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
             detail=f"Transaction with id {transaction_id} not found"
         )
 
+    holding_id = db_transaction.holding_id
+    transaction_date = db_transaction.transaction_date
+    holding = db.query(Holding).filter(Holding.id == holding_id).first()
+    if holding is not None:
+        HoldingRecomputeService.record_openings(db, [holding])
     db.delete(db_transaction)
+    db.flush()
+
+    # Rebuild the holding without the deleted transaction (back to its opening
+    # position if it was the last one)
+    HoldingRecomputeService.recompute(db, holding_ids=[holding_id], commit=False)
+
+    LedgerSyncService.mark_dirty(db, holding_id, transaction_date)
     db.commit()
+    background_tasks.add_task(LedgerSyncService.process_quietly)
 
     return None
@@ -1,10 +1,22 @@
-from .holding import HoldingCreate, HoldingUpdate, HoldingResponse, HoldingWithPrice
-from .transaction import TransactionCreate, TransactionResponse
+from .holding import (
+    HoldingCreate,
+    HoldingUpdate,
+    HoldingResponse,
+    HoldingWithPrice,
+    HoldingEnriched,
+    HoldingRecomputeItem,
+    HoldingRecomputeResult,
+    HoldingConsistencyReport,
+)
+from .transaction import TransactionCreate, TransactionResponse, TransactionTotals, TransactionPage
 from .portfolio import PortfolioSummary
 from .snapshot import (
     PortfolioSnapshotCreate,
     PortfolioSnapshotResponse,
-    PortfolioHistoryResponse
+    PortfolioHistoryResponse,
+    PortfolioHistoryCompactResponse,
+    HistoryBreakdownSeries,
+    PortfolioHistoryBreakdownResponse,
 )
 from .import_schema import (
     ImportPlatform,
@@ -13,6 +25,8 @@ from .import_schema import (
     ImportRequest,
     ImportPreviewResponse,
     ImportResult,
+    FileImportResult,
+    BulkImportResult,
     SupportedFormat,
 )
 
@@ -21,17 +35,28 @@ __all__ = [
     "HoldingUpdate",
     "HoldingResponse",
     "HoldingWithPrice",
+    "HoldingEnriched",
+    "HoldingRecomputeItem",
+    "HoldingRecomputeResult",
+    "HoldingConsistencyReport",
     "TransactionCreate",
     "TransactionResponse",
+    "TransactionTotals",
+    "TransactionPage",
     "PortfolioSummary",
     "PortfolioSnapshotCreate",
     "PortfolioSnapshotResponse",
     "PortfolioHistoryResponse",
+    "PortfolioHistoryCompactResponse",
+    "HistoryBreakdownSeries",
+    "PortfolioHistoryBreakdownResponse",
     "ImportPlatform",
     "ParsedTransaction",
     "ImportPreviewRequest",
     "ImportRequest",
     "ImportPreviewResponse",
     "ImportResult",
+    "FileImportResult",
+    "BulkImportResult",
     "SupportedFormat",
 ]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
@@ -62,3 +62,46 @@ class HoldingWithPrice(HoldingResponse):
     total_cost: Optional[Decimal] = None
     unrealized_gain: Optional[Decimal] = None
     unrealized_gain_pct: Optional[Decimal] = None
+
+
+class HoldingEnriched(HoldingWithPrice):
+    """Holding valued at its cached price and latest stored rate to CAD (computed in SQL)."""
+    price_updated_at: Optional[datetime] = None
+    fx_rate_to_cad: Decimal
+    market_value_cad: Optional[Decimal] = None
+    total_cost_cad: Decimal
+    unrealized_gain_cad: Optional[Decimal] = None
+
+
+class HoldingRecomputeItem(BaseModel):
+    """A holding's position rebuilt from its transactions, next to the stored values."""
+    holding_id: int
+    symbol: str
+    account_type: Optional[str] = None
+    transactions: int
+    quantity: Decimal
+    avg_purchase_price: Decimal
+    first_purchase_date: Optional[date] = None
+    previous_quantity: Decimal
+    previous_avg_purchase_price: Decimal
+    changed: bool
+    is_active: bool
+
+
+class HoldingRecomputeResult(BaseModel):
+    """Result of recomputing holdings from transactions."""
+    holdings_recomputed: int
+    holdings_changed: int
+    transactions_processed: int
+    elapsed_ms: float
+    dry_run: bool = False
+    warnings: List[str] = []
+    holdings: List[HoldingRecomputeItem] = []
+
+
+class HoldingConsistencyReport(BaseModel):
+    """Holdings whose stored quantity or cost basis disagrees with their transactions."""
+    holdings_checked: int
+    inconsistent: int
+    warnings: List[str] = []
+    holdings: List[HoldingRecomputeItem] = []
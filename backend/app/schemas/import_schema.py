@@ -53,7 +53,8 @@ class ImportPreviewRequest(BaseModel):
 class ImportRequest(BaseModel):
     """Request to import transactions."""
     platform: ImportPlatform
-    file_content: str  # Base64 encoded or raw CSV content
+    file_content: Optional[str] = None  # Base64 encoded or raw CSV content
+    preview_token: Optional[str] = None  # From a preview; used instead of file_content
     account_type: Optional[str] = None
     skip_duplicates: bool = True
 
@@ -69,6 +70,7 @@ class ImportPreviewResponse(BaseModel):
     existing_symbols: List[str]  # Symbols already in holdings
     potential_duplicates: int
     warnings: List[str] = []
+    preview_token: Optional[str] = None  # Pass to import to apply this batch without re-uploading
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -87,6 +89,25 @@ class ImportResult(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FileImportResult(BaseModel):
+    """Per-file outcome of a bulk import."""
+    filename: str
+    success: bool
+    transactions_parsed: int = 0
+    transactions_imported: int = 0
+    duplicates_skipped: int = 0
+    parse_ms: float = 0
+    write_ms: float = 0
+    errors: List[str] = []
+    warnings: List[str] = []
+
+
+class BulkImportResult(ImportResult):
+    """Result of a multi-file import, with per-file breakdown and timing."""
+    files: List[FileImportResult] = []
+    total_ms: float = 0
+
+
 class SupportedFormat(BaseModel):
     """Information about a supported import format."""
     platform: str
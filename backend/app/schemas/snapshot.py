@@ -6,7 +6,7 @@ Pydantic models for portfolio snapshot data validation.
 from pydantic import BaseModel, Field
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 
 class PortfolioSnapshotBase(BaseModel):
@@ -47,3 +47,36 @@ class PortfolioHistoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PortfolioHistoryCompactResponse(BaseModel):
+    """
+    Portfolio history as delta-encoded columns.
+
+    Point i is dated base_date + sum(day_deltas[:i+1]) and its value in cents is
+    sum(value_cents[:i+1]); cost_cents works the same way.
+    """
+    interval: str
+    start_date: date
+    end_date: date
+    count: int
+    base_date: Optional[date] = None
+    day_deltas: List[int]
+    value_cents: List[int]
+    cost_cents: List[int]
+
+
+class HistoryBreakdownSeries(BaseModel):
+    """Value history for one group (e.g. one account type), aligned with the response dates"""
+    key: str
+    value_cad: List[Decimal]
+    cost_cad: List[Decimal]
+
+
+class PortfolioHistoryBreakdownResponse(BaseModel):
+    """Schema for portfolio history split by account, country, symbol or currency"""
+    group_by: str
+    start_date: date
+    end_date: date
+    dates: List[date]
+    series: List[HistoryBreakdownSeries]
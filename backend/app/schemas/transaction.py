@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -24,3 +24,22 @@ class TransactionResponse(TransactionBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionTotals(BaseModel):
+    """Aggregates over every transaction matching the filters (not just one page)."""
+    count: int
+    buy_count: int
+    sell_count: int
+    buy_amount: Decimal
+    sell_amount: Decimal
+    fees: Decimal
+    first_date: Optional[date] = None
+    last_date: Optional[date] = None
+
+
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    totals: Optional[TransactionTotals] = None
@@ -0,0 +1,197 @@
+"""
+Daily briefing service.
+
+Generates the daily briefing (summary, movers, alerts) once per region after
+its market closes and stores it, so delivery (scripts/daily_briefing.py) is a
+database read instead of a live price fetch for every holding. Each region is
+scheduled in its market's time zone: NSE closes hours before the TSX.
+"""
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+import logging
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.daily_briefing import DailyBriefing
+from ..utils.metrics import time_job
+
+logger = logging.getLogger(__name__)
+
+# Market close per region in market-local time; 'CA' includes US listings (same close)
+MARKET_CLOSE = {
+    "IN": (ZoneInfo("Asia/Kolkata"), time(15, 30)),
+    "CA": (ZoneInfo("America/Toronto"), time(16, 0)),
+    "all": (ZoneInfo("America/Toronto"), time(16, 0)),
+}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class BriefingService:
+    """Service for generating, storing and serving daily briefings."""
+
+    _task: Optional[asyncio.Task] = None
+
+    CHECK_SECONDS = 60
+
+    @staticmethod
+    def due_date(region: str, now: Optional[datetime] = None) -> date:
+        """
+        Market-local date of the latest briefing that should exist for region:
+        today once the market has closed (plus briefing_delay_minutes) on a
+        weekday, otherwise the previous weekday.
+        """
+        tz, close = MARKET_CLOSE.get(region, MARKET_CLOSE["all"])
+        local = (now or datetime.now(tz)).astimezone(tz)
+        ready_at = datetime.combine(local.date(), close, tz) + timedelta(minutes=settings.briefing_delay_minutes)
+        day = local.date() if local >= ready_at else local.date() - timedelta(days=1)
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    @staticmethod
+    def get_stored(db: Session, region: str, since: date) -> Optional[DailyBriefing]:
+        """Latest stored briefing for region dated on or after since."""
+        return db.query(DailyBriefing).filter(
+            DailyBriefing.region == region,
+            DailyBriefing.briefing_date >= since
+        ).order_by(DailyBriefing.briefing_date.desc()).first()
+
+    @staticmethod
+    def build(db: Session, region: str = 'all') -> Dict:
+        """Briefing from live prices (one valuation pass via the overview)."""
+        # Imported here to avoid a circular import (analytics imports services)
+        from ..routers.analytics import build_portfolio_overview
+
+        overview = build_portfolio_overview(
+            db, fast=False, region=region, fields={"summary", "movers", "alerts"}, movers_limit=4
+        )
+        return {
+            "summary": overview["summary"],
+            "movers": overview["movers"],
+            "alerts": overview["alerts"],
+            "generated_at": datetime.now()
+        }
+
+    @classmethod
+    def _payload(cls, db: Session, region: str, briefing_date: date) -> str:
+        """Briefing from live prices, dated and serialized as stored."""
+        briefing = cls.build(db, region)
+        briefing["region"] = region
+        briefing["briefing_date"] = briefing_date
+        return json.dumps(briefing, default=_json_default)
+
+    @classmethod
+    def generate(cls, db: Session, region: str = 'all', briefing_date: Optional[date] = None) -> Dict:
+        """
+        Build the briefing now and store it for briefing_date.
+
+        Defaults to the current due date, so one built before today's close
+        doesn't stop the scheduler from generating today's after it.
+        """
+        briefing_date = briefing_date or cls.due_date(region)
+        payload = cls._payload(db, region, briefing_date)
+
+        db.query(DailyBriefing).filter(
+            DailyBriefing.region == region,
+            DailyBriefing.briefing_date == briefing_date
+        ).delete(synchronize_session=False)
+        db.add(DailyBriefing(region=region, briefing_date=briefing_date, payload=payload))
+        db.commit()
+
+        logger.info(f"Stored {region} briefing for {briefing_date}")
+        return json.loads(payload)
+
+    @classmethod
+    def get_briefing(cls, db: Session, region: str = 'all', refresh: bool = False) -> Dict:
+        """
+        Latest briefing for region.
+
+        Served from storage when one exists for the current due date; otherwise
+        (or with refresh) built from live prices. Once the market has closed
+        that is today's briefing, so it is stored and repeated requests don't
+        fetch prices again. Before the close the due date is an earlier day
+        whose prices are gone, so the live briefing is returned dated today
+        and not stored.
+        """
+        tz, _ = MARKET_CLOSE.get(region, MARKET_CLOSE["all"])
+        now = datetime.now(tz)
+        due = cls.due_date(region, now)
+        if not refresh:
+            stored = cls.get_stored(db, region, due)
+            if stored:
+                return json.loads(stored.payload)
+        if due == now.date():
+            return cls.generate(db, region, due)
+        return json.loads(cls._payload(db, region, now.date()))
+
+    @classmethod
+    def _generate_in_thread(cls, region: str, briefing_date: date) -> None:
+        db = SessionLocal()
+        try:
+            with time_job("daily_briefing"):
+                cls.generate(db, region, briefing_date)
+        finally:
+            db.close()
+
+    @classmethod
+    async def run_due(cls) -> None:
+        """Generate today's briefing for every region whose market has closed."""
+        loop = asyncio.get_event_loop()
+        for region, (tz, _) in MARKET_CLOSE.items():
+            today = datetime.now(tz).date()
+            # Only today's: a briefing missed yesterday can't be rebuilt from yesterday's prices
+            if cls.due_date(region) != today:
+                continue
+            db = SessionLocal()
+            try:
+                stored = cls.get_stored(db, region, today)
+            finally:
+                db.close()
+            if stored:
+                continue
+            try:
+                await loop.run_in_executor(None, cls._generate_in_thread, region, today)
+            except Exception as e:
+                logger.error(f"Briefing generation failed for {region}: {e}")
+
+    @classmethod
+    async def _schedule_loop(cls) -> None:
+        logger.info("Daily briefing scheduler started")
+        while True:
+            try:
+                await cls.run_due()
+            except Exception as e:
+                logger.error(f"Briefing scheduler error: {e}")
+            await asyncio.sleep(cls.CHECK_SECONDS)
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the scheduler if enabled and not already running."""
+        if not settings.briefing_schedule_enabled:
+            logger.info("Daily briefing scheduler disabled")
+            return
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._schedule_loop())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
@@ -1,25 +1,72 @@
-import httpx
-from typing import Dict, Optional
-from datetime import datetime, timedelta, date
+from typing import Dict, Iterable, Optional, Sequence
+from datetime import datetime, timedelta
 from decimal import Decimal
+import numpy as np
 from sqlalchemy.orm import Session
 import logging
 from ..models.price import ExchangeRate
+from ..utils.metrics import record_cache
 
 logger = logging.getLogger(__name__)
 
 
+class FxSnapshot:
+    """
+    Exchange rates between a set of currencies, resolved once.
+
+    Only each currency's rate to the pivot is looked up; any other pair is the
+    cross rate through the pivot. Build one per request or refresh cycle with
+    CurrencyService.fx_snapshot and convert with it instead of looking up a
+    rate per holding. Currencies without a known rate convert at 1.0, as the
+    per-holding lookups did.
+    """
+
+    def __init__(self, to_pivot: Dict[str, Decimal], pivot: str = "CAD"):
+        self.pivot = pivot
+        self._to_pivot = {**to_pivot, pivot: Decimal("1")}
+        self.currencies = sorted(self._to_pivot)
+        self._index = {currency: i for i, currency in enumerate(self.currencies)}
+        vector = np.array([float(self._to_pivot[c]) for c in self.currencies], dtype=np.float64)
+        # matrix[i, j] converts currencies[i] to currencies[j]
+        self.matrix = vector[:, None] / vector[None, :]
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        i = self._index.get(from_currency)
+        j = self._index.get(to_currency)
+        if i is None or j is None:
+            return 1.0
+        return float(self.matrix[i, j])
+
+    def rate_decimal(self, from_currency: str, to_currency: str) -> Decimal:
+        """Rate as a Decimal, for amounts that stay in Decimal (e.g. realized gains)."""
+        if from_currency == to_currency:
+            return Decimal("1")
+        if from_currency not in self._to_pivot or to_currency not in self._to_pivot:
+            return Decimal("1")
+        return self._to_pivot[from_currency] / self._to_pivot[to_currency]
+
+    def rates_to(self, currencies: Iterable[str], to_currency: str = "CAD") -> np.ndarray:
+        """Conversion rate into to_currency for each element of currencies."""
+        column = self.matrix[:, self._index[to_currency]] if to_currency in self._index else None
+        index = self._index
+        return np.fromiter(
+            (column[index[c]] if column is not None and c in index else 1.0 for c in currencies),
+            dtype=np.float64
+        )
+
+    def convert(self, values: np.ndarray, currencies: Sequence[str], to_currency: str = "CAD") -> np.ndarray:
+        """Convert values, each in the matching element of currencies, to to_currency."""
+        return np.asarray(values, dtype=np.float64) * self.rates_to(currencies, to_currency)
+
+
 class CurrencyService:
     """Service for handling currency conversions"""
 
-    # Exchange rate API (free tier)
-    API_URL = "https://api.exchangerate-api.com/v4/latest/{}"
-
     # Cache for rates
     _rate_cache: Dict[str, Dict] = {}
     _cache_duration = timedelta(hours=24)
 
-    # Fallback rates for common currencies (used to avoid slow API calls)
+    # Approximate rates for common currencies, used until the refresher has stored real ones
     FALLBACK_RATES = {
         'USD:CAD': Decimal('1.37'),
         'CAD:USD': Decimal('0.73'),
@@ -29,166 +76,95 @@ class CurrencyService:
         'INR:USD': Decimal('0.012'),
     }
 
+    @classmethod
+    def cache_rates(cls, rates_by_base: Dict[str, Dict[str, Decimal]]) -> None:
+        """Put freshly fetched rates ({base: {target: rate}}) in the memory cache."""
+        now = datetime.now()
+        for base, rates in rates_by_base.items():
+            for currency, rate in rates.items():
+                cls._rate_cache[f"{base}:{currency}"] = {'rate': rate, 'timestamp': now}
+
     @classmethod
     async def get_exchange_rate(cls, from_currency: str, to_currency: str, db: Session) -> Optional[Decimal]:
         """
         Get exchange rate from one currency to another.
+        If no rate is stored yet, fetches all rates for from_currency first.
         Returns None if rate cannot be fetched.
         """
         if from_currency == to_currency:
             return Decimal("1.0")
 
-        # Check database cache first
-        today = date.today()
-        cached_rate = db.query(ExchangeRate).filter(
-            ExchangeRate.from_currency == from_currency,
-            ExchangeRate.to_currency == to_currency,
-            ExchangeRate.date == today
-        ).first()
-
-        if cached_rate:
-            logger.info(f"Using cached exchange rate {from_currency} -> {to_currency}: {cached_rate.rate}")
-            return cached_rate.rate
-
-        # Check memory cache
-        cache_key = f"{from_currency}:{to_currency}"
-        if cache_key in cls._rate_cache:
-            cached = cls._rate_cache[cache_key]
-            if datetime.now() - cached['timestamp'] < cls._cache_duration:
-                return cached['rate']
+        rate = cls._stored_rate(from_currency, to_currency, db)
+        if rate is not None:
+            return rate
 
-        # Fetch from API
+        # Imported here to avoid a circular import (the refresher fills this cache)
+        from .fx_refresh_service import FxRefreshService
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(cls.API_URL.format(from_currency), timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-
-                if 'rates' in data and to_currency in data['rates']:
-                    rate = Decimal(str(data['rates'][to_currency]))
-
-                    # Cache in memory
-                    cls._rate_cache[cache_key] = {
-                        'rate': rate,
-                        'timestamp': datetime.now()
-                    }
-
-                    # Cache in database
-                    db_rate = ExchangeRate(
-                        from_currency=from_currency,
-                        to_currency=to_currency,
-                        rate=rate,
-                        date=today
-                    )
-                    db.add(db_rate)
-                    db.commit()
-
-                    logger.info(f"Fetched exchange rate {from_currency} -> {to_currency}: {rate}")
-                    return rate
-                else:
-                    logger.warning(f"Currency {to_currency} not found in rates")
-                    return None
-
+            await FxRefreshService.refresh(db, bases=[from_currency])
         except Exception as e:
-            logger.error(f"Error fetching exchange rate {from_currency} -> {to_currency}: {str(e)}")
+            logger.error(f"Error fetching exchange rates for {from_currency}: {str(e)}")
             return None
+        return cls._stored_rate(from_currency, to_currency, db)
 
     @classmethod
     def get_exchange_rate_sync(cls, from_currency: str, to_currency: str, db: Session) -> Optional[Decimal]:
         """
-        Synchronous version of get_exchange_rate.
-        Uses in-memory cache first, then database, then API, then fallback rates.
+        Synchronous version of get_exchange_rate, safe to call from request handlers.
+        Uses the in-memory cache, then the latest stored rate, then fallback rates.
+        Never calls the rates API; FxRefreshService keeps the stored rates current.
         """
         if from_currency == to_currency:
             return Decimal("1.0")
 
-        # Check in-memory cache FIRST (fastest, no DB query)
-        cache_key = f"{from_currency}:{to_currency}"
-        if cache_key in cls._rate_cache:
-            cached = cls._rate_cache[cache_key]
-            if datetime.now() - cached['timestamp'] < cls._cache_duration:
-                logger.info(f"Using cached exchange rate {from_currency} -> {to_currency}: {cached['rate']}")
-                return cached['rate']
-
-        # For INR, use fallback rates to avoid slow API calls during requests
-        # This is acceptable because INR rates don't change dramatically intraday
-        fallback_key = f"{from_currency}:{to_currency}"
-        if fallback_key in cls.FALLBACK_RATES:
-            rate = cls.FALLBACK_RATES[fallback_key]
-            cls._rate_cache[cache_key] = {'rate': rate, 'timestamp': datetime.now()}
-            logger.info(f"Using fallback exchange rate {from_currency} -> {to_currency}: {rate}")
+        rate = cls._stored_rate(from_currency, to_currency, db)
+        if rate is not None:
             return rate
 
-        # Check database cache
-        today = date.today()
-        cached_rate = db.query(ExchangeRate).filter(
-            ExchangeRate.from_currency == from_currency,
-            ExchangeRate.to_currency == to_currency,
-            ExchangeRate.date == today
-        ).first()
-
-        if cached_rate:
-            # Populate in-memory cache
-            cls._rate_cache[cache_key] = {'rate': cached_rate.rate, 'timestamp': datetime.now()}
-            logger.info(f"Using DB cached exchange rate {from_currency} -> {to_currency}: {cached_rate.rate}")
-            return cached_rate.rate
-
-        # Fetch from API synchronously (only for non-INR currencies now)
-        try:
-            response = httpx.get(cls.API_URL.format(from_currency), timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'rates' in data and to_currency in data['rates']:
-                rate = Decimal(str(data['rates'][to_currency]))
-
-                # Cache in memory
-                cache_key = f"{from_currency}:{to_currency}"
-                cls._rate_cache[cache_key] = {
-                    'rate': rate,
-                    'timestamp': datetime.now()
-                }
-
-                # Cache in database (flush only, let caller commit)
-                db_rate = ExchangeRate(
-                    from_currency=from_currency,
-                    to_currency=to_currency,
-                    rate=rate,
-                    date=today
-                )
-                db.add(db_rate)
-                try:
-                    db.flush()
-                except Exception:
-                    db.rollback()  # Rate might already exist, that's OK
-
-                logger.info(f"Fetched exchange rate {from_currency} -> {to_currency}: {rate}")
-                return rate
-            else:
-                logger.warning(f"Currency {to_currency} not found in API response")
-
-        except Exception as e:
-            logger.warning(f"API call failed for {from_currency} -> {to_currency}: {e}")
-
-        # Fallback to approximate rates if API fails
-        approximate_rates = {
-            'USD:CAD': Decimal('1.37'),
-            'CAD:USD': Decimal('0.73'),
-            'INR:CAD': Decimal('0.016'),
-            'CAD:INR': Decimal('62.5'),
-            'USD:INR': Decimal('86.0'),
-            'INR:USD': Decimal('0.012'),
-        }
-
         key = f"{from_currency}:{to_currency}"
-        if key in approximate_rates:
-            rate = approximate_rates[key]
-            logger.warning(f"Using fallback rate for {key}: {rate}")
+        if key in cls.FALLBACK_RATES:
+            rate = cls.FALLBACK_RATES[key]
+            cls._rate_cache[key] = {'rate': rate, 'timestamp': datetime.now()}
+            logger.warning(f"Using fallback exchange rate {from_currency} -> {to_currency}: {rate}")
             return rate
 
         logger.error(f"No exchange rate available for {key}")
         return None
 
+    @classmethod
+    def _stored_rate(cls, from_currency: str, to_currency: str, db: Session) -> Optional[Decimal]:
+        """Rate from the memory cache, else the most recent one in the database."""
+        cache_key = f"{from_currency}:{to_currency}"
+        cached = cls._rate_cache.get(cache_key)
+        if cached and datetime.now() - cached['timestamp'] < cls._cache_duration:
+            logger.debug(f"Using cached exchange rate {from_currency} -> {to_currency}: {cached['rate']}")
+            record_cache("fx", hits=1)
+            return cached['rate']
+        record_cache("fx", misses=1)
+
+        stored = db.query(ExchangeRate).filter(
+            ExchangeRate.from_currency == from_currency,
+            ExchangeRate.to_currency == to_currency,
+        ).order_by(ExchangeRate.date.desc()).first()
+        record_cache("fx_stored", hits=int(stored is not None), misses=int(stored is None))
+        if stored:
+            cls._rate_cache[cache_key] = {'rate': stored.rate, 'timestamp': datetime.now()}
+            logger.info(f"Using stored exchange rate {from_currency} -> {to_currency} ({stored.date}): {stored.rate}")
+            return stored.rate
+        return None
+
+    @classmethod
+    def fx_snapshot(cls, db: Session, currencies: Iterable[str], pivot: str = "CAD") -> FxSnapshot:
+        """Look up each currency's rate to pivot once and return an FxSnapshot."""
+        to_pivot = {}
+        for currency in set(currencies) - {pivot}:
+            rate = cls.get_exchange_rate_sync(currency, pivot, db)
+            if rate:
+                to_pivot[currency] = rate
+            else:
+                logger.warning(f"No {currency} -> {pivot} rate, converting {currency} at 1.0")
+        return FxSnapshot(to_pivot, pivot)
+
     @classmethod
     def convert_amount(cls, amount: Decimal, from_currency: str, to_currency: str, db: Session) -> Optional[Decimal]:
         """Convert an amount from one currency to another"""
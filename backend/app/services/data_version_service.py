@@ -0,0 +1,145 @@
+"""
+Data version tracking for conditional GETs.
+
+Each data domain has a version in the data_versions table, bumped by SQLite
+triggers on the domain's tables in the same transaction as the write, so
+changes from any writer (other workers, scripts, raw SQL) count. Read
+endpoints derive an ETag from the versions they depend on, so clients polling
+unchanged data get 304 Not Modified instead of a rebuilt body.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+from fastapi import Request, Response
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..database import engine
+from ..models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# Tables whose writes change each domain
+DOMAIN_TABLES = {
+    "holdings": ("holdings", "transactions"),
+    "prices": ("current_price_cache", "price_history"),
+    "snapshots": ("portfolio_snapshots", "holding_daily_values", "portfolio_region_values"),
+    "fx": ("exchange_rates",),
+}
+
+# Bookkeeping columns per table; touching only these is not a data change.
+# current_price_cache.updated_at is served as the price time, so it counts.
+IGNORED_COLUMNS = {
+    "holdings": {"updated_at"},
+    "portfolio_snapshots": {"updated_at"},
+}
+
+_BUMP = "UPDATE data_versions SET version = version + 1, modified_at = CURRENT_TIMESTAMP WHERE domain = '{domain}'"
+
+
+class DataVersionService:
+    """Service for per-domain data versions, ETags and 304 responses."""
+
+    @staticmethod
+    def install(bind: Engine = engine) -> None:
+        """
+        Create the version rows and the triggers that bump them.
+
+        Run at startup after the tables exist (see init_db). Triggers are
+        recreated each time so they follow the current columns. Update
+        triggers fire only when a column outside the table's IGNORED_COLUMNS
+        changes value.
+        """
+        if bind.dialect.name != "sqlite":
+            logger.warning("Data version triggers need SQLite; conditional GETs are disabled")
+            return
+
+        with bind.begin() as conn:
+            for domain in DOMAIN_TABLES:
+                conn.execute(text("INSERT OR IGNORE INTO data_versions (domain, version) VALUES (:domain, 0)"),
+                             {"domain": domain})
+
+            for domain, tables in DOMAIN_TABLES.items():
+                bump = _BUMP.format(domain=domain)
+                for table in tables:
+                    columns = [
+                        row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))
+                        if row[1] not in IGNORED_COLUMNS.get(table, ())
+                    ]
+                    changed = " OR ".join(f'OLD."{c}" IS NOT NEW."{c}"' for c in columns)
+                    statements = {
+                        f"dv_{table}_insert": f"AFTER INSERT ON {table} BEGIN {bump}; END",
+                        f"dv_{table}_delete": f"AFTER DELETE ON {table} BEGIN {bump}; END",
+                        f"dv_{table}_update": f"AFTER UPDATE ON {table} WHEN {changed} BEGIN {bump}; END",
+                    }
+                    for name, body in statements.items():
+                        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+                        conn.execute(text(f"CREATE TRIGGER {name} {body}"))
+
+    @staticmethod
+    def versions(domains: Optional[Iterable[str]] = None) -> Dict[str, Tuple[int, datetime]]:
+        """Current (version, modified at UTC) per domain, read from the database."""
+        query = select(DataVersion.domain, DataVersion.version, DataVersion.modified_at)
+        if domains is not None:
+            query = query.where(DataVersion.domain.in_(list(domains)))
+        with engine.connect() as conn:
+            return {
+                domain: (version, modified_at.replace(tzinfo=timezone.utc))
+                for domain, version, modified_at in conn.execute(query)
+            }
+
+    @staticmethod
+    def etag(versions: Dict[str, Tuple[int, datetime]], *params) -> str:
+        """
+        Weak ETag over domain versions and the request parameters.
+
+        The modification times are part of the key, so a recreated database
+        whose counters restart doesn't reproduce an old tag.
+        """
+        key = "|".join(
+            [f"{d}:{v}:{m.timestamp():.0f}" for d, (v, m) in sorted(versions.items())]
+            + [str(p) for p in params]
+        )
+        return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+    @classmethod
+    def not_modified(cls, request: Request, response: Response, domains: Iterable[str], *params) -> Optional[Response]:
+        """
+        Set ETag/Last-Modified on response, or return a 304 if the client is current.
+
+        Usage in an endpoint:
+            cached = DataVersionService.not_modified(request, response, ("holdings",), region)
+            if cached:
+                return cached
+        """
+        domains = tuple(domains)
+        try:
+            versions = cls.versions(domains)
+        except SQLAlchemyError as e:
+            # No version table (install not run): serve without validators
+            logger.warning(f"Data versions unavailable, skipping conditional GET: {e}")
+            return None
+        if len(versions) != len(set(domains)):
+            return None
+
+        etag = cls.etag(versions, *params)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(max(m for _, m in versions.values()), usegmt=True),
+            # Let the browser cache, but revalidate on every request
+            "Cache-Control": "no-cache",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            # Weak comparison: W/"x" matches "x"
+            if "*" in candidates or etag in candidates or etag[2:] in candidates:
+                return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return None
@@ -0,0 +1,159 @@
+"""
+Exchange rate refresher.
+
+The rates API returns every rate for a base currency in one response, so each
+configured base is fetched once per cycle (concurrently, over one pooled
+AsyncClient) and all of its pairs are stored in ExchangeRate with a single
+bulk insert. Request handlers then read rates from memory or the database
+(CurrencyService.get_exchange_rate_sync) and never call the API themselves.
+"""
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Optional
+import logging
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.price import ExchangeRate
+from ..utils.http_client import SharedHttpClient
+from ..utils.metrics import time_job
+from .currency_service import CurrencyService
+
+logger = logging.getLogger(__name__)
+
+# ExchangeRate.rate is NUMERIC(15, 6)
+RATE_PLACES = Decimal('0.000001')
+MAX_RATE = Decimal('999999999')
+
+http = SharedHttpClient("exchange_rates", timeout=10.0, max_connections=10)
+
+
+class FxRefreshService:
+    """Service for fetching and storing exchange rates on a schedule."""
+
+    _task: Optional[asyncio.Task] = None
+
+    last_refreshed_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    @classmethod
+    def base_currencies(cls) -> list:
+        return [c.strip().upper() for c in settings.fx_base_currencies.split(",") if c.strip()]
+
+    @classmethod
+    async def fetch_rates(cls, base: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Decimal]:
+        """All rates from base in one call, keyed by target currency."""
+        client = client or http.client
+        response = await client.get(settings.fx_api_url.format(base=base))
+        response.raise_for_status()
+        rates = {}
+        for currency, value in response.json().get('rates', {}).items():
+            try:
+                rate = Decimal(str(value)).quantize(RATE_PLACES)
+            except (InvalidOperation, TypeError):
+                continue
+            if currency != base and 0 < rate < MAX_RATE:
+                rates[currency] = rate
+        return rates
+
+    @classmethod
+    async def refresh(
+        cls,
+        db: Optional[Session] = None,
+        bases: Optional[Iterable[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> int:
+        """
+        Fetch every base currency once and store all returned pairs for today.
+
+        Bases that fail are logged and skipped. Returns the number of pairs stored.
+        """
+        bases = list(bases) if bases is not None else cls.base_currencies()
+        results = await asyncio.gather(
+            *(cls.fetch_rates(base, client) for base in bases), return_exceptions=True
+        )
+
+        fetched: Dict[str, Dict[str, Decimal]] = {}
+        errors = []
+        for base, result in zip(bases, results):
+            if isinstance(result, Exception):
+                errors.append(f"{base}: {result}")
+                logger.warning(f"Exchange rate fetch failed for {base}: {result}")
+            elif result:
+                fetched[base] = result
+        cls.last_error = "; ".join(errors) or None
+
+        if not fetched:
+            return 0
+
+        owns_session = db is None
+        db = db or SessionLocal()
+        try:
+            count = cls._store_rates(db, date.today(), fetched)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        CurrencyService.cache_rates(fetched)
+        cls.last_refreshed_at = datetime.now()
+        logger.info(f"Stored {count} exchange rates for {', '.join(fetched)}")
+        return count
+
+    @staticmethod
+    def _store_rates(db: Session, rate_date: date, fetched: Dict[str, Dict[str, Decimal]]) -> int:
+        """Replace the day's rates for the fetched bases with one bulk insert."""
+        db.query(ExchangeRate).filter(
+            ExchangeRate.date == rate_date,
+            ExchangeRate.from_currency.in_(list(fetched)),
+        ).delete(synchronize_session=False)
+        rows = [
+            {'from_currency': base, 'to_currency': currency, 'rate': rate, 'date': rate_date}
+            for base, rates in fetched.items()
+            for currency, rate in rates.items()
+        ]
+        if rows:
+            db.execute(insert(ExchangeRate), rows)
+        return len(rows)
+
+    @classmethod
+    async def _refresh_loop(cls) -> None:
+        """Refresh now, then every fx_refresh_minutes until stopped."""
+        logger.info("Exchange rate refresh loop started")
+        while True:
+            try:
+                with time_job("fx_refresh"):
+                    await cls.refresh()
+            except Exception as e:
+                cls.last_error = str(e)
+                logger.error(f"Exchange rate refresh failed: {e}")
+            await asyncio.sleep(settings.fx_refresh_minutes * 60)
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the refresh loop if it is enabled and not already running."""
+        if settings.fx_refresh_minutes <= 0:
+            logger.info("Exchange rate refresh disabled")
+            return
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._refresh_loop())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Cancel the refresh loop and close the pooled client."""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        await http.aclose()
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 import logging
 import re
 
+from ..utils.xlsx import read_table
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,50 +83,54 @@ class GrowwImportService:
         warnings = []
         
         try:
-            df = pd.read_excel(io.BytesIO(content), header=None)
-            
-            # Find the header row with 'Scheme Name'
-            header_row = None
-            for i, row in df.iterrows():
-                row_str = str(row.values)
-                if 'Scheme Name' in row_str:
-                    header_row = i
-                    break
+            # Read the sheet once and locate the header row with 'Scheme Name'
+            df = read_table(content, 'Scheme Name')
             
-            if header_row is None:
+            if df is None:
                 warnings.append("Could not find header row with 'Scheme Name'")
                 return [], warnings
             
-            # Re-read with proper header
-            df = pd.read_excel(io.BytesIO(content), header=header_row)
-            
             # Filter to rows with valid scheme names
             df = df[df['Scheme Name'].notna()]
             
-            holdings = []
-            for _, row in df.iterrows():
-                try:
-                    # Parse numeric values
-                    units = Decimal(str(row.get('Units', 0)))
-                    invested = Decimal(str(row.get('Invested Value', 0)))
-                    current = Decimal(str(row.get('Current Value', 0)))
-                    returns = Decimal(str(row.get('Returns', 0)))
-                    
-                    holdings.append(GrowwMFHolding(
-                        scheme_name=str(row['Scheme Name']),
-                        amc=str(row.get('AMC', '')),
-                        category=str(row.get('Category', '')),
-                        sub_category=str(row.get('Sub-category', '')),
-                        folio_no=str(row.get('Folio No.', '')),
-                        units=units,
-                        invested_value=invested,
-                        current_value=current,
-                        returns=returns,
-                        xirr=str(row.get('XIRR', '')),
-                    ))
-                except Exception as e:
-                    warnings.append(f"Error parsing row: {e}")
-                    continue
+            # Parse numeric values column-wise; missing columns count as 0
+            numeric = {}
+            invalid = pd.Series(False, index=df.index)
+            for col in ('Units', 'Invested Value', 'Current Value', 'Returns'):
+                raw = df[col] if col in df.columns else pd.Series(0, index=df.index)
+                values = pd.to_numeric(raw, errors='coerce')
+                invalid |= values.isna() & raw.notna()
+                numeric[col] = values
+            
+            for name in df.loc[invalid, 'Scheme Name']:
+                warnings.append(f"Error parsing row: non-numeric value for {name}")
+            
+            def text(col: str) -> pd.Series:
+                return df[col].astype(str) if col in df.columns else pd.Series('', index=df.index)
+            
+            valid = ~invalid
+            holdings = [
+                GrowwMFHolding(
+                    scheme_name=scheme_name,
+                    amc=amc,
+                    category=category,
+                    sub_category=sub_category,
+                    folio_no=folio_no,
+                    units=Decimal(str(units)),
+                    invested_value=Decimal(str(invested)),
+                    current_value=Decimal(str(current)),
+                    returns=Decimal(str(returns)),
+                    xirr=xirr,
+                )
+                for scheme_name, amc, category, sub_category, folio_no, units, invested, current, returns, xirr in zip(
+                    text('Scheme Name')[valid], text('AMC')[valid],
+                    text('Category')[valid], text('Sub-category')[valid],
+                    text('Folio No.')[valid],
+                    numeric['Units'][valid], numeric['Invested Value'][valid],
+                    numeric['Current Value'][valid], numeric['Returns'][valid],
+                    text('XIRR')[valid],
+                )
+            ]
             
             return holdings, warnings
             
@@ -17,7 +17,10 @@ from sqlalchemy import text
 from ..models.transaction import Transaction
 from ..models.holding import Holding
 from ..models.portfolio_snapshot import PortfolioSnapshot
+from ..config import settings
 from .currency_service import CurrencyService
+from .market_simulator import MarketSimulator
+from ..utils.metrics import observe_yfinance, time_job
 
 logger = logging.getLogger(__name__)
 
@@ -68,14 +71,25 @@ def get_historical_prices(symbols: List[str], start_date: date, end_date: date)
     
     # Fetch in batches
     ticker_list = list(set(tickers.values()))
+    if settings.price_provider == "simulated":
+        try:
+            closes = MarketSimulator.download(ticker_list, start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error fetching historical prices: {e}")
+            return prices
+        for sym, yf_ticker in tickers.items():
+            prices[sym] = {d: float(close) for d, close in closes[yf_ticker]}
+        return prices
+
     try:
-        data = yf.download(
-            ticker_list,
-            start=start_date,
-            end=end_date + timedelta(days=1),
-            progress=False,
-            auto_adjust=True
-        )
+        with observe_yfinance("download"):
+            data = yf.download(
+                ticker_list,
+                start=start_date,
+                end=end_date + timedelta(days=1),
+                progress=False,
+                auto_adjust=True
+            )
         
         if len(ticker_list) == 1:
             # Single ticker - different format
@@ -129,6 +143,7 @@ def calculate_holdings_at_date(transactions: List[Transaction], target_date: dat
     return {k: v for k, v in holdings.items() if v["quantity"] > 0}
 
 
+@time_job("backfill_history")
 def backfill_history(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
     """
     Backfill portfolio history from transactions.
@@ -0,0 +1,396 @@
+"""
+Holding recompute service.
+
+Rebuilds each holding's quantity, average cost (ACB) and first purchase date
+from the transaction log, so holdings stay correct regardless of the order in
+which transactions were imported, added or deleted. Shares the log doesn't
+account for (entered manually or imported from a holdings statement) are kept
+as the holding's opening position and replayed before its transactions.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+
+from sqlalchemy.orm import Session
+
+from ..models.holding import Holding
+from ..models.holding_opening import HoldingOpening
+from ..models.ledger_change import LedgerChange
+from ..models.transaction import Transaction
+from ..schemas.holding import HoldingRecomputeItem, HoldingRecomputeResult, HoldingConsistencyReport
+
+logger = logging.getLogger(__name__)
+
+FOUR_PLACES = Decimal("0.0001")
+
+
+@dataclass
+class RecomputedPosition:
+    """Position rebuilt from a holding's transactions."""
+    quantity: Decimal = Decimal("0")
+    avg_purchase_price: Decimal = Decimal("0")
+    first_purchase_date: Optional[date] = None
+    transactions: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+
+class HoldingRecomputeService:
+    """Service for rebuilding holdings from transactions."""
+
+    # Differences below these are rounding noise from Numeric(15, 4) storage
+    QUANTITY_TOLERANCE = Decimal("0.0001")
+    PRICE_TOLERANCE = Decimal("0.001")
+
+    @staticmethod
+    def apply_transaction(
+        position,
+        transaction_type: str,
+        quantity: Decimal,
+        price_per_share: Decimal,
+        fees: Optional[Decimal],
+        transaction_date: date,
+        symbol: str
+    ) -> Optional[str]:
+        """
+        Apply one transaction to a position (a Holding or RecomputedPosition).
+
+        BUY adds to quantity and re-averages cost including fees; SELL reduces
+        quantity and leaves average cost unchanged. Returns a warning if a sell
+        exceeds the quantity held (quantity is clamped to zero).
+        """
+        if transaction_type == "BUY":
+            total_cost = (position.quantity * position.avg_purchase_price) + \
+                         (quantity * price_per_share) + (fees or Decimal("0"))
+            position.quantity += quantity
+            if position.quantity > 0:
+                position.avg_purchase_price = total_cost / position.quantity
+
+            # Update first purchase date if earlier
+            if position.first_purchase_date is None or transaction_date < position.first_purchase_date:
+                position.first_purchase_date = transaction_date
+        else:  # SELL
+            if position.quantity >= quantity:
+                position.quantity -= quantity
+            else:
+                warning = f"Sell quantity ({quantity}) exceeds holding quantity ({position.quantity}) for {symbol}"
+                position.quantity = Decimal("0")
+                return warning
+        return None
+
+    @staticmethod
+    def _load_ledger(db: Session, holding_ids: Optional[List[int]] = None) -> Dict[int, list]:
+        """
+        Transactions per holding, oldest first.
+
+        Loads only the needed columns in a single query ordered by holding,
+        date and id (insertion order breaks same-day ties).
+        """
+        query = db.query(
+            Transaction.holding_id,
+            Transaction.transaction_type,
+            Transaction.quantity,
+            Transaction.price_per_share,
+            Transaction.fees,
+            Transaction.transaction_date,
+            Transaction.symbol,
+        ).order_by(Transaction.holding_id, Transaction.transaction_date, Transaction.id)
+
+        if holding_ids is not None:
+            query = query.filter(Transaction.holding_id.in_(holding_ids))
+
+        return {holding_id: list(rows) for holding_id, rows in groupby(query.all(), key=itemgetter(0))}
+
+    @staticmethod
+    def _load_openings(db: Session, holding_ids: Optional[List[int]] = None) -> Dict[int, HoldingOpening]:
+        query = db.query(HoldingOpening)
+        if holding_ids is not None:
+            query = query.filter(HoldingOpening.holding_id.in_(holding_ids))
+        return {opening.holding_id: opening for opening in query.all()}
+
+    @staticmethod
+    def _replay(
+        rows: Sequence,
+        quantity: Decimal = Decimal("0"),
+        avg_purchase_price: Decimal = Decimal("0"),
+        first_purchase_date: Optional[date] = None
+    ) -> RecomputedPosition:
+        """
+        Fold transactions in order over a starting position.
+
+        The fold is sequential because average cost depends on the order of
+        buys and sells.
+        """
+        position = RecomputedPosition(
+            quantity=Decimal(quantity),
+            avg_purchase_price=Decimal(avg_purchase_price),
+            first_purchase_date=first_purchase_date,
+        )
+        for _, txn_type, txn_quantity, price, fees, txn_date, symbol in rows:
+            warning = HoldingRecomputeService.apply_transaction(
+                position, txn_type, txn_quantity, price, fees, txn_date, symbol
+            )
+            if warning:
+                position.warnings.append(f"{txn_date}: {warning}")
+            position.transactions += 1
+        return position
+
+    @staticmethod
+    def compute_positions(db: Session, holding_ids: Optional[Iterable[int]] = None) -> Dict[int, RecomputedPosition]:
+        """
+        Rebuild positions for holdings tracked by the ledger, in one pass.
+
+        A holding is tracked once it has transactions or a recorded opening
+        position; each is replayed from its opening (zero if none). A tracked
+        holding whose transactions were all deleted comes back as its opening
+        position. Holdings never tracked are not included.
+        """
+        holding_ids = list(holding_ids) if holding_ids is not None else None
+        ledger = HoldingRecomputeService._load_ledger(db, holding_ids)
+        openings = HoldingRecomputeService._load_openings(db, holding_ids)
+
+        positions = {}
+        for holding_id in ledger.keys() | openings.keys():
+            opening = openings.get(holding_id)
+            if opening is None:
+                positions[holding_id] = HoldingRecomputeService._replay(ledger[holding_id])
+            else:
+                positions[holding_id] = HoldingRecomputeService._replay(
+                    ledger.get(holding_id, []),
+                    opening.quantity,
+                    opening.avg_purchase_price,
+                    opening.first_purchase_date,
+                )
+        return positions
+
+    @staticmethod
+    def _opening_for(holding: Holding, rows: Sequence) -> Optional[RecomputedPosition]:
+        """
+        The opening position that, replayed before rows, gives the holding's
+        stored quantity and average cost; None if no opening does.
+
+        The opening quantity is the stored quantity less the ledger's net
+        quantity. Final cost is then linear in the opening price, so two
+        replays (at price 0 and 1) solve for it.
+        """
+        stored_quantity = Decimal(holding.quantity or 0)
+        stored_price = Decimal(holding.avg_purchase_price or 0)
+        net = sum((q if txn_type == "BUY" else -q) for _, txn_type, q, *_ in rows)
+        opening_quantity = (stored_quantity - net).quantize(FOUR_PLACES)
+        if opening_quantity <= HoldingRecomputeService.QUANTITY_TOLERANCE:
+            # The ledger accounts for every share; any cost difference is drift
+            return RecomputedPosition()
+
+        at_zero = HoldingRecomputeService._replay(rows, opening_quantity, Decimal("0"))
+        at_one = HoldingRecomputeService._replay(rows, opening_quantity, Decimal("1"))
+        cost_per_unit = at_one.quantity * at_one.avg_purchase_price - at_zero.quantity * at_zero.avg_purchase_price
+        opening_price = stored_price
+        if cost_per_unit > 0:
+            solved = (stored_quantity * stored_price - at_zero.quantity * at_zero.avg_purchase_price) / cost_per_unit
+            if solved >= 0:
+                opening_price = solved.quantize(FOUR_PLACES)
+
+        earliest = rows[0][5] if rows else None
+        first_date = holding.first_purchase_date
+        if first_date is not None and earliest is not None and first_date >= earliest:
+            first_date = None  # Set by the ledger, not the opening
+
+        opening = RecomputedPosition(
+            quantity=opening_quantity,
+            avg_purchase_price=opening_price,
+            first_purchase_date=first_date,
+        )
+        replayed = HoldingRecomputeService._replay(rows, opening_quantity, opening_price, first_date)
+        if abs(replayed.quantity - stored_quantity) > HoldingRecomputeService.QUANTITY_TOLERANCE:
+            return None
+        return opening
+
+    @staticmethod
+    def record_openings(db: Session, holdings: Iterable[Holding]) -> None:
+        """
+        Record the opening position of holdings about to get transaction writes.
+
+        Call before adding or deleting a holding's transactions. Shares its
+        stored position has beyond what its transactions explain (a manual
+        entry, a statement import, an edit) become its opening position, so
+        rebuilding it from the ledger after the write keeps them. Holdings
+        the ledger fully explains get a zero opening, which marks them as
+        tracked. Does not commit.
+        """
+        holdings = [h for h in holdings if h.id is not None]
+        if not holdings:
+            return
+        ids = [h.id for h in holdings]
+        ledger = HoldingRecomputeService._load_ledger(db, ids)
+        openings = HoldingRecomputeService._load_openings(db, ids)
+
+        for holding in holdings:
+            rows = ledger.get(holding.id, [])
+            opening = openings.get(holding.id)
+            if opening is not None:
+                current = HoldingRecomputeService._replay(
+                    rows, opening.quantity, opening.avg_purchase_price, opening.first_purchase_date
+                )
+            else:
+                current = HoldingRecomputeService._replay(rows)
+            if not HoldingRecomputeService._differs(holding, current):
+                if opening is not None:
+                    continue
+                position = RecomputedPosition()
+            else:
+                position = HoldingRecomputeService._opening_for(holding, rows)
+            if position is None:
+                logger.warning(
+                    f"{holding.symbol} (id {holding.id}): stored quantity {holding.quantity} "
+                    f"can't be reached from its transactions; opening position not updated"
+                )
+                if opening is None:
+                    position = RecomputedPosition()
+                else:
+                    continue
+
+            if opening is None:
+                opening = HoldingOpening(holding_id=holding.id)
+                db.add(opening)
+            opening.quantity = position.quantity
+            opening.avg_purchase_price = position.avg_purchase_price.quantize(FOUR_PLACES)
+            opening.first_purchase_date = position.first_purchase_date
+        db.flush()
+
+    @staticmethod
+    def backfill_openings(db: Session) -> int:
+        """
+        Record openings for holdings that have transactions but none recorded.
+
+        Holdings given transactions before openings were tracked would
+        otherwise be replayed from zero, dropping any shares entered outside
+        the ledger. Holdings with pending ledger sync marks are skipped until
+        the sync has rebuilt them. Run at startup (see init_db); commits and
+        returns the number of holdings backfilled.
+        """
+        holdings = db.query(Holding).filter(
+            Holding.id.in_(db.query(Transaction.holding_id)),
+            ~Holding.id.in_(db.query(HoldingOpening.holding_id)),
+            ~Holding.id.in_(db.query(LedgerChange.holding_id)),
+        ).all()
+        if not holdings:
+            return 0
+        HoldingRecomputeService.record_openings(db, holdings)
+        db.commit()
+        logger.info(f"Recorded opening positions for {len(holdings)} existing holdings")
+        return len(holdings)
+
+    @staticmethod
+    def _differs(holding: Holding, position: RecomputedPosition) -> bool:
+        """Whether the stored holding disagrees with the recomputed position."""
+        quantity = position.quantity.quantize(FOUR_PLACES)
+        avg_price = position.avg_purchase_price.quantize(FOUR_PLACES)
+        if abs(Decimal(holding.quantity or 0) - quantity) > HoldingRecomputeService.QUANTITY_TOLERANCE:
+            return True
+        # Cost basis is irrelevant once a position is closed
+        if quantity > 0 and abs(Decimal(holding.avg_purchase_price or 0) - avg_price) > HoldingRecomputeService.PRICE_TOLERANCE:
+            return True
+        return (
+            position.first_purchase_date is not None
+            and holding.first_purchase_date != position.first_purchase_date
+        )
+
+    @staticmethod
+    def recompute(
+        db: Session,
+        holding_ids: Optional[Iterable[int]] = None,
+        dry_run: bool = False,
+        commit: bool = True
+    ) -> HoldingRecomputeResult:
+        """
+        Recompute holdings from transactions.
+
+        Args:
+            holding_ids: Limit to these holdings (default: every holding tracked by the ledger)
+            dry_run: Report differences without writing anything
+            commit: Commit the session (set False when the caller owns the transaction)
+
+        Each holding is replayed from its opening position (see record_openings),
+        so one whose transactions were all deleted returns to that position (or
+        zero). Holdings never tracked by the ledger (entered manually or imported
+        from statements, with no transactions) are left untouched. Holdings
+        whose quantity drops to zero are deactivated, and ones closed out at zero
+        are reactivated once they hold shares again; soft-deleted holdings
+        (inactive with shares still stored) stay deleted.
+        """
+        started = time.perf_counter()
+        positions = HoldingRecomputeService.compute_positions(db, holding_ids)
+
+        holdings = db.query(Holding).filter(Holding.id.in_(list(positions.keys()))).all() if positions else []
+
+        items = []
+        warnings = []
+        for holding in holdings:
+            position = positions[holding.id]
+            changed = HoldingRecomputeService._differs(holding, position)
+            quantity = position.quantity.quantize(FOUR_PLACES)
+            tolerance = HoldingRecomputeService.QUANTITY_TOLERANCE
+            is_active = quantity > tolerance and (
+                holding.is_active or Decimal(holding.quantity or 0) <= tolerance
+            )
+
+            items.append(HoldingRecomputeItem(
+                holding_id=holding.id,
+                symbol=holding.symbol,
+                account_type=holding.account_type,
+                transactions=position.transactions,
+                quantity=quantity,
+                avg_purchase_price=position.avg_purchase_price.quantize(FOUR_PLACES),
+                first_purchase_date=position.first_purchase_date or holding.first_purchase_date,
+                previous_quantity=holding.quantity,
+                previous_avg_purchase_price=holding.avg_purchase_price,
+                changed=changed,
+                is_active=is_active,
+            ))
+            warnings.extend(f"{holding.symbol} (id {holding.id}) {w}" for w in position.warnings)
+
+            if dry_run or not changed:
+                continue
+
+            holding.quantity = quantity
+            holding.avg_purchase_price = position.avg_purchase_price.quantize(FOUR_PLACES)
+            if position.first_purchase_date is not None:
+                holding.first_purchase_date = position.first_purchase_date
+            holding.is_active = is_active
+
+        if not dry_run:
+            if commit:
+                db.commit()
+            else:
+                db.flush()
+
+        changed_count = sum(1 for item in items if item.changed)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        if changed_count and not dry_run:
+            logger.info(f"Recomputed {len(items)} holdings ({changed_count} changed) in {elapsed_ms} ms")
+
+        return HoldingRecomputeResult(
+            holdings_recomputed=len(items),
+            holdings_changed=changed_count,
+            transactions_processed=sum(p.transactions for p in positions.values()),
+            elapsed_ms=elapsed_ms,
+            dry_run=dry_run,
+            warnings=warnings,
+            holdings=items,
+        )
+
+    @staticmethod
+    def check_consistency(db: Session) -> HoldingConsistencyReport:
+        """Compare every holding tracked by the ledger against its recomputed position."""
+        result = HoldingRecomputeService.recompute(db, dry_run=True)
+        inconsistent = [item for item in result.holdings if item.changed]
+        return HoldingConsistencyReport(
+            holdings_checked=result.holdings_recomputed,
+            inconsistent=len(inconsistent),
+            warnings=result.warnings,
+            holdings=inconsistent,
+        )
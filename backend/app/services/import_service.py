@@ -5,17 +5,25 @@ Supported platforms:
 - TD Direct Investing (Canada)
 - Wealthsimple (Canada)
 """
+import asyncio
 import csv
 import io
+import multiprocessing
 import re
 import base64
-from datetime import datetime, date
+import hashlib
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, date, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 
 from sqlalchemy.orm import Session
 
+from ..config import settings
 from ..models.holding import Holding
 from ..models.transaction import Transaction
 from ..schemas.import_schema import (
@@ -23,8 +31,13 @@ from ..schemas.import_schema import (
     ParsedTransaction,
     ImportPreviewResponse,
     ImportResult,
+    FileImportResult,
+    BulkImportResult,
     SupportedFormat,
 )
+from .holding_recompute_service import HoldingRecomputeService
+from .ledger_sync_service import LedgerSyncService
+from ..utils.metrics import record_import
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +98,18 @@ US_SYMBOLS = {
 class ImportService:
     """Service for importing transactions from various platforms."""
 
+    # Batches parsed during preview, keyed by preview token, so the import
+    # step can apply them without the file being uploaded and parsed again
+    _prepared_batches: Dict[str, Dict] = {}
+    _prepared_batch_duration = timedelta(minutes=30)
+    # Most batches kept at once; the least recently previewed is dropped first
+    _prepared_batch_limit = 20
+
+    # Shared by all bulk uploads; started on first use (see parse_files_async)
+    _parse_pool: Optional[ProcessPoolExecutor] = None
+    # Below this total size, parsing in-process is faster than sending files to the pool
+    PARALLEL_PARSE_MIN_BYTES = 256 * 1024
+
     @staticmethod
     def get_supported_formats() -> List[SupportedFormat]:
         """Return list of supported import formats."""
@@ -403,6 +428,163 @@ class ImportService:
         else:
             return [], [f"Unsupported platform: {platform}"]
 
+    @staticmethod
+    def _load_existing_dedup_keys(db: Session, transactions: Optional[List[ParsedTransaction]] = None) -> Set[str]:
+        """
+        Load dedup keys for stored transactions.
+
+        When transactions are given, only rows that could collide with them (same
+        symbols, within their date range) are loaded. Selects only the key columns
+        instead of hydrating ORM objects. Decimals are normalized to remove
+        trailing zeros for consistent comparison.
+        """
+        query = db.query(
+            Transaction.transaction_date,
+            Transaction.symbol,
+            Transaction.transaction_type,
+            Transaction.quantity,
+            Transaction.price_per_share,
+        )
+        if transactions is not None:
+            if not transactions:
+                return set()
+            dates = [t.date for t in transactions]
+            query = query.filter(
+                Transaction.symbol.in_({t.symbol for t in transactions}),
+                Transaction.transaction_date.between(min(dates), max(dates)),
+            )
+        rows = query.all()
+        return {
+            f"{txn_date}|{symbol}|{txn_type}|{quantity.normalize()}|{price.normalize()}"
+            for txn_date, symbol, txn_type, quantity, price in rows
+        }
+
+    @staticmethod
+    def _apply_transaction_to_holding(holding: Holding, t: ParsedTransaction, warnings: List[str]) -> None:
+        """Update a holding's quantity, average cost and first purchase date for one transaction."""
+        warning = HoldingRecomputeService.apply_transaction(
+            holding, t.transaction_type, t.quantity, t.price_per_share, t.fees, t.date, t.symbol
+        )
+        if warning:
+            warnings.append(warning)
+
+    @staticmethod
+    def _build_transaction(
+        holding: Holding,
+        t: ParsedTransaction,
+        platform: ImportPlatform,
+        account_type: Optional[str]
+    ) -> Transaction:
+        """Build the Transaction row for an imported transaction."""
+        return Transaction(
+            holding_id=holding.id,
+            symbol=t.symbol,
+            transaction_type=t.transaction_type,
+            quantity=t.quantity,
+            price_per_share=t.price_per_share,
+            fees=t.fees,
+            transaction_date=t.date,
+            notes=f"Imported from {platform.value}" + (f" ({account_type})" if account_type else ""),
+        )
+
+    @staticmethod
+    def _new_holding(t: ParsedTransaction) -> Holding:
+        """Create an empty holding for a symbol seen for the first time (quantity set by transactions)."""
+        return Holding(
+            symbol=t.symbol,
+            company_name=t.company_name,
+            exchange=t.exchange,
+            country=t.country,
+            quantity=Decimal("0"),
+            avg_purchase_price=Decimal("0"),
+            currency=t.currency,
+            account_type=t.account_type,
+            first_purchase_date=t.date,
+            is_active=True,
+        )
+
+    @staticmethod
+    def _preview_token(content: str, platform: ImportPlatform, account_type: Optional[str]) -> str:
+        """Hash of the file content and import options, identifying a prepared batch."""
+        digest = hashlib.sha256(f"{platform.value}|{account_type or ''}|".encode('utf-8'))
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    @classmethod
+    def _prune_prepared_batches(cls, now: datetime, room_for: int = 0) -> None:
+        """
+        Drop prepared batches older than the cache duration, then the least
+        recently previewed ones until room_for more fit under the limit.
+        """
+        expired = [
+            token for token, batch in cls._prepared_batches.items()
+            if now - batch['timestamp'] >= cls._prepared_batch_duration
+        ]
+        for token in expired:
+            cls._prepared_batches.pop(token, None)
+
+        excess = len(cls._prepared_batches) + room_for - cls._prepared_batch_limit
+        if excess > 0:
+            oldest = sorted(cls._prepared_batches, key=lambda t: cls._prepared_batches[t]['timestamp'])
+            for token in oldest[:excess]:
+                cls._prepared_batches.pop(token, None)
+
+    @classmethod
+    def prepare_batch(
+        cls,
+        content: str,
+        platform: ImportPlatform,
+        account_type: Optional[str] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Parse file content and keep the result for a later import.
+
+        Returns (preview_token, batch). Previewing the same file with the same
+        options again reuses the stored batch instead of parsing it twice.
+        """
+        now = datetime.now()
+        token = cls._preview_token(content, platform, account_type)
+        batch = cls._prepared_batches.get(token)
+        cls._prune_prepared_batches(now, room_for=0 if batch is not None else 1)
+        if batch is None:
+            transactions, warnings = cls.parse_file(content, platform, account_type)
+            batch = {
+                'platform': platform,
+                'account_type': account_type,
+                'transactions': transactions,
+                'warnings': warnings,
+            }
+            cls._prepared_batches[token] = batch
+        batch['timestamp'] = now
+        return token, batch
+
+    @classmethod
+    def take_prepared_batch(
+        cls,
+        token: str,
+        platform: ImportPlatform,
+        account_type: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Remove and return a prepared batch, or None if it is unknown or expired.
+
+        The batch was parsed with the preview's platform and account type;
+        raises ValueError (and keeps the batch) if the import asks for
+        different ones, since applying it would silently ignore them.
+        """
+        batch = cls._prepared_batches.get(token)
+        if batch is None or datetime.now() - batch['timestamp'] >= cls._prepared_batch_duration:
+            cls._prepared_batches.pop(token, None)
+            return None
+        if batch['platform'] != platform:
+            raise ValueError(f"Preview was made for {batch['platform'].value}, not {platform.value}")
+        if (batch['account_type'] or None) != (account_type or None):
+            raise ValueError(
+                f"Preview was made for account type {batch['account_type'] or 'none'}, "
+                f"not {account_type or 'none'}. Please preview the file again."
+            )
+        return cls._prepared_batches.pop(token)
+
     @staticmethod
     def preview_import(
         db: Session,
@@ -410,20 +592,21 @@ class ImportService:
         platform: ImportPlatform,
         account_type: Optional[str] = None
     ) -> ImportPreviewResponse:
-        """Preview import without saving to database."""
-        transactions, warnings = ImportService.parse_file(content, platform, account_type)
+        """
+        Preview import without saving to database.
+
+        The parsed batch is kept for a while; pass the returned preview_token to
+        the import endpoints to apply it without uploading the file again.
+        """
+        token, batch = ImportService.prepare_batch(content, platform, account_type)
+        transactions = batch['transactions']
 
         # Get existing holdings
         existing_holdings = db.query(Holding).filter(Holding.is_active == True).all()
         existing_symbols = {h.symbol for h in existing_holdings}
 
         # Get existing transactions for deduplication
-        # Normalize decimals to remove trailing zeros for consistent comparison
-        existing_transactions = db.query(Transaction).all()
-        existing_dedup_keys = {
-            f"{t.transaction_date}|{t.symbol}|{t.transaction_type}|{t.quantity.normalize()}|{t.price_per_share.normalize()}"
-            for t in existing_transactions
-        }
+        existing_dedup_keys = ImportService._load_existing_dedup_keys(db, transactions)
 
         # Categorize symbols and count duplicates
         new_symbols = set()
@@ -448,7 +631,8 @@ class ImportService:
             new_symbols=sorted(list(new_symbols)),
             existing_symbols=sorted(list(import_existing_symbols)),
             potential_duplicates=potential_duplicates,
-            warnings=warnings,
+            warnings=list(batch['warnings']),
+            preview_token=token,
         )
 
     @staticmethod
@@ -460,8 +644,42 @@ class ImportService:
         skip_duplicates: bool = True
     ) -> ImportResult:
         """Import transactions into the database."""
+        started = time.perf_counter()
         transactions, warnings = ImportService.parse_file(content, platform, account_type)
+        result = ImportService._apply_batch(db, transactions, warnings, platform, account_type, skip_duplicates)
+        record_import(platform.value, result.transactions_imported, time.perf_counter() - started)
+        return result
 
+    @staticmethod
+    def import_prepared_batch(db: Session, batch: Dict, skip_duplicates: bool = True) -> ImportResult:
+        """
+        Import a batch parsed by preview_import.
+
+        Duplicates are re-checked against the database, since transactions may
+        have changed between preview and import.
+        """
+        started = time.perf_counter()
+        result = ImportService._apply_batch(
+            db,
+            batch['transactions'],
+            list(batch['warnings']),
+            batch['platform'],
+            batch['account_type'],
+            skip_duplicates,
+        )
+        record_import(batch['platform'].value, result.transactions_imported, time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    def _apply_batch(
+        db: Session,
+        transactions: List[ParsedTransaction],
+        warnings: List[str],
+        platform: ImportPlatform,
+        account_type: Optional[str],
+        skip_duplicates: bool
+    ) -> ImportResult:
+        """Write parsed transactions and update holdings."""
         if not transactions:
             return ImportResult(
                 success=False,
@@ -474,12 +692,7 @@ class ImportService:
             )
 
         # Get existing transactions for deduplication
-        # Normalize decimals to remove trailing zeros for consistent comparison
-        existing_transactions = db.query(Transaction).all()
-        existing_dedup_keys = {
-            f"{t.transaction_date}|{t.symbol}|{t.transaction_type}|{t.quantity.normalize()}|{t.price_per_share.normalize()}"
-            for t in existing_transactions
-        }
+        existing_dedup_keys = ImportService._load_existing_dedup_keys(db, transactions)
 
         # Track results
         imported_count = 0
@@ -489,7 +702,7 @@ class ImportService:
         errors = []
 
         # Sort transactions by date (oldest first) for proper cost basis calculation
-        transactions.sort(key=lambda t: t.date)
+        transactions = sorted(transactions, key=lambda t: t.date)
 
         # Group transactions by (symbol, account_type) to create/update holdings
         # This allows same symbol in multiple accounts (e.g., XEQT in both TFSA and FHSA)
@@ -497,6 +710,13 @@ class ImportService:
 
         # Get existing holdings keyed by (symbol, account_type)
         existing_holdings = {(h.symbol, h.account_type): h for h in db.query(Holding).all()}
+        # Keep shares entered outside the ledger when the sync rebuilds these holdings
+        HoldingRecomputeService.record_openings(db, {
+            existing_holdings[(t.symbol, t.account_type)]
+            for t in transactions if (t.symbol, t.account_type) in existing_holdings
+        })
+        # Earliest imported date per holding, for the ledger sync
+        changed_from: Dict[int, date] = {}
 
         for t in transactions:
             holding_key = (t.symbol, t.account_type)
@@ -519,18 +739,7 @@ class ImportService:
                         holdings_map[holding_key] = holding
                     else:
                         # Create new holding with zero quantity (will be updated by transaction)
-                        holding = Holding(
-                            symbol=t.symbol,
-                            company_name=t.company_name,
-                            exchange=t.exchange,
-                            country=t.country,
-                            quantity=Decimal("0"),
-                            avg_purchase_price=Decimal("0"),
-                            currency=t.currency,
-                            account_type=t.account_type,
-                            first_purchase_date=t.date,
-                            is_active=True,
-                        )
+                        holding = ImportService._new_holding(t)
                         db.add(holding)
                         db.flush()  # Get ID
                         holdings_map[holding_key] = holding
@@ -540,36 +749,12 @@ class ImportService:
                 holding = holdings_map[holding_key]
 
                 # Update holding quantities and avg cost
-                if t.transaction_type == "BUY":
-                    total_cost = (holding.quantity * holding.avg_purchase_price) + \
-                                 (t.quantity * t.price_per_share) + t.fees
-                    holding.quantity += t.quantity
-                    if holding.quantity > 0:
-                        holding.avg_purchase_price = total_cost / holding.quantity
-
-                    # Update first purchase date if earlier
-                    if holding.first_purchase_date is None or t.date < holding.first_purchase_date:
-                        holding.first_purchase_date = t.date
-                else:  # SELL
-                    if holding.quantity >= t.quantity:
-                        holding.quantity -= t.quantity
-                    else:
-                        warnings.append(f"Sell quantity ({t.quantity}) exceeds holding quantity ({holding.quantity}) for {t.symbol}")
-                        holding.quantity = Decimal("0")
+                ImportService._apply_transaction_to_holding(holding, t, warnings)
 
                 # Create transaction record
-                db_transaction = Transaction(
-                    holding_id=holding.id,
-                    symbol=t.symbol,
-                    transaction_type=t.transaction_type,
-                    quantity=t.quantity,
-                    price_per_share=t.price_per_share,
-                    fees=t.fees,
-                    transaction_date=t.date,
-                    notes=f"Imported from {platform.value}" + (f" ({account_type})" if account_type else ""),
-                )
-                db.add(db_transaction)
+                db.add(ImportService._build_transaction(holding, t, platform, account_type))
                 imported_count += 1
+                changed_from[holding.id] = min(t.date, changed_from.get(holding.id, t.date))
 
                 # Add to existing dedup keys to prevent duplicates within same import
                 existing_dedup_keys.add(t.dedup_key)
@@ -583,6 +768,9 @@ class ImportService:
             if holding.quantity <= Decimal("0.0001"):
                 holding.is_active = False
 
+        for holding_id, from_date in changed_from.items():
+            LedgerSyncService.mark_dirty(db, holding_id, from_date)
+
         try:
             db.commit()
         except Exception as e:
@@ -608,3 +796,231 @@ class ImportService:
             errors=errors,
             warnings=warnings,
         )
+
+    @staticmethod
+    def _parse_files(
+        files: List[Tuple[str, bytes]],
+        platform: ImportPlatform,
+        account_type: Optional[str] = None
+    ) -> List[Tuple[List[ParsedTransaction], List[str], Optional[str], float]]:
+        """Decode and parse several uploaded files in-process, one after another."""
+        return [_parse_file_worker((filename, content, platform, account_type)) for filename, content in files]
+
+    @classmethod
+    def _get_parse_pool(cls) -> ProcessPoolExecutor:
+        if cls._parse_pool is None:
+            # Spawned workers don't inherit the server's threads, locks or connections
+            cls._parse_pool = ProcessPoolExecutor(
+                max_workers=settings.import_max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return cls._parse_pool
+
+    @classmethod
+    def shutdown_parse_pool(cls) -> None:
+        if cls._parse_pool is not None:
+            cls._parse_pool.shutdown(wait=False, cancel_futures=True)
+            cls._parse_pool = None
+
+    @classmethod
+    async def parse_files_async(
+        cls,
+        files: List[Tuple[str, bytes]],
+        platform: ImportPlatform,
+        account_type: Optional[str] = None
+    ) -> List[Tuple[List[ParsedTransaction], List[str], Optional[str], float]]:
+        """
+        Decode and parse uploaded files without blocking the event loop.
+
+        Several large files are parsed in the shared process pool, since CSV
+        parsing and Decimal construction are CPU-bound. A single file or a small
+        upload is parsed in a worker thread instead, where pickling the files
+        to another process would cost more than it saves. Falls back to the
+        thread if the pool breaks.
+        """
+        loop = asyncio.get_running_loop()
+        total_bytes = sum(len(content) for _, content in files)
+
+        if (
+            len(files) > 1
+            and settings.import_max_workers > 1
+            and total_bytes >= cls.PARALLEL_PARSE_MIN_BYTES
+        ):
+            try:
+                pool = cls._get_parse_pool()
+                return list(await asyncio.gather(*(
+                    loop.run_in_executor(pool, _parse_file_worker, (filename, content, platform, account_type))
+                    for filename, content in files
+                )))
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Parallel parse failed ({e}), parsing files in-process")
+                cls.shutdown_parse_pool()
+
+        return await loop.run_in_executor(None, cls._parse_files, files, platform, account_type)
+
+    @staticmethod
+    def import_transactions_bulk(
+        db: Session,
+        files: List[Tuple[str, bytes]],
+        platform: ImportPlatform,
+        account_type: Optional[str] = None,
+        skip_duplicates: bool = True,
+        parsed: Optional[List[Tuple[List[ParsedTransaction], List[str], Optional[str], float]]] = None
+    ) -> BulkImportResult:
+        """
+        Import several files as one batch.
+
+        - Files are decoded and parsed (pass parsed from parse_files_async to
+          reuse a parse done off the request thread; otherwise parsed in-process)
+        - Transactions from all files are merged and sorted by date, so average
+          cost is correct even when files overlap or arrive out of order
+        - Deduplication runs once against the database and across files
+        - Rows are written in a single database transaction with a savepoint per
+          file; a file that fails to write is rolled back without affecting the others
+        """
+        started = time.perf_counter()
+        if parsed is None:
+            parsed = ImportService._parse_files(files, platform, account_type)
+
+        file_results = []
+        for (filename, _), (transactions, warnings, error, parse_ms) in zip(files, parsed):
+            file_results.append(FileImportResult(
+                filename=filename,
+                success=error is None and bool(transactions),
+                transactions_parsed=len(transactions),
+                parse_ms=round(parse_ms, 1),
+                errors=[error] if error else ([] if transactions else ["No valid transactions found in file"]),
+                warnings=warnings,
+            ))
+
+        # Merge all files and sort globally by date (stable, so file order breaks ties)
+        merged = sorted(
+            ((index, t) for index, (transactions, _, _, _) in enumerate(parsed) for t in transactions),
+            key=lambda item: item[1].date
+        )
+
+        # Deduplicate once against the database and across files
+        seen_keys = ImportService._load_existing_dedup_keys(db, [t for _, t in merged])
+        accepted_by_file = defaultdict(list)
+        for index, t in merged:
+            if skip_duplicates and t.dedup_key in seen_keys:
+                file_results[index].duplicates_skipped += 1
+                continue
+            seen_keys.add(t.dedup_key)
+            accepted_by_file[index].append(t)
+
+        existing_holdings = {(h.symbol, h.account_type): h for h in db.query(Holding).all()}
+        holdings_created = 0
+        # Keep shares entered outside the ledger when the sync rebuilds these holdings
+        HoldingRecomputeService.record_openings(db, {
+            existing_holdings[(t.symbol, t.account_type)]
+            for transactions in accepted_by_file.values() for t in transactions
+            if (t.symbol, t.account_type) in existing_holdings
+        })
+
+        # Phase 1: write transaction rows, one savepoint per file
+        for index, file_result in enumerate(file_results):
+            accepted = accepted_by_file.get(index)
+            if not accepted:
+                continue
+
+            write_started = time.perf_counter()
+            created_keys = []
+            try:
+                with db.begin_nested():
+                    for t in accepted:
+                        holding_key = (t.symbol, t.account_type)
+                        holding = existing_holdings.get(holding_key)
+                        if holding is None:
+                            holding = ImportService._new_holding(t)
+                            db.add(holding)
+                            db.flush()  # Get ID
+                            existing_holdings[holding_key] = holding
+                            created_keys.append(holding_key)
+                        db.add(ImportService._build_transaction(holding, t, platform, account_type))
+                    db.flush()
+                file_result.transactions_imported = len(accepted)
+                holdings_created += len(created_keys)
+            except Exception as e:
+                logger.error(f"Bulk import: rolled back {file_result.filename}: {e}")
+                for holding_key in created_keys:
+                    existing_holdings.pop(holding_key, None)
+                accepted_by_file[index] = []
+                file_result.success = False
+                file_result.errors.append(f"Database error: {str(e)}")
+            file_result.write_ms = round((time.perf_counter() - write_started) * 1000, 1)
+
+        # Phase 2: apply surviving transactions to holdings in global date order
+        warnings = []
+        touched = {}
+        changed_from: Dict[int, date] = {}
+        holdings_updated = 0
+        surviving = {id(t) for transactions in accepted_by_file.values() for t in transactions}
+        for index, t in merged:
+            if id(t) not in surviving:
+                continue
+            holding = existing_holdings[(t.symbol, t.account_type)]
+            if not holding.is_active:
+                holding.is_active = True
+                holdings_updated += 1
+            touched[id(holding)] = holding
+            changed_from[holding.id] = min(t.date, changed_from.get(holding.id, t.date))
+            ImportService._apply_transaction_to_holding(holding, t, warnings)
+
+        # Mark holdings with zero quantity as inactive
+        for holding in touched.values():
+            if holding.quantity <= Decimal("0.0001"):
+                holding.is_active = False
+
+        for holding_id, from_date in changed_from.items():
+            LedgerSyncService.mark_dirty(db, holding_id, from_date)
+
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for file_result in file_results:
+                file_result.transactions_imported = 0
+                file_result.success = False
+            return BulkImportResult(
+                success=False,
+                transactions_imported=0,
+                holdings_created=0,
+                holdings_updated=0,
+                duplicates_skipped=sum(f.duplicates_skipped for f in file_results),
+                errors=[f"Database error: {str(e)}"],
+                warnings=warnings,
+                files=file_results,
+                total_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        imported = sum(f.transactions_imported for f in file_results)
+        logger.info(f"Bulk import: {imported} transactions from {len(files)} files in {total_ms} ms")
+        record_import(platform.value, imported, total_ms / 1000)
+
+        return BulkImportResult(
+            success=all(f.success for f in file_results),
+            transactions_imported=imported,
+            holdings_created=holdings_created,
+            holdings_updated=holdings_updated,
+            duplicates_skipped=sum(f.duplicates_skipped for f in file_results),
+            errors=[f"{f.filename}: {e}" for f in file_results for e in f.errors],
+            warnings=[f"{f.filename}: {w}" for f in file_results for w in f.warnings] + warnings,
+            files=file_results,
+            total_ms=total_ms,
+        )
+
+
+def _parse_file_worker(job: Tuple[str, bytes, ImportPlatform, Optional[str]]) -> Tuple[List[ParsedTransaction], List[str], Optional[str], float]:
+    """Decode and parse one uploaded file. Module-level so it can run in a process pool."""
+    filename, content, platform, account_type = job
+    started = time.perf_counter()
+    try:
+        transactions, warnings = ImportService.parse_file(content.decode('utf-8'), platform, account_type)
+        error = None
+    except UnicodeDecodeError:
+        transactions, warnings, error = [], [], "File encoding not supported"
+    except Exception as e:
+        transactions, warnings, error = [], [], str(e)
+    return transactions, warnings, error, (time.perf_counter() - started) * 1000
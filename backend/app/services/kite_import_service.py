@@ -12,6 +12,8 @@ from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+from ..utils.xlsx import read_table
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,39 +33,36 @@ class KiteHolding:
 class KiteImportService:
     """Service for importing Kite (Zerodha) holdings."""
     
+    # Numeric columns summed across statements
+    NUMERIC_COLUMNS = ['Buy Quantity', 'Buy Value', 'Sell Quantity', 'Sell Value']
+
     @staticmethod
     def parse_xlsx_content(content: bytes) -> Tuple[pd.DataFrame, List[str]]:
         """Parse a single Kite AGTS xlsx file."""
         warnings = []
         
         try:
-            # Read excel file
-            df = pd.read_excel(io.BytesIO(content), header=None)
+            # Read the sheet once and locate the header row containing 'Symbol'
+            df = read_table(content, 'Symbol')
             
-            # Find the header row containing 'Symbol'
-            header_row = None
-            for i, row in df.iterrows():
-                if 'Symbol' in str(row.values):
-                    header_row = i
-                    break
-            
-            if header_row is None:
+            if df is None:
                 warnings.append("Could not find header row with 'Symbol'")
                 return pd.DataFrame(), warnings
             
-            # Re-read with proper header
-            df = pd.read_excel(io.BytesIO(content), header=header_row)
-            
             # Filter to rows with valid symbols
             df = df[df['Symbol'].notna()]
             
             # Ensure required columns exist
-            required_cols = ['Symbol', 'Exchange', 'Buy Quantity', 'Buy Value', 'Sell Quantity', 'Sell Value']
+            required_cols = ['Symbol', 'Exchange'] + KiteImportService.NUMERIC_COLUMNS
             missing = [c for c in required_cols if c not in df.columns]
             if missing:
                 warnings.append(f"Missing columns: {missing}")
                 return pd.DataFrame(), warnings
             
+            df = df[required_cols].copy()
+            for col in KiteImportService.NUMERIC_COLUMNS:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            
             return df, warnings
             
         except Exception as e:
@@ -80,38 +79,40 @@ class KiteImportService:
         combined = pd.concat(dataframes, ignore_index=True)
         
         # Group by symbol and exchange, sum quantities and values
-        grouped = combined.groupby(['Symbol', 'Exchange']).agg({
-            'Buy Quantity': 'sum',
-            'Buy Value': 'sum',
-            'Sell Quantity': 'sum',
-            'Sell Value': 'sum'
-        }).reset_index()
+        grouped = combined.groupby(['Symbol', 'Exchange'])[KiteImportService.NUMERIC_COLUMNS].sum().reset_index()
+        
+        # Only include positive holdings (re-checked in Decimal below)
+        grouped = grouped[grouped['Buy Quantity'] > grouped['Sell Quantity']]
         
         holdings = []
-        for _, row in grouped.iterrows():
-            buy_qty = Decimal(str(row['Buy Quantity']))
-            sell_qty = Decimal(str(row['Sell Quantity']))
-            buy_value = Decimal(str(row['Buy Value']))
-            sell_value = Decimal(str(row['Sell Value']))
+        for symbol, exchange, buy_qty, buy_value, sell_qty, sell_value in zip(
+            grouped['Symbol'], grouped['Exchange'],
+            grouped['Buy Quantity'], grouped['Buy Value'],
+            grouped['Sell Quantity'], grouped['Sell Value'],
+        ):
+            buy_qty = Decimal(str(buy_qty))
+            sell_qty = Decimal(str(sell_qty))
+            buy_value = Decimal(str(buy_value))
+            sell_value = Decimal(str(sell_value))
             
             net_qty = buy_qty - sell_qty
+            if net_qty <= 0:
+                continue
+            
+            # Calculate average cost from total buy value / total buy qty
+            # This is simplified - doesn't account for FIFO properly
+            avg_cost = buy_value / buy_qty if buy_qty > 0 else Decimal("0")
             
-            # Only include positive holdings
-            if net_qty > 0:
-                # Calculate average cost from total buy value / total buy qty
-                # This is simplified - doesn't account for FIFO properly
-                avg_cost = buy_value / buy_qty if buy_qty > 0 else Decimal("0")
-                
-                holdings.append(KiteHolding(
-                    symbol=row['Symbol'],
-                    exchange=row['Exchange'],
-                    quantity=net_qty,
-                    avg_cost=avg_cost.quantize(Decimal("0.01")),
-                    total_buy_value=buy_value,
-                    total_sell_value=sell_value,
-                    total_buy_qty=buy_qty,
-                    total_sell_qty=sell_qty,
-                ))
+            holdings.append(KiteHolding(
+                symbol=symbol,
+                exchange=exchange,
+                quantity=net_qty,
+                avg_cost=avg_cost.quantize(Decimal("0.01")),
+                total_buy_value=buy_value,
+                total_sell_value=sell_value,
+                total_buy_qty=buy_qty,
+                total_sell_qty=sell_qty,
+            ))
         
         return holdings
     
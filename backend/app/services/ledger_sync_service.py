@@ -0,0 +1,172 @@
+"""
+Ledger sync service.
+
+Transaction writes record which holding changed and from which date
+(mark_dirty, in the same database transaction as the write). The sync worker
+then brings derived data up to date for just those ranges: the holding itself
+is rebuilt from its transactions, its stored daily values are rewritten for
+snapshot dates on or after the change, and region and snapshot totals are
+re-derived for those dates from the stored values. Nothing outside the dirty
+ranges is recomputed and no prices are fetched for dates already valued.
+
+Processing runs right after each write (as a response background task) and on
+a slow poll for marks left by imports or an interrupted run.
+"""
+import asyncio
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.holding_daily_value import HoldingDailyValue
+from ..models.ledger_change import LedgerChange
+from ..models.portfolio_snapshot import PortfolioSnapshot
+from ..utils.metrics import time_job
+from .holding_recompute_service import HoldingRecomputeService
+from .snapshot_service import SnapshotService
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerSyncService:
+    """Service for propagating transaction changes to derived data."""
+
+    _task: Optional[asyncio.Task] = None
+    # One sync at a time; marks written meanwhile are picked up by the next pass
+    _lock = threading.Lock()
+
+    last_synced_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    @staticmethod
+    def mark_dirty(db: Session, holding_id: int, from_date: date) -> None:
+        """Record that holding_id's derived data is stale from from_date (caller commits)."""
+        db.add(LedgerChange(holding_id=holding_id, from_date=from_date))
+
+    @staticmethod
+    def pending(db: Session) -> int:
+        return db.query(func.count(LedgerChange.id)).scalar() or 0
+
+    @classmethod
+    def process(cls, db: Optional[Session] = None) -> Dict:
+        """
+        Recompute derived data for every pending mark.
+
+        Marks for the same holding are merged (earliest date wins). Snapshot
+        dates with no stored per-holding values predate that table and can't
+        be patched per holding, so those dates are rebuilt with create_snapshot.
+        Marks are removed in the same commit as the recomputed rows, so an
+        interrupted run is simply repeated.
+        """
+        owns_session = db is None
+        db = db or SessionLocal()
+        stats = {"holdings": 0, "dates": 0, "full_snapshots": 0}
+        try:
+            with cls._lock, time_job("ledger_sync"):
+                while True:
+                    marks = db.query(LedgerChange.id, LedgerChange.holding_id, LedgerChange.from_date).all()
+                    if not marks:
+                        break
+                    cls._apply(db, marks, stats)
+            cls.last_synced_at = datetime.now()
+            cls.last_error = None
+        except Exception as e:
+            db.rollback()
+            cls.last_error = str(e)
+            logger.error(f"Ledger sync failed: {e}")
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        if stats["holdings"]:
+            logger.info(
+                f"Ledger sync: {stats['holdings']} holdings across {stats['dates']} dates "
+                f"({stats['full_snapshots']} full snapshots)"
+            )
+        return stats
+
+    @staticmethod
+    def _apply(db: Session, marks, stats: Dict) -> None:
+        ranges: Dict[int, date] = {}
+        for _, holding_id, from_date in marks:
+            if holding_id not in ranges or from_date < ranges[holding_id]:
+                ranges[holding_id] = from_date
+        earliest = min(ranges.values())
+
+        HoldingRecomputeService.recompute(db, holding_ids=list(ranges), commit=False)
+
+        snapshot_dates = [
+            row[0] for row in db.query(PortfolioSnapshot.snapshot_date).filter(
+                PortfolioSnapshot.snapshot_date >= earliest
+            ).order_by(PortfolioSnapshot.snapshot_date)
+        ]
+        valued_dates = {
+            row[0] for row in db.query(HoldingDailyValue.value_date).filter(
+                HoldingDailyValue.value_date >= earliest
+            ).distinct()
+        }
+        legacy_dates = [d for d in snapshot_dates if d not in valued_dates]
+
+        # create_snapshot commits on its own; the marks stay until the commit below
+        for snapshot_date in legacy_dates:
+            SnapshotService.create_snapshot(db, snapshot_date)
+
+        dates_by_holding = {
+            holding_id: [d for d in snapshot_dates if d >= from_date and d in valued_dates]
+            for holding_id, from_date in ranges.items()
+        }
+        touched = sorted({d for dates in dates_by_holding.values() for d in dates})
+
+        for holding_id, dates in dates_by_holding.items():
+            SnapshotService.recompute_holding_values(db, holding_id, dates)
+        SnapshotService.refresh_totals(db, touched)
+
+        db.query(LedgerChange).filter(
+            LedgerChange.id.in_([mark_id for mark_id, _, _ in marks])
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        stats["holdings"] += len(ranges)
+        stats["dates"] += len(touched)
+        stats["full_snapshots"] += len(legacy_dates)
+
+    @classmethod
+    def process_quietly(cls) -> None:
+        """process() for background tasks: failures are logged and retried by the poll."""
+        try:
+            cls.process()
+        except Exception:
+            pass
+
+    @classmethod
+    async def _sync_loop(cls) -> None:
+        logger.info("Ledger sync loop started")
+        loop = asyncio.get_event_loop()
+        while True:
+            await loop.run_in_executor(None, cls.process_quietly)
+            await asyncio.sleep(settings.ledger_sync_seconds)
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the poll for leftover marks if enabled and not already running."""
+        if settings.ledger_sync_seconds <= 0:
+            logger.info("Ledger sync poll disabled")
+            return
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._sync_loop())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
@@ -0,0 +1,368 @@
+"""
+Deterministic market simulator.
+
+Serves prices in place of Yahoo Finance when settings.price_provider is
+"simulated", so the price pipeline can be benchmarked and load-tested offline
+with results that are identical run to run.
+
+Every ticker gets a seeded GBM path starting at settings.sim_start_date. Daily
+shocks share a global factor and a per-market factor (CA, US, IN), giving
+settings.sim_correlation within a market and half of it across markets.
+Markets are closed on weekends and on their exchange holidays. Some tickers
+pay quarterly dividends and tickers trading high may split; history is returned
+adjusted for both (as yfinance does with auto_adjust), while the latest close
+is the traded price.
+
+Paths depend only on the seed and the ticker, never on which other tickers
+were requested or in what order. Calls can be given latency and a failure
+rate (settings.sim_latency_ms, sim_latency_jitter_ms, sim_failure_rate); those
+draws come from their own seeded stream.
+"""
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from dateutil.easter import easter
+
+from ..config import settings
+from ..utils.metrics import observe_yfinance
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+# Per-ticker random streams (separate so each stays prefix-stable as the path grows)
+_PARAMS, _SHOCKS, _SPLITS, _SPLIT_RATIOS, _GAPS, _SPREADS, _VOLUME = range(7)
+
+SECTORS = [
+    "Technology", "Financial Services", "Energy", "Healthcare", "Industrials",
+    "Consumer Defensive", "Utilities", "Real Estate", "Basic Materials",
+]
+
+MARKET_CURRENCY = {"CA": "CAD", "US": "USD", "IN": "INR"}
+
+
+class SimulatedProviderError(Exception):
+    """Injected provider failure (settings.sim_failure_rate)."""
+
+
+def market_for(ticker: str) -> str:
+    """Market of a yfinance-style ticker, from its suffix."""
+    if ticker.endswith((".TO", ".V")):
+        return "CA"
+    if ticker.endswith((".NS", ".BO")):
+        return "IN"
+    return "US"
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday of a month (n=-1 for the last)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Weekend holidays move to the adjacent Friday or Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def market_holidays(market: str, year: int) -> set:
+    """
+    Exchange holidays for a year. TSX and NYSE follow their published rules;
+    NSE only has its fixed-date holidays (the lunar-calendar ones are omitted).
+    """
+    if market == "IN":
+        return {date(year, 1, 26), date(year, 5, 1), date(year, 8, 15), date(year, 10, 2), date(year, 12, 25)}
+
+    good_friday = easter(year) - timedelta(days=2)
+    days = {
+        _observed(date(year, 1, 1)),
+        good_friday,
+        _nth_weekday(year, 9, 0, 1),  # Labour Day
+        _observed(date(year, 12, 25)),
+    }
+    if market == "CA":
+        victoria = date(year, 5, 24) - timedelta(days=date(year, 5, 24).weekday())
+        boxing = date(year, 12, 26)
+        days |= {
+            _nth_weekday(year, 2, 0, 3),  # Family Day
+            victoria,
+            _observed(date(year, 7, 1)),
+            _nth_weekday(year, 8, 0, 1),  # Civic Holiday
+            _nth_weekday(year, 10, 0, 2),  # Thanksgiving
+            boxing + timedelta(days=2) if boxing.weekday() in (5, 6) else boxing,
+        }
+    else:
+        days |= {
+            _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+            _nth_weekday(year, 2, 0, 3),  # Presidents' Day
+            _nth_weekday(year, 5, 0, -1),  # Memorial Day
+            _observed(date(year, 7, 4)),
+            _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        }
+        if year >= 2022:
+            days.add(_observed(date(year, 6, 19)))
+    return days
+
+
+class _Path:
+    """One ticker's simulated trading days, adjusted OHLCV and corporate actions."""
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume", "actions")
+
+    def __init__(self, dates, open_, high, low, close, volume, actions):
+        self.dates = dates
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.actions = actions
+
+    def index_on_or_before(self, day: date) -> int:
+        """Position of the last trading day <= day (-1 if none)."""
+        return int(np.searchsorted(self.dates, np.datetime64(day, "D"), side="right")) - 1
+
+
+class MarketSimulator:
+    """Seeded price provider used when settings.price_provider == "simulated"."""
+
+    SPLIT_CHECKS = 0.5  # Board meetings per year that may split the stock...
+    SPLIT_ABOVE = 300  # ...if it trades above this
+    SPLIT_RATIOS = (2, 3, 4)
+    DIVIDEND_SHARE = 0.4  # Fraction of tickers paying quarterly dividends
+
+    _lock = threading.Lock()
+    # Paths and factors are cached for the current day; the next day extends them
+    _horizon: Optional[date] = None
+    _weekdays: Optional[np.ndarray] = None
+    _factors: Dict[str, np.ndarray] = {}
+    _paths: Dict[str, _Path] = {}
+    _call_rng: Optional[np.random.Generator] = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop cached paths and restart the latency/failure stream (e.g. after changing settings)."""
+        with cls._lock:
+            cls._horizon = None
+            cls._weekdays = None
+            cls._factors = {}
+            cls._paths = {}
+            cls._call_rng = None
+
+    # --- provider calls -------------------------------------------------
+
+    @classmethod
+    def _call(cls, operation: str) -> None:
+        """Apply configured latency and failure injection to one provider call."""
+        with observe_yfinance(operation):
+            with cls._lock:
+                if cls._call_rng is None:
+                    cls._call_rng = np.random.default_rng([settings.sim_seed, 0xCA11])
+                jitter, roll = cls._call_rng.random(2)
+            delay_ms = settings.sim_latency_ms + jitter * settings.sim_latency_jitter_ms
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000)
+            if roll < settings.sim_failure_rate:
+                raise SimulatedProviderError(f"Simulated {operation} failure")
+
+    @classmethod
+    def last_closes(cls, tickers: List[str], count: int = 1) -> Dict[str, List[Decimal]]:
+        """Latest count closes per ticker as of today, oldest first (one batched call)."""
+        cls._call("download")
+        today = date.today()
+        results = {}
+        for ticker in tickers:
+            path = cls._path(ticker)
+            end = path.index_on_or_before(today)
+            if end < 0:
+                continue
+            start = max(0, end - count + 1)
+            results[ticker] = [_decimal(v) for v in path.close[start:end + 1]]
+        return results
+
+    @classmethod
+    def download(cls, tickers: List[str], start: date, end: date) -> Dict[str, List[Tuple[date, Decimal]]]:
+        """Adjusted (date, close) pairs per ticker for trading days in [start, end] (one batched call)."""
+        cls._call("download")
+        results = {}
+        for ticker in tickers:
+            path = cls._path(ticker)
+            lo, hi = cls._bounds(path, start, end)
+            results[ticker] = [
+                (d.item(), _decimal(c)) for d, c in zip(path.dates[lo:hi], path.close[lo:hi])
+            ]
+        return results
+
+    @classmethod
+    def history(cls, ticker: str, start: date, end: date) -> List[Dict]:
+        """Adjusted daily bars in [start, end] shaped like PriceService.get_historical_prices."""
+        cls._call("history")
+        path = cls._path(ticker)
+        lo, hi = cls._bounds(path, start, end)
+        return [
+            {
+                'date': path.dates[i].item(),
+                'open': _decimal(path.open[i]),
+                'high': _decimal(path.high[i]),
+                'low': _decimal(path.low[i]),
+                'close': _decimal(path.close[i]),
+                'volume': int(path.volume[i]),
+            }
+            for i in range(lo, hi)
+        ]
+
+    @classmethod
+    def company_info(cls, ticker: str) -> Dict:
+        cls._call("info")
+        h = _ticker_hash(ticker)
+        market = market_for(ticker)
+        return {
+            'name': f"{ticker.split('.')[0]} Simulated Corp",
+            'sector': SECTORS[h % len(SECTORS)],
+            'industry': None,
+            'market_cap': int(cls._path(ticker).close[-1] * (10_000_000 + h % 990_000_000)),
+            'currency': MARKET_CURRENCY[market],
+        }
+
+    @classmethod
+    def corporate_actions(cls, ticker: str) -> List[Dict]:
+        """Dividends and splits up to today: {date, type: 'dividend'|'split', value}."""
+        return list(cls._path(ticker).actions)
+
+    # --- path generation ------------------------------------------------
+
+    @staticmethod
+    def _bounds(path: _Path, start: date, end: date) -> Tuple[int, int]:
+        lo = int(np.searchsorted(path.dates, np.datetime64(start, "D"), side="left"))
+        hi = path.index_on_or_before(min(end, date.today())) + 1
+        return lo, max(lo, hi)
+
+    @classmethod
+    def _path(cls, ticker: str) -> _Path:
+        today = date.today()
+        with cls._lock:
+            if cls._horizon != today:
+                cls._horizon = today
+                cls._weekdays = None
+                cls._factors = {}
+                cls._paths = {}
+            path = cls._paths.get(ticker)
+            if path is None:
+                path = cls._generate(ticker, today)
+                cls._paths[ticker] = path
+        return path
+
+    @classmethod
+    def _calendar(cls, today: date) -> np.ndarray:
+        if cls._weekdays is None:
+            days = np.arange(np.datetime64(settings.sim_start_date, "D"), np.datetime64(today, "D") + 1)
+            cls._weekdays = days[np.is_busday(days)]
+        return cls._weekdays
+
+    @classmethod
+    def _factor(cls, name: str, n: int) -> np.ndarray:
+        """Shared daily shocks, one series per factor name, indexed by weekday."""
+        if name not in cls._factors:
+            rng = np.random.default_rng([settings.sim_seed, zlib.crc32(f"factor:{name}".encode())])
+            cls._factors[name] = rng.standard_normal(n)
+        return cls._factors[name]
+
+    @classmethod
+    def _generate(cls, ticker: str, today: date) -> _Path:
+        weekdays = cls._calendar(today)
+        n = len(weekdays)
+        market = market_for(ticker)
+        h = _ticker_hash(ticker)
+
+        def stream(kind: int) -> np.random.Generator:
+            return np.random.default_rng([settings.sim_seed, h, kind])
+
+        params = stream(_PARAMS)
+        mu = params.uniform(0.04, 0.16)
+        sigma = params.uniform(0.12, 0.40)
+        start_price = float(np.exp(params.uniform(np.log(20), np.log(500))))
+        pays_dividends = params.random() < cls.DIVIDEND_SHARE
+        dividend_yield = params.uniform(0.01, 0.05)
+        dividend_offset = int(params.integers(0, 63))
+
+        years = range(weekdays[0].item().year, today.year + 1)
+        holidays = np.array(
+            sorted(d for y in years for d in market_holidays(market, y)), dtype="datetime64[D]"
+        )
+        trading = ~np.isin(weekdays, holidays)
+
+        # Correlated shocks: global and market factors plus the ticker's own noise
+        corr = min(max(settings.sim_correlation, 0.0), 1.0)
+        z = (
+            np.sqrt(corr / 2) * cls._factor("global", n)
+            + np.sqrt(corr / 2) * cls._factor(market, n)
+            + np.sqrt(1 - corr) * stream(_SHOCKS).standard_normal(n)
+        )
+        dt = 1 / TRADING_DAYS
+        log_returns = np.where(trading, (mu - sigma ** 2 / 2) * dt + sigma * np.sqrt(dt) * z, 0.0)
+
+        dates = weekdays[trading]
+        growth = np.exp(log_returns[trading])
+        m = len(dates)
+
+        # Corporate actions on trading days: quarterly dividends (fraction of the
+        # prior close), and splits once the traded price is high, never both on one day
+        positions = np.arange(m)
+        dividend = np.zeros(m)
+        if pays_dividends:
+            dividend[(positions % 63 == dividend_offset) & (positions > 0)] = dividend_yield / 4
+        unsplit = start_price * np.cumprod(growth - dividend)
+        candidates = (stream(_SPLITS).random(m) < cls.SPLIT_CHECKS / TRADING_DAYS) & (dividend == 0) & (positions > 0)
+        ratios = np.array(cls.SPLIT_RATIOS)[stream(_SPLIT_RATIOS).integers(0, len(cls.SPLIT_RATIOS), m)]
+        split = np.ones(m)
+        done = 1.0
+        for i in np.flatnonzero(candidates):
+            if unsplit[i] / done > cls.SPLIT_ABOVE:
+                split[i] = ratios[i]
+                done *= ratios[i]
+
+        # Traded prices: raw_t = raw_{t-1} * (growth_t - dividend_t) / split_t
+        raw = unsplit / np.cumprod(split)
+        # Adjust each close by every action after it (what auto_adjust returns)
+        action_factor = (1 - dividend) / split
+        later = np.cumprod(action_factor[::-1])[::-1]
+        adjustment = np.append(later[1:], 1.0)
+        close = raw * adjustment
+
+        prev_close = np.concatenate(([close[0]], close[:-1]))
+        open_ = prev_close * np.exp(stream(_GAPS).normal(0, sigma * np.sqrt(dt) / 3, m))
+        spread = np.abs(stream(_SPREADS).normal(0, sigma * np.sqrt(dt) / 2, (m, 2)))
+        high = np.maximum(open_, close) * (1 + spread[:, 0])
+        low = np.minimum(open_, close) * (1 - spread[:, 1])
+        volume = np.round(stream(_VOLUME).lognormal(np.log(500_000), 0.6, m))
+
+        raw_prev = np.concatenate(([start_price], raw[:-1]))
+        actions = []
+        for i in np.flatnonzero((dividend > 0) | (split > 1)):
+            if split[i] > 1:
+                actions.append({'date': dates[i].item(), 'type': 'split', 'value': Decimal(int(split[i]))})
+            else:
+                actions.append({'date': dates[i].item(), 'type': 'dividend', 'value': _decimal(raw_prev[i] * dividend[i])})
+
+        return _Path(dates, open_, high, low, close, volume, actions)
+
+
+def _ticker_hash(ticker: str) -> int:
+    return zlib.crc32(ticker.upper().encode())
+
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(str(round(float(value), 4)))
@@ -8,6 +8,10 @@ import time
 
 from sqlalchemy.orm import Session
 
+from ..config import settings
+from ..utils.metrics import observe_yfinance, record_cache
+from .market_simulator import MarketSimulator
+
 logger = logging.getLogger(__name__)
 
 # Exchange to yfinance suffix mapping
@@ -25,6 +29,9 @@ class PriceService:
     """
     Service for fetching stock prices using yfinance.
 
+    With settings.price_provider = "simulated", every upstream call is answered
+    by MarketSimulator instead (caching and fallbacks still apply).
+
     NOTE: yfinance v0.2.65+ uses curl_cffi internally which handles:
     - Cookie/crumb authentication automatically
     - Session management with Chrome impersonation
@@ -52,6 +59,10 @@ class PriceService:
         suffix = EXCHANGE_SUFFIX_MAP.get(exchange, '')
         return f"{symbol}{suffix}"
 
+    @staticmethod
+    def _simulated() -> bool:
+        return settings.price_provider == "simulated"
+
     @classmethod
     def _rate_limit_delay(cls):
         """Add delay between requests to avoid rate limiting"""
@@ -73,7 +84,20 @@ class PriceService:
             cached = cls._price_cache[cache_key]
             if datetime.now() - cached['timestamp'] < cls._cache_duration:
                 logger.info(f"Using cached price for {symbol}")
+                record_cache("price", hits=1)
                 return cached['price']
+        record_cache("price", misses=1)
+
+        if cls._simulated():
+            try:
+                closes = MarketSimulator.last_closes([cls._get_yfinance_symbol(symbol, exchange)])
+            except Exception as e:
+                logger.error(f"Error fetching price for {symbol}: {str(e)}")
+                return None
+            price = next(iter(closes.values()), [None])[-1]
+            if price:
+                cls._price_cache[cache_key] = {'price': price, 'timestamp': datetime.now()}
+            return price
 
         # Rate limit
         cls._rate_limit_delay()
@@ -86,7 +110,9 @@ class PriceService:
 
             # Try fast_info first (faster, less data)
             try:
-                price = Decimal(str(ticker.fast_info['lastPrice']))
+                with observe_yfinance("fast_info"):
+                    last_price = ticker.fast_info['lastPrice']
+                price = Decimal(str(last_price))
                 if price and price > 0:
                     cls._price_cache[cache_key] = {
                         'price': price,
@@ -98,7 +124,8 @@ class PriceService:
                 pass  # Fall back to info
 
             # Fall back to info if fast_info doesn't work
-            info = ticker.info
+            with observe_yfinance("info"):
+                info = ticker.info
             price = None
             for field in ['currentPrice', 'regularMarketPrice', 'previousClose']:
                 if field in info and info[field]:
@@ -154,6 +181,8 @@ class PriceService:
             yf_symbol = cls._get_yfinance_symbol(symbol, exchange)
             symbols_to_fetch.append((symbol, exchange, yf_symbol))
 
+        record_cache("price", hits=len(results), misses=len(symbols_to_fetch))
+
         # If all prices were cached, return early
         if not symbols_to_fetch:
             logger.info("All prices served from cache")
@@ -163,19 +192,34 @@ class PriceService:
         yf_symbols = [item[2] for item in symbols_to_fetch]
         logger.info(f"Batch fetching {len(yf_symbols)} symbols: {yf_symbols}")
 
+        if cls._simulated():
+            try:
+                closes = MarketSimulator.last_closes(yf_symbols)
+            except Exception as e:
+                logger.error(f"Batch download failed: {e}")
+                closes = {}
+            now = datetime.now()
+            for symbol, exchange, yf_symbol in symbols_to_fetch:
+                price = closes.get(yf_symbol, [None])[-1]
+                if price:
+                    cls._price_cache[f"{symbol}:{exchange}"] = {'price': price, 'timestamp': now}
+                results[symbol] = price
+            return results
+
         try:
             # Use yf.download() for batch fetching - much faster than individual requests
             # threads=True enables parallel downloading
             # progress=False disables progress bar for cleaner logs
             # auto_adjust=True uses adjusted close prices (default in newer yfinance)
-            data = yf.download(
-                yf_symbols,
-                period='1d',
-                progress=False,
-                threads=True,
-                ignore_tz=True,
-                auto_adjust=True
-            )
+            with observe_yfinance("download"):
+                data = yf.download(
+                    yf_symbols,
+                    period='1d',
+                    progress=False,
+                    threads=True,
+                    ignore_tz=True,
+                    auto_adjust=True
+                )
 
             if data.empty:
                 logger.warning("Batch download returned empty data")
@@ -246,16 +290,38 @@ class PriceService:
 
         logger.info(f"Fetching prices with change for {len(yf_symbols)} symbols")
 
+        if cls._simulated():
+            try:
+                closes = MarketSimulator.last_closes(yf_symbols, count=2)
+            except Exception as e:
+                logger.error(f"Bulk download with change failed: {e}")
+                return results
+            for yf_symbol, (symbol, exchange) in symbol_map.items():
+                series = closes.get(yf_symbol)
+                if not series:
+                    continue
+                current_price = series[-1]
+                previous_close = series[-2] if len(series) > 1 else None
+                change = current_price - previous_close if previous_close else Decimal('0')
+                results[symbol] = {
+                    'price': current_price,
+                    'previous_close': previous_close,
+                    'change': change,
+                    'change_pct': (change / previous_close * 100) if previous_close else Decimal('0')
+                }
+            return results
+
         try:
             # Fetch 2 days for speed (enough for previous close on most days)
-            data = yf.download(
-                yf_symbols,
-                period='2d',
-                progress=False,
-                threads=True,
-                ignore_tz=True,
-                auto_adjust=True
-            )
+            with observe_yfinance("download"):
+                data = yf.download(
+                    yf_symbols,
+                    period='2d',
+                    progress=False,
+                    threads=True,
+                    ignore_tz=True,
+                    auto_adjust=True
+                )
             
             if data.empty:
                 logger.warning("Download returned empty data")
@@ -320,11 +386,17 @@ class PriceService:
         """
         try:
             yf_symbol = cls._get_yfinance_symbol(symbol, exchange)
-            ticker = yf.Ticker(yf_symbol)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
 
-            hist = ticker.history(start=start_date, end=end_date)
+            if cls._simulated():
+                # yfinance's end is exclusive
+                return MarketSimulator.history(yf_symbol, start_date.date(), end_date.date() - timedelta(days=1))
+
+            ticker = yf.Ticker(yf_symbol)
+
+            with observe_yfinance("history"):
+                hist = ticker.history(start=start_date, end=end_date)
 
             if hist.empty:
                 logger.warning(f"No historical data for {symbol}")
@@ -398,6 +470,15 @@ class PriceService:
                 return Decimal(str(closest_cached.close))
 
         # For historical dates, fetch historical data from yfinance
+        if cls._simulated():
+            try:
+                yf_symbol = cls._get_yfinance_symbol(symbol, exchange)
+                closes = MarketSimulator.download([yf_symbol], target_date - timedelta(days=7), target_date)[yf_symbol]
+            except Exception as e:
+                logger.error(f"Error fetching historical price for {symbol} on {target_date}: {str(e)}")
+                return None
+            return closes[-1][1] if closes else None
+
         try:
             # Rate limit
             cls._rate_limit_delay()
@@ -409,7 +490,8 @@ class PriceService:
             start_date = target_date - timedelta(days=7)
             end_date = target_date + timedelta(days=1)
 
-            hist = ticker.history(start=start_date, end=end_date)
+            with observe_yfinance("history"):
+                hist = ticker.history(start=start_date, end=end_date)
 
             if hist.empty:
                 logger.warning(f"No historical data for {symbol} around {target_date}")
@@ -532,8 +614,12 @@ class PriceService:
         """Get company information"""
         try:
             yf_symbol = cls._get_yfinance_symbol(symbol, exchange)
+            if cls._simulated():
+                return MarketSimulator.company_info(yf_symbol)
+
             ticker = yf.Ticker(yf_symbol)
-            info = ticker.info
+            with observe_yfinance("info"):
+                info = ticker.info
 
             return {
                 'name': info.get('longName') or info.get('shortName'),
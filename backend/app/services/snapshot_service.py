@@ -4,32 +4,79 @@ Portfolio Snapshot Service
 Service for creating and managing daily portfolio value snapshots.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, insert
 from datetime import date, datetime, timedelta
-from decimal import Decimal
-from typing import Optional, List
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Optional, List
 import json
 import logging
 
+import numpy as np
+
 from ..models.portfolio_snapshot import PortfolioSnapshot
-from ..models.holding import Holding
+from ..models.holding_daily_value import HoldingDailyValue
+from ..models.portfolio_region_value import PortfolioRegionValue
+from ..models.holding import Holding, REGION_COUNTRIES
+from ..models.holding_opening import HoldingOpening
 from ..models.transaction import Transaction
 from .price_service import PriceService
 from .currency_service import CurrencyService
+from .valuation_service import ValuationService, snapshot_value_from_notes, to_array
+from ..utils.metrics import time_job
 
 logger = logging.getLogger(__name__)
 
+# Holding columns that history can be broken down by
+BREAKDOWN_COLUMNS = {
+    "account_type": Holding.account_type,
+    "country": Holding.country,
+    "symbol": Holding.symbol,
+    "currency": Holding.currency,
+}
+
+def _period_start(value_date: date, interval: str) -> date:
+    """First day of the daily/weekly (Monday)/monthly period containing value_date."""
+    if interval == "weekly":
+        return value_date - timedelta(days=value_date.weekday())
+    if interval == "monthly":
+        return value_date.replace(day=1)
+    return value_date
+
+
+def _to_cents(value) -> int:
+    return int((Decimal(str(value or 0)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def _regions_for_country(country: Optional[str]) -> List[str]:
+    """Dashboard regions a holding from country counts towards."""
+    return ['all'] + [region for region, countries in REGION_COUNTRIES.items() if country in countries]
+
+
+def _delta_encode(values: List[int]) -> List[int]:
+    """First value as-is, then the difference from the previous value."""
+    return [v - values[i - 1] if i else v for i, v in enumerate(values)]
+
 
 class SnapshotService:
     """Service for managing portfolio snapshots"""
 
+    @staticmethod
+    def _opening_state(db: Session, holding: Holding) -> tuple[Optional[date], Decimal, Decimal]:
+        """(from date, quantity, total cost) of the holding's opening position, zero if none."""
+        opening = db.query(HoldingOpening).filter(HoldingOpening.holding_id == holding.id).first()
+        if opening is None:
+            return None, Decimal('0'), Decimal('0')
+        quantity = Decimal(str(opening.quantity))
+        return opening.first_purchase_date, quantity, quantity * Decimal(str(opening.avg_purchase_price))
+
     @staticmethod
     def get_holding_state_at_date(db: Session, holding: Holding, target_date: date) -> tuple[Decimal, Decimal]:
         """
         Calculate quantity and cost basis for a holding at a specific date.
 
         This reconstructs the holding state by replaying all transactions
-        up to and including the target date.
+        up to and including the target date, starting from the holding's
+        opening position (shares held outside the transaction log).
 
         Args:
             db: Database session
@@ -44,8 +91,9 @@ class SnapshotService:
             Transaction.transaction_date <= target_date
         ).order_by(Transaction.transaction_date).all()
 
-        quantity = Decimal('0')
-        total_cost = Decimal('0')
+        opening_date, quantity, total_cost = SnapshotService._opening_state(db, holding)
+        if opening_date is not None and opening_date > target_date:
+            quantity, total_cost = Decimal('0'), Decimal('0')
 
         for txn in transactions:
             txn_quantity = Decimal(str(txn.quantity))
@@ -64,6 +112,7 @@ class SnapshotService:
         return max(quantity, Decimal('0')), max(total_cost, Decimal('0'))
 
     @staticmethod
+    @time_job("create_snapshot")
     def create_snapshot(db: Session, snapshot_date: Optional[date] = None) -> PortfolioSnapshot:
         """
         Create a portfolio snapshot for the given date (or today if not specified).
@@ -103,12 +152,10 @@ class SnapshotService:
             )
         ).all()
 
-        total_value_cad = Decimal('0')
-        total_cost_cad = Decimal('0')
-        value_by_country = {}
-        holdings_with_value = 0
+        # (holding, quantity, cost, price, snapshot value) for each position to value
+        positions = []
 
-        # For today's date, use current holdings directly (more accurate)
+        # For today's date, use current holdings data directly (more accurate)
         # For historical dates, replay transactions
         is_today = snapshot_date == date.today()
 
@@ -125,63 +172,66 @@ class SnapshotService:
             if quantity <= 0:
                 continue
 
-            holdings_with_value += 1
-
             # Get price for the snapshot date (checks price_history first, then yfinance)
             price_for_date = PriceService.get_price_for_date(holding.symbol, holding.exchange, snapshot_date, db=db)
 
+            snapshot_value = None
             if price_for_date is None:
-                # Try to extract snapshot value from notes (for mutual funds without live prices)
-                # Format: "... | Snapshot: ₹XXX,XXX | ..."
-                snapshot_value = None
-                if holding.notes and "Snapshot:" in holding.notes:
-                    import re
-                    match = re.search(r'Snapshot: ₹([\d,]+)', holding.notes)
-                    if match:
-                        try:
-                            snapshot_value = Decimal(match.group(1).replace(',', ''))
-                            logger.info(f"Using snapshot value from notes for {holding.symbol}: {snapshot_value}")
-                        except:
-                            pass
-                
+                # Mutual funds without live prices carry a snapshot value in notes
+                # (already in the holding's currency)
+                snapshot_value = snapshot_value_from_notes(holding.notes)
                 if snapshot_value is None:
                     logger.warning(f"No price available for {holding.symbol} on {snapshot_date}, skipping")
                     continue
-                
-                # Use snapshot value directly as market value (already in holding's currency)
-                market_value = snapshot_value
-            else:
-                # Calculate market value using historical quantity and price
-                market_value = quantity * price_for_date
-
-            # Convert to CAD
-            if holding.currency != 'CAD':
-                rate = CurrencyService.get_exchange_rate_sync(holding.currency, 'CAD', db)
-                if rate:
-                    market_value_cad = market_value * rate
-                else:
-                    market_value_cad = market_value
-            else:
-                market_value_cad = market_value
-
-            # Use historical cost (already in holding's currency)
-            if holding.currency != 'CAD':
-                rate = CurrencyService.get_exchange_rate_sync(holding.currency, 'CAD', db)
-                if rate:
-                    cost_cad = cost * rate
-                else:
-                    cost_cad = cost
-            else:
-                cost_cad = cost
+                logger.info(f"Using snapshot value from notes for {holding.symbol}: {snapshot_value}")
+
+            positions.append((holding, quantity, cost, price_for_date, snapshot_value))
+
+        # Holdings valued on the date (one stored per-holding value each), the
+        # count refresh_totals re-derives from those rows
+        holdings_with_value = len(positions)
+
+        # Value all positions at once in CAD (float64); Decimal only for what is stored
+        fx = CurrencyService.fx_snapshot(db, (p[0].currency for p in positions))
+        valuation = ValuationService.value_positions(
+            quantity=to_array(p[1] for p in positions),
+            price=to_array(p[3] for p in positions),
+            cost=to_array(p[2] for p in positions),
+            rate=fx.rates_to(p[0].currency for p in positions),
+            fallback_value=to_array(p[4] for p in positions),
+        )
+        total_value_cad = ValuationService.to_cents(valuation.total_value_cad)
+        total_cost_cad = ValuationService.to_cents(valuation.total_cost_cad)
+
+        holding_values = []
+        for (holding, quantity, cost, price, snapshot_value), value_cad, cost_cad in zip(
+            positions, valuation.market_value_cad.tolist(), valuation.cost_cad.tolist()
+        ):
+            holding_values.append({
+                'value_date': snapshot_date,
+                'holding_id': holding.id,
+                'quantity': quantity,
+                'price': price if price is not None else Decimal(repr(snapshot_value)) / quantity,
+                'value_cad': ValuationService.to_cents(value_cad),
+                'cost_cad': ValuationService.to_cents(cost_cad),
+            })
+
+        # Region and country totals from masks over the valued positions
+        countries = np.array([p[0].country for p in positions], dtype=object)
+        region_totals = {}
+        for region in ['all', *REGION_COUNTRIES]:
+            mask = np.ones(len(positions), dtype=bool) if region == 'all' else np.isin(countries, REGION_COUNTRIES[region])
+            region_totals[region] = {
+                'value_cad': ValuationService.to_cents(valuation.market_value_cad[mask].sum()),
+                'cost_cad': ValuationService.to_cents(valuation.cost_cad[mask].sum()),
+                'holdings_count': int(mask.sum()),
+            }
 
-            total_value_cad += market_value_cad
-            total_cost_cad += cost_cad
-
-            # Track by country
-            country = holding.country or 'Unknown'
-            if country not in value_by_country:
-                value_by_country[country] = Decimal('0')
-            value_by_country[country] += market_value_cad
+        value_by_country = {}
+        for country in set(countries.tolist()):
+            value_by_country[country or 'Unknown'] = round(
+                float(valuation.market_value_cad[countries == country].sum()), 2
+            )
 
         # Calculate gains
         unrealized_gain_cad = total_value_cad - total_cost_cad
@@ -197,14 +247,14 @@ class SnapshotService:
         snapshot.holdings_count = holdings_with_value
 
         # Store country breakdown as JSON
-        value_by_country_serializable = {
-            k: float(v) for k, v in value_by_country.items()
-        }
-        snapshot.value_by_country = json.dumps(value_by_country_serializable)
+        snapshot.value_by_country = json.dumps(value_by_country)
 
         if not existing:
             db.add(snapshot)
 
+        SnapshotService._store_holding_values(db, snapshot_date, holding_values)
+        SnapshotService._store_region_values(db, snapshot_date, region_totals)
+
         try:
             db.commit()
             db.refresh(snapshot)
@@ -221,7 +271,9 @@ class SnapshotService:
                 existing.unrealized_gain_cad = unrealized_gain_cad
                 existing.unrealized_gain_pct = unrealized_gain_pct
                 existing.holdings_count = holdings_with_value
-                existing.value_by_country = json.dumps(value_by_country_serializable)
+                existing.value_by_country = json.dumps(value_by_country)
+                SnapshotService._store_holding_values(db, snapshot_date, holding_values)
+                SnapshotService._store_region_values(db, snapshot_date, region_totals)
                 db.commit()
                 db.refresh(existing)
                 snapshot = existing
@@ -233,6 +285,361 @@ class SnapshotService:
 
         return snapshot
 
+    @staticmethod
+    def _store_holding_values(db: Session, snapshot_date: date, rows: List[Dict]) -> None:
+        """Replace the per-holding values for a date with one bulk insert."""
+        db.query(HoldingDailyValue).filter(
+            HoldingDailyValue.value_date == snapshot_date
+        ).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(HoldingDailyValue), rows)
+
+    @staticmethod
+    def _store_region_values(db: Session, snapshot_date: date, region_totals: Dict[str, Dict]) -> None:
+        """Replace the per-region totals for a date."""
+        db.query(PortfolioRegionValue).filter(
+            PortfolioRegionValue.value_date == snapshot_date
+        ).delete(synchronize_session=False)
+        db.execute(insert(PortfolioRegionValue), [
+            {'value_date': snapshot_date, 'region': region, **totals}
+            for region, totals in region_totals.items()
+        ])
+
+    @staticmethod
+    def _country_totals(db: Session, *criteria) -> List[tuple]:
+        """Stored per-holding values summed by date and country: (date, country, value, cost, count)."""
+        return db.query(
+            HoldingDailyValue.value_date,
+            Holding.country,
+            func.sum(HoldingDailyValue.value_cad),
+            func.sum(HoldingDailyValue.cost_cad),
+            func.count(HoldingDailyValue.id),
+        ).join(
+            Holding, Holding.id == HoldingDailyValue.holding_id
+        ).filter(
+            *criteria
+        ).group_by(
+            HoldingDailyValue.value_date, Holding.country
+        ).all()
+
+    @staticmethod
+    def _sum_region_totals(rows: List[tuple]) -> Dict[date, Dict[str, Dict]]:
+        """Region totals per date from _country_totals rows."""
+        totals_by_date: Dict[date, Dict[str, Dict]] = {}
+        for value_date, country, value_cad, cost_cad, count in rows:
+            region_totals = totals_by_date.setdefault(value_date, {
+                region: {'value_cad': Decimal('0'), 'cost_cad': Decimal('0'), 'holdings_count': 0}
+                for region in ['all', *REGION_COUNTRIES]
+            })
+            for region in _regions_for_country(country):
+                # Decimal(str()) since SQLite returns sums as floats
+                region_totals[region]['value_cad'] += Decimal(str(value_cad or 0))
+                region_totals[region]['cost_cad'] += Decimal(str(cost_cad or 0))
+                region_totals[region]['holdings_count'] += count
+        return totals_by_date
+
+    @staticmethod
+    @time_job("rebuild_region_values")
+    def rebuild_region_values(db: Session) -> int:
+        """
+        Fill region totals for snapshot dates that have none.
+
+        Sums the stored per-holding values by date and country, so snapshots
+        taken before region totals existed don't need to be recreated. Dates
+        without per-holding values are left out. Returns the number of dates filled.
+        """
+        covered = db.query(PortfolioRegionValue.value_date).filter(PortfolioRegionValue.region == 'all')
+        totals_by_date = SnapshotService._sum_region_totals(
+            SnapshotService._country_totals(db, HoldingDailyValue.value_date.notin_(covered))
+        )
+
+        for value_date, region_totals in totals_by_date.items():
+            SnapshotService._store_region_values(db, value_date, region_totals)
+        db.commit()
+        if totals_by_date:
+            logger.info(f"Rebuilt region values for {len(totals_by_date)} snapshot dates")
+        return len(totals_by_date)
+
+    @staticmethod
+    def holding_states_at_dates(
+        db: Session, holding: Holding, dates: List[date]
+    ) -> Dict[date, tuple[Decimal, Decimal]]:
+        """
+        Quantity and cost basis for a holding on each of several dates.
+
+        Same arithmetic as get_holding_state_at_date, but the transactions are
+        loaded once and replayed a single time across the sorted dates.
+        """
+        transactions = db.query(
+            Transaction.transaction_type,
+            Transaction.quantity,
+            Transaction.price_per_share,
+            Transaction.fees,
+            Transaction.transaction_date,
+        ).filter(
+            Transaction.holding_id == holding.id,
+            Transaction.transaction_date <= max(dates, default=date.min)
+        ).order_by(Transaction.transaction_date, Transaction.id).all()
+
+        states = {}
+        opening_date, opening_quantity, opening_cost = SnapshotService._opening_state(db, holding)
+        quantity = Decimal('0')
+        total_cost = Decimal('0')
+        position = 0
+        for target_date in sorted(dates):
+            if opening_quantity and (opening_date is None or opening_date <= target_date):
+                quantity += opening_quantity
+                total_cost += opening_cost
+                opening_quantity = Decimal('0')
+            while position < len(transactions) and transactions[position].transaction_date <= target_date:
+                txn_type, txn_quantity, txn_price, txn_fees, _ = transactions[position]
+                txn_quantity = Decimal(str(txn_quantity))
+                if txn_type == 'BUY':
+                    total_cost += txn_quantity * Decimal(str(txn_price)) + (Decimal(str(txn_fees)) if txn_fees else Decimal('0'))
+                    quantity += txn_quantity
+                elif quantity > 0:
+                    avg_cost = total_cost / quantity
+                    quantity -= txn_quantity
+                    total_cost -= txn_quantity * avg_cost
+                position += 1
+            states[target_date] = (max(quantity, Decimal('0')), max(total_cost, Decimal('0')))
+        return states
+
+    @staticmethod
+    def recompute_holding_values(db: Session, holding_id: int, dates: List[date]) -> None:
+        """
+        Rewrite one holding's stored values for the given snapshot dates.
+
+        Positions are replayed from transactions; prices already stored for a
+        date are reused, so only dates the holding wasn't valued on look a
+        price up. Applies create_snapshot's rules for which holdings count.
+        Call refresh_totals for the dates afterwards.
+        """
+        if not dates:
+            return
+        existing = {
+            row.value_date: row.price
+            for row in db.query(HoldingDailyValue.value_date, HoldingDailyValue.price).filter(
+                HoldingDailyValue.holding_id == holding_id,
+                HoldingDailyValue.value_date.in_(dates)
+            )
+        }
+        db.query(HoldingDailyValue).filter(
+            HoldingDailyValue.holding_id == holding_id,
+            HoldingDailyValue.value_date.in_(dates)
+        ).delete(synchronize_session=False)
+
+        holding = db.query(Holding).filter(Holding.id == holding_id).first()
+        if holding is None or not holding.is_active:
+            return
+
+        dates = [
+            d for d in dates
+            if holding.first_purchase_date is None or holding.first_purchase_date <= d
+        ]
+        positions = []
+        for value_date, (quantity, cost) in SnapshotService.holding_states_at_dates(db, holding, dates).items():
+            if quantity <= 0:
+                continue
+            price = existing.get(value_date)
+            if price is None:
+                price = PriceService.get_price_for_date(holding.symbol, holding.exchange, value_date, db=db)
+            snapshot_value = None
+            if price is None:
+                snapshot_value = snapshot_value_from_notes(holding.notes)
+                if snapshot_value is None:
+                    logger.warning(f"No price available for {holding.symbol} on {value_date}, skipping")
+                    continue
+            positions.append((value_date, quantity, cost, price, snapshot_value))
+
+        if not positions:
+            return
+
+        fx = CurrencyService.fx_snapshot(db, [holding.currency])
+        valuation = ValuationService.value_positions(
+            quantity=to_array(p[1] for p in positions),
+            price=to_array(p[3] for p in positions),
+            cost=to_array(p[2] for p in positions),
+            rate=fx.rates_to(holding.currency for _ in positions),
+            fallback_value=to_array(p[4] for p in positions),
+        )
+        db.execute(insert(HoldingDailyValue), [
+            {
+                'value_date': value_date,
+                'holding_id': holding.id,
+                'quantity': quantity,
+                'price': price if price is not None else Decimal(repr(snapshot_value)) / quantity,
+                'value_cad': ValuationService.to_cents(value_cad),
+                'cost_cad': ValuationService.to_cents(cost_cad),
+            }
+            for (value_date, quantity, _, price, snapshot_value), value_cad, cost_cad in zip(
+                positions, valuation.market_value_cad.tolist(), valuation.cost_cad.tolist()
+            )
+        ])
+
+    @staticmethod
+    def refresh_totals(db: Session, dates: List[date]) -> None:
+        """
+        Re-derive region totals and snapshot totals for dates from the stored
+        per-holding values (no prices are fetched). holdings_count is the number
+        of holdings valued on the date, as in create_snapshot.
+        """
+        if not dates:
+            return
+        rows = SnapshotService._country_totals(db, HoldingDailyValue.value_date.in_(dates))
+        totals_by_date = SnapshotService._sum_region_totals(rows)
+
+        value_by_country: Dict[date, Dict[str, float]] = {}
+        for value_date, country, value_cad, _, _ in rows:
+            by_country = value_by_country.setdefault(value_date, {})
+            key = country or 'Unknown'
+            by_country[key] = round(by_country.get(key, 0.0) + float(value_cad or 0), 2)
+
+        empty = {'value_cad': Decimal('0'), 'cost_cad': Decimal('0'), 'holdings_count': 0}
+        snapshots = {
+            s.snapshot_date: s
+            for s in db.query(PortfolioSnapshot).filter(PortfolioSnapshot.snapshot_date.in_(dates))
+        }
+        for value_date in dates:
+            region_totals = totals_by_date.get(value_date) or {
+                region: dict(empty) for region in ['all', *REGION_COUNTRIES]
+            }
+            SnapshotService._store_region_values(db, value_date, region_totals)
+
+            snapshot = snapshots.get(value_date)
+            if snapshot is None:
+                continue
+            total = region_totals['all']
+            total_value_cad = total['value_cad'].quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            total_cost_cad = total['cost_cad'].quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            snapshot.total_value_cad = total_value_cad
+            snapshot.total_cost_cad = total_cost_cad
+            snapshot.unrealized_gain_cad = total_value_cad - total_cost_cad
+            snapshot.unrealized_gain_pct = (
+                (total_value_cad - total_cost_cad) / total_cost_cad * Decimal('100')
+                if total_cost_cad > 0 else Decimal('0')
+            )
+            snapshot.holdings_count = total['holdings_count']
+            snapshot.value_by_country = json.dumps(value_by_country.get(value_date, {}))
+
+    @staticmethod
+    def get_region_value_history(
+        db: Session,
+        region: str,
+        start_date: date,
+        end_date: date
+    ) -> List[PortfolioRegionValue]:
+        """Stored daily totals for a region within a date range, oldest first."""
+        return db.query(PortfolioRegionValue).filter(
+            PortfolioRegionValue.region == region,
+            PortfolioRegionValue.value_date >= start_date,
+            PortfolioRegionValue.value_date <= end_date
+        ).order_by(PortfolioRegionValue.value_date).all()
+
+    @staticmethod
+    def get_history_breakdown(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        group_by: str = "account_type"
+    ) -> Dict:
+        """
+        Portfolio value history split by a holding attribute.
+
+        Aggregates holding_daily_values in SQL, grouped by date and the chosen
+        holding column. Returns columnar data: a shared list of dates and, for
+        each group, value and cost lists aligned with it (0 where the group had
+        no holdings on a date).
+        """
+        column = BREAKDOWN_COLUMNS[group_by]
+        rows = db.query(
+            HoldingDailyValue.value_date,
+            column,
+            func.sum(HoldingDailyValue.value_cad),
+            func.sum(HoldingDailyValue.cost_cad),
+        ).join(
+            Holding, Holding.id == HoldingDailyValue.holding_id
+        ).filter(
+            HoldingDailyValue.value_date >= start_date,
+            HoldingDailyValue.value_date <= end_date
+        ).group_by(
+            HoldingDailyValue.value_date, column
+        ).order_by(HoldingDailyValue.value_date).all()
+
+        dates = sorted({row[0] for row in rows})
+        index = {d: i for i, d in enumerate(dates)}
+        series = {}
+        for value_date, key, value_cad, cost_cad in rows:
+            key = key or 'Unknown'
+            if key not in series:
+                series[key] = {
+                    'key': key,
+                    'value_cad': [Decimal('0')] * len(dates),
+                    'cost_cad': [Decimal('0')] * len(dates),
+                }
+            i = index[value_date]
+            # Decimal(str()) since SQLite returns sums as floats
+            series[key]['value_cad'][i] += Decimal(str(value_cad or 0)).quantize(Decimal('0.01'))
+            series[key]['cost_cad'][i] += Decimal(str(cost_cad or 0)).quantize(Decimal('0.01'))
+
+        return {
+            'group_by': group_by,
+            'start_date': start_date,
+            'end_date': end_date,
+            'dates': dates,
+            'series': sorted(series.values(), key=lambda s: s['value_cad'][-1] if dates else 0, reverse=True),
+        }
+
+    @staticmethod
+    def get_compact_history(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        interval: str = "daily",
+        since: Optional[date] = None
+    ) -> Dict:
+        """
+        Portfolio value history as delta-encoded columns.
+
+        Weekly and monthly keep the last snapshot of each period, dated with the
+        period's first day. Dates are sent as day offsets from the previous point
+        (the first from base_date) and values as integer cents, each the change
+        from the previous point, so long histories stay small.
+
+        With since, only points from the period containing since onward are
+        returned. The client replaces its points from the first returned date,
+        which also picks up a re-taken snapshot for today.
+        """
+        if since is not None:
+            start_date = max(start_date, _period_start(since, interval))
+
+        rows = db.query(
+            PortfolioSnapshot.snapshot_date,
+            PortfolioSnapshot.total_value_cad,
+            PortfolioSnapshot.total_cost_cad,
+        ).filter(
+            PortfolioSnapshot.snapshot_date >= start_date,
+            PortfolioSnapshot.snapshot_date <= end_date
+        ).order_by(PortfolioSnapshot.snapshot_date).all()
+
+        # Rows are in date order, so the last snapshot of each period wins
+        points = {}
+        for snapshot_date, value_cad, cost_cad in rows:
+            points[_period_start(snapshot_date, interval)] = (value_cad, cost_cad)
+
+        dates = list(points)
+        base_date = dates[0] if dates else None
+        return {
+            'interval': interval,
+            'start_date': start_date,
+            'end_date': end_date,
+            'count': len(dates),
+            'base_date': base_date,
+            'day_deltas': [(d - (dates[i - 1] if i else base_date)).days for i, d in enumerate(dates)],
+            'value_cents': _delta_encode([_to_cents(v) for v, _ in points.values()]),
+            'cost_cents': _delta_encode([_to_cents(c) for _, c in points.values()]),
+        }
+
     @staticmethod
     def get_snapshot(db: Session, snapshot_date: date) -> Optional[PortfolioSnapshot]:
         """Get snapshot for a specific date"""
@@ -0,0 +1,181 @@
+"""
+Live update stream service.
+
+Fans out price ticks and portfolio summary changes to Server-Sent Events
+subscribers. One refresh loop runs while at least one client is connected,
+so any number of open dashboards share a single valuation per cycle, done in
+a worker thread so the event loop keeps serving requests.
+"""
+import asyncio
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Set, Tuple
+import logging
+
+import numpy as np
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.holding import Holding, REGION_COUNTRIES
+from .currency_service import CurrencyService
+from .valuation_service import ValuationService
+from ..utils.metrics import time_job
+
+logger = logging.getLogger(__name__)
+
+# Regions the dashboard can filter by (see calculate_portfolio_summary)
+STREAM_REGIONS = ("all", "CA", "IN")
+
+
+def _json_default(value):
+    """Serialize Decimal and datetime values in event payloads."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def format_event(event: str, data) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n"
+
+
+class StreamService:
+    """Service for broadcasting live portfolio updates to stream subscribers."""
+
+    _subscribers: Set[asyncio.Queue] = set()
+    _refresh_task: Optional[asyncio.Task] = None
+
+    # Last values pushed, used to send only what changed and to prime new clients
+    _last_prices: Dict[str, Dict] = {}
+    _last_summaries: Dict[str, Dict] = {}
+
+    QUEUE_SIZE = 100
+
+    @classmethod
+    def subscriber_count(cls) -> int:
+        return len(cls._subscribers)
+
+    @classmethod
+    def subscribe(cls) -> asyncio.Queue:
+        """
+        Register a subscriber and return its event queue.
+
+        The queue is primed with the latest known prices and summaries so the
+        client renders immediately. Starts the refresh loop if it is not running.
+        """
+        queue = asyncio.Queue(maxsize=cls.QUEUE_SIZE)
+        if cls._last_prices:
+            queue.put_nowait(format_event("prices", cls._last_prices))
+        for region, summary in cls._last_summaries.items():
+            queue.put_nowait(format_event("summary", {"region": region, "summary": summary}))
+        cls._subscribers.add(queue)
+
+        if cls._refresh_task is None or cls._refresh_task.done():
+            cls._refresh_task = asyncio.create_task(cls._refresh_loop())
+        logger.info(f"Stream subscriber connected ({len(cls._subscribers)} total)")
+        return queue
+
+    @classmethod
+    def unsubscribe(cls, queue: asyncio.Queue) -> None:
+        cls._subscribers.discard(queue)
+        logger.info(f"Stream subscriber disconnected ({len(cls._subscribers)} remaining)")
+
+    @classmethod
+    def publish(cls, event: str, data) -> None:
+        """Queue an event for every subscriber, dropping the oldest event for slow clients."""
+        message = format_event(event, data)
+        for queue in list(cls._subscribers):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(message)
+
+    @classmethod
+    async def _refresh_loop(cls) -> None:
+        """Refresh once per cycle while anyone is subscribed, then exit."""
+        logger.info("Stream refresh loop started")
+        try:
+            while cls._subscribers:
+                try:
+                    with time_job("stream_refresh"):
+                        await cls.refresh()
+                except Exception as e:
+                    logger.error(f"Stream refresh failed: {e}")
+                await asyncio.sleep(settings.stream_refresh_seconds)
+        finally:
+            logger.info("Stream refresh loop stopped (no subscribers)")
+
+    @staticmethod
+    def _compute() -> Tuple[Dict, Dict[str, Dict]]:
+        """
+        Price and value every active holding once and summarize each region.
+
+        Blocking (price API and database), so it runs in a worker thread with
+        its own session. Returns (price data by symbol, summary by region).
+        """
+        # Imported here to avoid a circular import (analytics imports services)
+        from ..routers.analytics import get_prices_with_dedup, save_prices_to_db_cache, summarize_valuation
+
+        db = SessionLocal()
+        try:
+            holdings = db.query(Holding).filter(Holding.is_active == True).all()
+            symbols = [(h.symbol, h.exchange) for h in holdings]
+            price_data = get_prices_with_dedup(symbols, with_change=True) if symbols else {}
+            current_prices = {sym: data['price'] for sym, data in price_data.items()}
+            save_prices_to_db_cache(db, holdings, current_prices)
+
+            fx = CurrencyService.fx_snapshot(db, (h.currency for h in holdings))
+            previous_closes = {sym: data.get('previous_close') for sym, data in price_data.items() if data}
+            valuation = ValuationService.value_holdings(holdings, current_prices, fx, previous_closes or None)
+
+            countries = np.array([h.country for h in holdings], dtype=object)
+            summaries = {}
+            for region in STREAM_REGIONS:
+                mask = np.isin(countries, REGION_COUNTRIES[region]) if region in REGION_COUNTRIES else None
+                summaries[region] = summarize_valuation(holdings, valuation, live=bool(price_data), mask=mask)
+            return price_data, summaries
+        finally:
+            db.close()
+
+    @classmethod
+    async def refresh(cls) -> None:
+        """
+        Recompute prices and per-region summaries and publish what changed.
+
+        The work runs off the event loop (see _compute): one price lookup and
+        one valuation cover all regions. Publishing stays on the loop, which
+        owns the subscriber queues.
+        """
+        loop = asyncio.get_event_loop()
+        price_data, summaries = await loop.run_in_executor(None, cls._compute)
+
+        ticks = {}
+        for symbol, data in price_data.items():
+            if not data or data.get('price') is None:
+                continue
+            tick = {
+                'price': data.get('price'),
+                'change': data.get('change'),
+                'change_pct': data.get('change_pct'),
+            }
+            tick = json.loads(json.dumps(tick, default=_json_default))
+            if cls._last_prices.get(symbol) != tick:
+                ticks[symbol] = tick
+        if ticks:
+            cls._last_prices.update(ticks)
+            cls.publish("prices", ticks)
+
+        for region in STREAM_REGIONS:
+            summary = json.loads(json.dumps(summaries[region], default=_json_default))
+            previous = cls._last_summaries.get(region)
+            unchanged = previous is not None and all(
+                previous.get(k) == v for k, v in summary.items() if k != 'last_updated'
+            )
+            if not unchanged:
+                cls._last_summaries[region] = summary
+                cls.publish("summary", {"region": region, "summary": summary})
@@ -0,0 +1,150 @@
+"""
+Valuation Service
+
+Vectorized market value, cost and previous-close value for a set of positions.
+Values are float64 NumPy arrays with one element per position, so a portfolio
+is valued with a handful of array operations instead of a Decimal multiply per
+holding. Decimal is only used where values are persisted (see to_cents).
+"""
+import re
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from ..models.holding import Holding
+from .currency_service import FxSnapshot
+
+# Mutual fund imports store the last statement value in notes (see imports router)
+SNAPSHOT_MARKER = "Snapshot: ₹"
+SNAPSHOT_VALUE_PATTERN = re.compile(re.escape(SNAPSHOT_MARKER) + r'([\d,]+)')
+
+CENT = Decimal('0.01')
+
+
+def snapshot_value_from_notes(notes: Optional[str]) -> Optional[float]:
+    """Market value recorded in a holding's notes, if any."""
+    if not notes or "Snapshot:" not in notes:
+        return None
+    match = SNAPSHOT_VALUE_PATTERN.search(notes)
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def to_array(values: Iterable, count: int = -1) -> np.ndarray:
+    """float64 array from optional numbers; None becomes NaN."""
+    return np.fromiter(
+        (np.nan if v is None else float(v) for v in values), dtype=np.float64, count=count
+    )
+
+
+@dataclass
+class Valuation:
+    """Per-position values in CAD, aligned with the positions passed in."""
+    market_value_cad: np.ndarray
+    cost_cad: np.ndarray
+    previous_value_cad: np.ndarray
+    # False where there was neither a price nor a fallback value (market value is cost)
+    priced: np.ndarray
+
+    @property
+    def total_value_cad(self) -> float:
+        return float(self.market_value_cad.sum())
+
+    @property
+    def total_cost_cad(self) -> float:
+        return float(self.cost_cad.sum())
+
+    @property
+    def total_previous_value_cad(self) -> float:
+        return float(self.previous_value_cad.sum())
+
+
+class ValuationService:
+    """Service for valuing positions with float64 arrays"""
+
+    @staticmethod
+    def value_positions(
+        quantity: np.ndarray,
+        price: np.ndarray,
+        cost: np.ndarray,
+        rate: np.ndarray,
+        previous_close: Optional[np.ndarray] = None,
+        fallback_value: Optional[np.ndarray] = None,
+    ) -> Valuation:
+        """
+        Value positions given per-position arrays (NaN = missing).
+
+        Market value is quantity * price; without a price it is fallback_value,
+        and without either it is the cost. Previous value uses previous_close
+        where present and non-zero, otherwise the market value (no daily change).
+        All values are converted with rate.
+        """
+        has_price = ~np.isnan(price)
+        if fallback_value is None:
+            fallback_value = np.full_like(price, np.nan)
+        has_fallback = ~np.isnan(fallback_value)
+
+        market = np.where(has_price, quantity * price, np.where(has_fallback, fallback_value, cost))
+        if previous_close is None:
+            previous = market
+        else:
+            has_previous = ~np.isnan(previous_close) & (previous_close != 0)
+            previous = np.where(has_previous, quantity * previous_close, market)
+
+        return Valuation(
+            market_value_cad=market * rate,
+            cost_cad=cost * rate,
+            previous_value_cad=previous * rate,
+            priced=has_price | has_fallback,
+        )
+
+    @staticmethod
+    def value_holdings(
+        holdings: List[Holding],
+        prices: Dict[str, Optional[Decimal]],
+        fx: FxSnapshot,
+        previous_closes: Optional[Dict[str, Optional[Decimal]]] = None,
+    ) -> Valuation:
+        """
+        Value current holdings at the given prices (keyed by symbol), in CAD.
+
+        Holdings without a price fall back to the snapshot value in their notes,
+        then to cost basis.
+        """
+        # One pass over the holdings; float() of a Decimal is the main per-holding cost
+        nan = float('nan')
+        quantity, price, avg_cost, fallback, previous_close = [], [], [], [], []
+        for h in holdings:
+            p = prices.get(h.symbol)
+            quantity.append(float(h.quantity or 0))
+            avg_cost.append(float(h.avg_purchase_price or 0))
+            if p is None:
+                price.append(nan)
+                value = snapshot_value_from_notes(h.notes)
+                fallback.append(nan if value is None else value)
+            else:
+                price.append(float(p))
+                fallback.append(nan)
+            if previous_closes is not None:
+                close = previous_closes.get(h.symbol)
+                previous_close.append(nan if close is None else float(close))
+
+        quantity = np.array(quantity, dtype=np.float64)
+        return ValuationService.value_positions(
+            quantity=quantity,
+            price=np.array(price, dtype=np.float64),
+            cost=quantity * np.array(avg_cost, dtype=np.float64),
+            rate=fx.rates_to(h.currency for h in holdings),
+            previous_close=np.array(previous_close, dtype=np.float64) if previous_closes is not None else None,
+            fallback_value=np.array(fallback, dtype=np.float64),
+        )
+
+    @staticmethod
+    def to_cents(value: float) -> Decimal:
+        """Round a float value to a Decimal amount for storage."""
+        return Decimal(repr(float(value))).quantize(CENT, rounding=ROUND_HALF_UP)
@@ -0,0 +1,94 @@
+"""
+Shared outbound HTTP clients.
+
+Each component that calls out gets one long-lived httpx.AsyncClient (keep-alive,
+connection limits, timeouts, HTTP/2 when the h2 package is installed) instead of
+opening a client, and a TCP/TLS connection, per call. Every client counts its
+requests and the connections it had to open, so reuse shows up in /status.
+"""
+import importlib.util
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class SharedHttpClient:
+    """Lazily created, pooled AsyncClient for one component."""
+
+    _registry: Dict[str, "SharedHttpClient"] = {}
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 60.0,
+    ):
+        self.name = name
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        SharedHttpClient._registry[name] = self
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=HTTP2_AVAILABLE,
+                event_hooks={'request': [self._on_request]},
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions['trace'] = self._trace
+
+    async def _trace(self, event: str, info: dict) -> None:
+        # httpcore only emits these when the pool has no idle connection to reuse
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+            "http2": HTTP2_AVAILABLE,
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict]:
+        return {name: shared.stats() for name, shared in cls._registry.items()}
+
+    @classmethod
+    async def close_all(cls) -> None:
+        for shared in cls._registry.values():
+            try:
+                await shared.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client {shared.name}: {e}")
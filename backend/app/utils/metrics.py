@@ -0,0 +1,161 @@
+"""
+Prometheus metrics.
+
+Served at /metrics. Covers the paths where request time goes:
+- request latency and database queries per route (MetricsMiddleware)
+- yfinance calls: count, latency and errors per operation (observe_yfinance)
+- cache hits and misses for the price, dedup and FX caches (record_cache)
+- background job durations such as snapshots and FX refreshes (time_job)
+- transactions imported and import duration per source (record_import)
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+JOB_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_LATENCY = Histogram(
+    "portfolio_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "portfolio_http_request_db_queries",
+    "Database queries executed per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+DB_QUERIES = Counter("portfolio_db_queries_total", "Database queries executed")
+
+YFINANCE_CALLS = Counter(
+    "portfolio_yfinance_calls_total",
+    "yfinance calls by operation and outcome",
+    ["operation", "outcome"],
+)
+YFINANCE_LATENCY = Histogram(
+    "portfolio_yfinance_call_duration_seconds",
+    "yfinance call latency by operation",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_LOOKUPS = Counter(
+    "portfolio_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+JOB_DURATION = Histogram(
+    "portfolio_job_duration_seconds",
+    "Background and batch job duration",
+    ["job"],
+    buckets=JOB_BUCKETS,
+)
+
+IMPORT_TRANSACTIONS = Counter(
+    "portfolio_import_transactions_total",
+    "Transactions imported by source",
+    ["source"],
+)
+IMPORT_DURATION = Histogram(
+    "portfolio_import_duration_seconds",
+    "Import duration by source",
+    ["source"],
+    buckets=JOB_BUCKETS,
+)
+
+# Query counter for the request being handled (a list so threadpool copies share it)
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+
+
+@contextmanager
+def observe_yfinance(operation: str):
+    """Time a yfinance call and count it as ok or error (exceptions propagate)."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        YFINANCE_LATENCY.labels(operation).observe(time.perf_counter() - start)
+        YFINANCE_CALLS.labels(operation, outcome).inc()
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache, "miss").inc(misses)
+
+
+@contextmanager
+def time_job(job: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        JOB_DURATION.labels(job).observe(time.perf_counter() - start)
+
+
+def record_import(source: str, transactions: int, seconds: float) -> None:
+    IMPORT_TRANSACTIONS.labels(source).inc(transactions)
+    IMPORT_DURATION.labels(source).observe(seconds)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count every statement the engine executes, per request where there is one."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.inc()
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and database queries per route.
+
+    Routes are labelled by their path template (e.g. /api/v1/holdings/{holding_id})
+    so ids don't create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        queries = [0]
+        token = _request_queries.set(queries)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_queries.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+            REQUEST_DB_QUERIES.labels(method, route).observe(queries[0])
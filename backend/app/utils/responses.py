@@ -0,0 +1,165 @@
+"""
+Fast response serialization.
+
+FastAPI validates and re-serializes every returned dict against the inferred
+response model (or runs jsonable_encoder) before json.dumps. For large nested
+payloads like daily movers or long histories that is most of the request time.
+FastRoute skips that for routes without an explicit response_model and
+encodes the returned content once with orjson, or msgpack if the client asks
+for it in Accept. Sync routes with a response_model are validated in the
+endpoint's worker thread (see FastRoute).
+"""
+import asyncio
+import functools
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.utils import is_body_allowed_for_status_code
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+try:
+    import msgpack
+except ImportError:  # Optional: without it every client gets JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Accept header of the request being handled, for endpoints that return plain content
+_accept: ContextVar[str] = ContextVar("accept", default="")
+
+
+def _default(value: Any) -> Any:
+    """Encode types orjson doesn't handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return _default(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; Decimals become numbers."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class MsgPackResponse(Response):
+    """Response rendered as msgpack (requires the msgpack package)."""
+
+    media_type = MSGPACK_MEDIA_TYPES[1]
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def wants_msgpack(accept: str) -> bool:
+    return msgpack is not None and any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def fast_response(content: Any, status_code: int = 200, accept: str = None) -> Response:
+    """Encode content as msgpack if the client accepts it, otherwise orjson."""
+    if isinstance(content, Response):
+        return content
+    if not is_body_allowed_for_status_code(status_code):
+        return Response(status_code=status_code)
+    accept = _accept.get() if accept is None else accept
+    if wants_msgpack(accept):
+        return MsgPackResponse(content, status_code=status_code)
+    return FastJSONResponse(content, status_code=status_code)
+
+
+def _wrap_endpoint(endpoint: Callable, status_code: int, response_model: Any = None) -> Callable:
+    """
+    Make an endpoint return an encoded Response instead of plain content.
+
+    Headers and status set on an injected Response parameter (e.g. ETags) are
+    carried over, since FastAPI only merges those into responses it builds.
+    With a response_model the content is validated and serialized as FastAPI
+    would (from attributes, by alias) and always sent as JSON.
+    """
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def finish(content, kwargs):
+        if adapter is not None and not isinstance(content, Response):
+            try:
+                content = adapter.dump_python(
+                    adapter.validate_python(content, from_attributes=True), mode="json", by_alias=True
+                )
+            except ValidationError as e:
+                raise ResponseValidationError(errors=e.errors(include_url=False), body=content)
+            response = fast_response(content, status_code, accept="")
+        else:
+            response = fast_response(content, status_code)
+        if content is response:
+            return response
+        for value in kwargs.values():
+            if isinstance(value, Response):
+                if value.status_code:
+                    response.status_code = value.status_code
+                for key, header in value.headers.items():
+                    if key != "content-length":
+                        response.headers[key] = header
+        return response
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return finish(await endpoint(*args, **kwargs), kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return finish(endpoint(*args, **kwargs), kwargs)
+    return wrapper
+
+
+class FastRoute(APIRoute):
+    """
+    Route that encodes plain dict/list results directly with orjson or msgpack.
+
+    Routes with an explicit response_model keep FastAPI's validation (they
+    still render with orjson through the app's default response class). For
+    sync endpoints it runs in the endpoint's worker thread: FastAPI would run it
+    in a second threadpool call while the request's database session still
+    holds its connection, and once every worker is waiting on the connection
+    pool those requests can't get a thread to finish and release theirs.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model")
+        status_code = kwargs.get("status_code") or 200
+        if response_model is None or isinstance(response_model, DefaultPlaceholder):
+            endpoint = _wrap_endpoint(endpoint, status_code)
+        elif not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _wrap_endpoint(endpoint, status_code, response_model)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            token = _accept.set(request.headers.get("accept", ""))
+            try:
+                return await handler(request)
+            finally:
+                _accept.reset(token)
+
+        return route_handler
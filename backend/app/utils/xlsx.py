@@ -0,0 +1,56 @@
+"""
+Helpers for reading broker xlsx exports.
+
+Broker statements put a few lines of account details above the real table,
+so the header row has to be located before the data can be used.
+"""
+import io
+from typing import Optional
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+from openpyxl import load_workbook
+
+
+def read_table(content: bytes, header_label: str) -> Optional[pd.DataFrame]:
+    """
+    Read the table whose header row contains header_label, or None if not found.
+
+    Streams the first worksheet through openpyxl's read-only mode: rows above
+    the header are dropped as they are read and the table rows are kept as
+    plain lists, with no intermediate DataFrame. They go through the same
+    TextParser pd.read_excel(header=...) uses, trimmed and padded as its
+    openpyxl reader does (trailing blank cells and rows dropped, blank cells
+    passed as ""), so the result matches read_excel: blank cells are NaN,
+    blank headers become "Unnamed: N" and column types are inferred from the
+    data rows.
+    """
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True, keep_links=False)
+    rows = None
+    width = 0
+    last_filled = 0
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            row = list(row)
+            while row and row[-1] is None:
+                row.pop()
+            if not row:
+                if rows is not None:
+                    rows.append(row)
+                continue
+            # read_excel pads every row to the widest one, preamble included
+            width = max(width, len(row))
+            if rows is None:
+                if not any(header_label in str(value) for value in row):
+                    continue
+                rows = []
+            last_filled = len(rows)
+            rows.append(["" if value is None else value for value in row])
+    finally:
+        workbook.close()
+
+    if rows is None:
+        return None
+    # Blank rows inside the table stay, trailing ones go
+    rows = rows[:last_filled + 1]
+    return TextParser([row + [""] * (width - len(row)) for row in rows], header=0).read()
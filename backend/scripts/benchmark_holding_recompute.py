@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark recomputing holdings from the transaction log.
+
+Builds a throwaway SQLite database with synthetic holdings and transactions
+(inserted in random date order, as out-of-order imports would), then times:
+1. A full recompute of every holding
+2. A consistency check (dry run) on the recomputed data
+3. Recomputing a single holding
+
+Usage:
+    python scripts/benchmark_holding_recompute.py                      # 200 holdings x 500 transactions
+    python scripts/benchmark_holding_recompute.py --holdings 50 --transactions 2000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Holding, Transaction
+from app.services.holding_recompute_service import HoldingRecomputeService
+
+
+def populate(db, holdings: int, transactions: int, seed: int) -> None:
+    """Insert holdings with zeroed positions and shuffled BUY/SELL history."""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+
+    for h in range(holdings):
+        holding = Holding(
+            symbol=f"SYM{h:04d}",
+            exchange="TSX",
+            country="CA",
+            quantity=Decimal("0"),
+            avg_purchase_price=Decimal("0"),
+            currency="CAD",
+            account_type="TFSA",
+            is_active=True,
+        )
+        db.add(holding)
+        db.flush()
+
+        # Generate a valid history, then insert it in shuffled order
+        held = Decimal("0")
+        rows = []
+        day = start
+        for _ in range(transactions):
+            day += timedelta(days=rng.randint(1, 5))
+            price = Decimal(str(round(rng.uniform(10, 500), 4)))
+            if held > 0 and rng.random() < 0.3:
+                quantity = Decimal(rng.randint(1, int(held)))
+                held -= quantity
+                txn_type = "SELL"
+            else:
+                quantity = Decimal(rng.randint(1, 100))
+                held += quantity
+                txn_type = "BUY"
+            rows.append(Transaction(
+                holding_id=holding.id,
+                symbol=holding.symbol,
+                transaction_type=txn_type,
+                quantity=quantity,
+                price_per_share=price,
+                fees=Decimal("9.99"),
+                transaction_date=day,
+            ))
+        rng.shuffle(rows)
+        db.add_all(rows)
+
+    db.commit()
+
+
+def timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark holding recompute")
+    parser.add_argument("--holdings", type=int, default=200, help="Number of holdings")
+    parser.add_argument("--transactions", type=int, default=500, help="Transactions per holding")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/benchmark.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+
+        total = args.holdings * args.transactions
+        print(f"Generating {args.holdings} holdings x {args.transactions} transactions ({total:,} rows)...")
+        timed("Populate", lambda: populate(db, args.holdings, args.transactions, args.seed))
+
+        result = timed("Full recompute", lambda: HoldingRecomputeService.recompute(db))
+        print(f"  {result.holdings_changed}/{result.holdings_recomputed} holdings changed, "
+              f"{result.transactions_processed:,} transactions, {len(result.warnings)} warnings")
+
+        report = timed("Consistency check", lambda: HoldingRecomputeService.check_consistency(db))
+        print(f"  {report.inconsistent}/{report.holdings_checked} inconsistent")
+
+        first_id = db.query(Holding.id).order_by(Holding.id).first()[0]
+        timed("Single holding recompute", lambda: HoldingRecomputeService.recompute(db, holding_ids=[first_id]))
+
+        db.close()
+        engine.dispose()
+
+        if report.inconsistent:
+            print("WARNING: holdings still inconsistent after recompute")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark Kite (Zerodha) AGTS xlsx parsing.
+
+Generates synthetic multi-year tradebooks and compares:
+1. The legacy path: pd.read_excel twice per file + iterrows for header
+   detection and aggregation
+2. The current path: one streaming openpyxl read per file, boolean-mask
+   header detection and column-wise aggregation
+
+Usage:
+    python scripts/benchmark_kite_import.py                 # 10 years x 2,000 symbols
+    python scripts/benchmark_kite_import.py --years 5 --symbols 500
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from openpyxl import Workbook
+
+from app.services.kite_import_service import KiteImportService
+
+
+def generate_agts_file(year: int, symbols: int, seed: int) -> bytes:
+    """Build an AGTS-like xlsx: a few preamble rows, then one row per symbol traded."""
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Equity")
+    sheet.append(["Zerodha Broking Ltd."])
+    sheet.append(["Annual Global Transaction Statement", f"FY {year}-{year + 1}"])
+    sheet.append(["Client ID", "AB1234"])
+    sheet.append([])
+    sheet.append(["Symbol", "ISIN", "Exchange", "Buy Quantity", "Buy Value", "Sell Quantity", "Sell Value"])
+
+    for i in range(symbols):
+        price = rng.uniform(50, 5000)
+        buy_qty = rng.randint(1, 500)
+        sell_qty = rng.randint(0, buy_qty)
+        sheet.append([
+            f"SYM{i:05d}",
+            f"INE{i:09d}",
+            "NSE" if i % 5 else "BSE",
+            buy_qty,
+            round(buy_qty * price, 2),
+            sell_qty,
+            round(sell_qty * price * rng.uniform(0.8, 1.3), 2),
+        ])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_parse(content: bytes) -> pd.DataFrame:
+    """Previous implementation: iterrows header scan and a second full read."""
+    df = pd.read_excel(io.BytesIO(content), header=None)
+    header_row = None
+    for i, row in df.iterrows():
+        if 'Symbol' in str(row.values):
+            header_row = i
+            break
+    df = pd.read_excel(io.BytesIO(content), header=header_row)
+    return df[df['Symbol'].notna()]
+
+
+def legacy_aggregate(dataframes) -> list:
+    """Previous implementation: groupby then iterrows to build holdings."""
+    combined = pd.concat(dataframes, ignore_index=True)
+    grouped = combined.groupby(['Symbol', 'Exchange']).agg({
+        'Buy Quantity': 'sum',
+        'Buy Value': 'sum',
+        'Sell Quantity': 'sum',
+        'Sell Value': 'sum'
+    }).reset_index()
+
+    holdings = []
+    for _, row in grouped.iterrows():
+        buy_qty = Decimal(str(row['Buy Quantity']))
+        sell_qty = Decimal(str(row['Sell Quantity']))
+        buy_value = Decimal(str(row['Buy Value']))
+        if buy_qty - sell_qty > 0:
+            holdings.append((row['Symbol'], row['Exchange'], buy_qty - sell_qty, buy_value / buy_qty))
+    return holdings
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kite AGTS parsing")
+    parser.add_argument("--years", type=int, default=10, help="Number of annual statements")
+    parser.add_argument("--symbols", type=int, default=2000, help="Symbols per statement")
+    args = parser.parse_args()
+
+    print(f"Generating {args.years} statements x {args.symbols} symbols...")
+    files = [generate_agts_file(2015 + y, args.symbols, seed=y) for y in range(args.years)]
+    size_mb = sum(len(f) for f in files) / 1024 / 1024
+    print(f"Total size: {size_mb:.1f} MB")
+
+    def run_legacy():
+        return legacy_aggregate([legacy_parse(f) for f in files])
+
+    def run_current():
+        holdings, _ = KiteImportService.parse_multiple_files(files)
+        return holdings
+
+    legacy_holdings, legacy_seconds = timed(run_legacy)
+    current_holdings, current_seconds = timed(run_current)
+
+    print(f"Legacy:  {legacy_seconds:7.2f}s  ({len(legacy_holdings)} holdings)")
+    print(f"Current: {current_seconds:7.2f}s  ({len(current_holdings)} holdings)")
+    if current_seconds > 0:
+        print(f"Speedup: {legacy_seconds / current_seconds:.1f}x")
+
+    if len(legacy_holdings) != len(current_holdings):
+        print("WARNING: holding counts differ between implementations")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
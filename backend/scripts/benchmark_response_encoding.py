@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark response encoding for large analytics payloads.
+
+Builds a daily-movers style payload (one dict of Decimals per holding) and a
+10-year daily history, then compares:
+1. FastAPI's path for `-> Dict` endpoints: validate and serialize against the
+   inferred Dict response model, then json.dumps
+2. jsonable_encoder + json.dumps (endpoints without an annotation)
+3. FastJSONResponse (orjson), used by FastRoute
+4. MsgPackResponse, if msgpack is installed
+
+Usage:
+    python scripts/benchmark_response_encoding.py                  # 2,000 holdings, 10 years
+    python scripts/benchmark_response_encoding.py --holdings 500 --days 1825
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.utils.responses import FastJSONResponse, MsgPackResponse, msgpack
+
+
+def money(rng: random.Random, low: float, high: float) -> Decimal:
+    return Decimal(str(round(rng.uniform(low, high), 2)))
+
+
+def build_movers(holdings: int, seed: int) -> Dict:
+    """Payload shaped like /analytics/daily-movers."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(holdings):
+        price = money(rng, 5, 500)
+        rows.append({
+            'symbol': f"SYM{i:05d}",
+            'company_name': f"Company {i}",
+            'exchange': rng.choice(['TSX', 'NYSE', 'NASDAQ', 'NSE']),
+            'quantity': Decimal(rng.randint(1, 500)),
+            'current_price': price,
+            'previous_close': price - money(rng, -5, 5),
+            'change': money(rng, -5, 5),
+            'change_pct': money(rng, -5, 5),
+            'market_value_cad': money(rng, 100, 100000),
+            'daily_change_cad': money(rng, -1000, 1000),
+            'last_updated': datetime.now(),
+        })
+    return {
+        'all_holdings': rows,
+        'top_gainers': rows[:5],
+        'top_losers': rows[-5:],
+        'market_open': True,
+        'last_updated': datetime.now(),
+    }
+
+
+def build_history(days: int, seed: int) -> Dict:
+    """Payload shaped like /analytics/portfolio-value over a long window."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days)
+    return {
+        'region': 'all',
+        'data_points': [
+            {
+                'date': start + timedelta(days=i),
+                'value_cad': money(rng, 90000, 110000),
+                'cost_cad': Decimal('90000.00'),
+                'gain_cad': money(rng, -10000, 10000),
+                'gain_pct': money(rng, -10, 10),
+                'holdings_count': 40,
+            }
+            for i in range(days)
+        ],
+    }
+
+
+def time_encoder(encode, payload, repeat: int):
+    """Best-of-repeat time in ms and encoded size in bytes."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode(payload)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response encoding")
+    parser.add_argument("--holdings", type=int, default=2000, help="Holdings in the movers payload")
+    parser.add_argument("--days", type=int, default=3650, help="Days in the history payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per encoder (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dict_adapter = TypeAdapter(Dict)
+    encoders = {
+        "fastapi Dict model": lambda p: json.dumps(
+            dict_adapter.dump_python(dict_adapter.validate_python(p), mode="json")
+        ).encode("utf-8"),
+        "jsonable_encoder": lambda p: json.dumps(jsonable_encoder(p)).encode("utf-8"),
+        "orjson": lambda p: FastJSONResponse(p).body,
+    }
+    if msgpack is not None:
+        encoders["msgpack"] = lambda p: MsgPackResponse(p).body
+
+    payloads = {
+        f"daily-movers ({args.holdings} holdings)": build_movers(args.holdings, args.seed),
+        f"portfolio-value ({args.days} days)": build_history(args.days, args.seed),
+    }
+
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        baseline = None
+        for label, encode in encoders.items():
+            ms, size = time_encoder(encode, payload, args.repeat)
+            baseline = baseline or ms
+            print(f"  {label:<20} {ms:8.1f} ms  {size / 1024:8.1f} KB  {baseline / ms:5.1f}x")
+
+    if msgpack is None:
+        print("\nmsgpack not installed; skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot paths on a synthetic large portfolio.
+
+Generates a SQLite database with synthetic holdings across CA, US and IN,
+their BUY/SELL history, daily closes (a random walk per symbol) and daily FX
+for every business day in the period, plus the current price cache. It then
+measures wall time and peak Python memory (tracemalloc) for:
+1. Portfolio summary          GET /analytics/portfolio/summary?fast=true
+2. Allocation                 GET /analytics/allocation?fast=true
+3. Enriched holdings          GET /holdings/enriched
+4. Transactions page          GET /transactions/page
+5. Realized gains             GET /analytics/realized-gains
+6. Holding recompute          HoldingRecomputeService.recompute (all holdings)
+7. Snapshot creation          SnapshotService.create_snapshot for a past date
+8. History backfill           backfill_history over the last --backfill-days
+9. Import                     Wealthsimple CSV with --import-rows transactions
+
+Everything runs offline against the generated data: endpoints use cached
+prices and stored FX, and backfill's yfinance download is answered from the
+generated price history, so timings cover the app's own work and runs are
+repeatable. Each benchmark runs --repeat times untraced for wall time, then
+once more under tracemalloc for peak memory (skip with --no-memory).
+
+Usage:
+    python scripts/benchmark_suite.py                        # 1,000 holdings, 500k transactions, 10 years
+    python scripts/benchmark_suite.py --holdings 200 --transactions 50000 --years 3
+    python scripts/benchmark_suite.py --db /tmp/bench.db     # keep (or reuse) the generated database
+    python scripts/benchmark_suite.py --only summary,allocation,realized_gains
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BENCHMARKS = (
+    "summary", "allocation", "enriched_holdings", "transactions_page", "realized_gains",
+    "holding_recompute", "create_snapshot", "backfill", "import",
+)
+
+# (country, exchange, currency, account types) by holding index modulo 10
+MARKETS = (
+    [("CA", "TSX", "CAD", ("TFSA", "RRSP", "FHSA", "NON_REG"))] * 5
+    + [("US", "NYSE", "USD", ("TFSA", "RRSP", "NON_REG"))] * 2
+    + [("US", "NASDAQ", "USD", ("TFSA", "RRSP", "NON_REG"))]
+    + [("IN", "NSE", "INR", ("DEMAT",))] * 2
+)
+
+# Starting rates to CAD and annual volatility for the FX walks
+FX_START = {"USD": (1.30, 0.06), "INR": (0.0165, 0.08)}
+
+
+def symbol_name(index: int) -> str:
+    """Letters-only symbols (AAAA, AAAB, ...), as the statement parsers expect."""
+    return "".join(chr(65 + (index // 26 ** k) % 26) for k in (3, 2, 1, 0))
+
+
+def business_days(years: int) -> list:
+    end = date.today() - timedelta(days=1)
+    days = np.arange(np.datetime64(end - timedelta(days=365 * years)), np.datetime64(end + timedelta(days=1)))
+    return [d.item() for d in days[np.is_busday(days)]]
+
+
+def random_walk(rng: np.random.Generator, start: float, days: int, drift: float, volatility: float) -> np.ndarray:
+    """Daily closes following geometric Brownian motion."""
+    returns = rng.normal(drift / 252, volatility / np.sqrt(252), days)
+    return start * np.exp(np.cumsum(returns))
+
+
+def generate(db, holdings: int, transactions: int, years: int, seed: int) -> None:
+    from sqlalchemy import insert
+
+    from app.models import CurrentPriceCache, ExchangeRate, Holding, PriceHistory, Transaction
+    from app.services.holding_recompute_service import HoldingRecomputeService
+
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed)
+    days = business_days(years)
+
+    # Holdings (positions are rebuilt from transactions at the end)
+    rows = []
+    for i in range(holdings):
+        country, exchange, currency, account_types = MARKETS[i % len(MARKETS)]
+        account_type = account_types[(i // len(MARKETS)) % len(account_types)]
+        rows.append({
+            "symbol": symbol_name(i),
+            "company_name": f"Synthetic {symbol_name(i)}",
+            "exchange": exchange,
+            "country": country,
+            "quantity": 0,
+            "avg_purchase_price": 0,
+            "currency": currency,
+            "account_type": account_type,
+            "account_id": f"SYN-{account_type}",
+            "is_active": True,
+        })
+    db.execute(insert(Holding), rows)
+    db.commit()
+    holding_rows = db.query(Holding.id, Holding.symbol, Holding.exchange, Holding.currency).order_by(Holding.id).all()
+
+    # Daily closes, then transactions priced off them
+    per_holding, extra = divmod(transactions, holdings)
+    price_rows, transaction_rows, cache_rows = [], [], []
+    for n, (holding_id, symbol, exchange, currency) in enumerate(holding_rows):
+        start = rng.uniform(100, 4000) if currency == "INR" else rng.uniform(10, 500)
+        closes = np.round(random_walk(rng, start, len(days), rng.uniform(-0.02, 0.12), rng.uniform(0.15, 0.45)), 4)
+        volumes = rng.integers(10_000, 5_000_000, len(days))
+        price_rows.extend(
+            {"symbol": symbol, "exchange": exchange, "date": day, "close": close, "volume": volume}
+            for day, close, volume in zip(days, closes.tolist(), volumes.tolist())
+        )
+        cache_rows.append({"symbol": symbol, "exchange": exchange, "price": float(closes[-1]), "currency": currency})
+
+        held = 0
+        for day_index in sorted(rng.integers(0, len(days), per_holding + (1 if n < extra else 0)).tolist()):
+            price = round(float(closes[day_index]) * py_rng.uniform(0.995, 1.005), 4)
+            if held > 1 and py_rng.random() < 0.3:
+                quantity = py_rng.randint(1, held)
+                held -= quantity
+                txn_type = "SELL"
+            else:
+                quantity = py_rng.randint(1, 100)
+                held += quantity
+                txn_type = "BUY"
+            transaction_rows.append({
+                "holding_id": holding_id,
+                "symbol": symbol,
+                "transaction_type": txn_type,
+                "quantity": quantity,
+                "price_per_share": price,
+                "fees": 9.99 if currency != "INR" else 0,
+                "transaction_date": days[day_index],
+            })
+
+        if len(price_rows) >= 200_000:
+            db.execute(insert(PriceHistory), price_rows)
+            price_rows = []
+        if len(transaction_rows) >= 100_000:
+            db.execute(insert(Transaction), transaction_rows)
+            transaction_rows = []
+    if price_rows:
+        db.execute(insert(PriceHistory), price_rows)
+    if transaction_rows:
+        db.execute(insert(Transaction), transaction_rows)
+    db.execute(insert(CurrentPriceCache), cache_rows)
+
+    # Daily FX to and from CAD, and the USD/INR cross
+    fx_rows = []
+    walks = {currency: random_walk(rng, start, len(days), 0.0, vol) for currency, (start, vol) in FX_START.items()}
+    for i, day in enumerate(days):
+        usd, inr = float(walks["USD"][i]), float(walks["INR"][i])
+        for from_currency, to_currency, rate in (
+            ("USD", "CAD", usd), ("CAD", "USD", 1 / usd),
+            ("INR", "CAD", inr), ("CAD", "INR", 1 / inr),
+            ("USD", "INR", usd / inr), ("INR", "USD", inr / usd),
+        ):
+            fx_rows.append({"from_currency": from_currency, "to_currency": to_currency, "rate": round(rate, 6), "date": day})
+    db.execute(insert(ExchangeRate), fx_rows)
+    db.commit()
+
+    HoldingRecomputeService.recompute(db)
+
+
+def stored_history(symbols, start_date, end_date):
+    """Stand-in for history_backfill.get_historical_prices, read from the generated PriceHistory."""
+    from app.database import SessionLocal
+    from app.models import PriceHistory
+
+    db = SessionLocal()
+    try:
+        prices = {}
+        for symbol, day, close in db.query(PriceHistory.symbol, PriceHistory.date, PriceHistory.close).filter(
+            PriceHistory.symbol.in_(list(symbols)),
+            PriceHistory.date >= start_date,
+            PriceHistory.date <= end_date,
+        ):
+            prices.setdefault(symbol, {})[day] = float(close)
+        return prices
+    finally:
+        db.close()
+
+
+def wealthsimple_csv(symbols: list, rows: int, rng: random.Random) -> str:
+    """A Wealthsimple statement with rows BUY transactions across symbols."""
+    lines = ["date,transaction,description,amount,balance,currency"]
+    today = date.today()
+    for _ in range(rows):
+        symbol = rng.choice(symbols)
+        day = today - timedelta(days=rng.randint(1, 365))
+        quantity = rng.randint(1, 50) + rng.randint(0, 9999) / 10000
+        fx_rate = 1.35
+        amount = quantity * rng.uniform(10, 500) * fx_rate
+        lines.append(
+            f'{day},BUY,"{symbol} - Synthetic {symbol}: Bought {quantity:.4f} shares '
+            f'(executed at {day}), FX Rate: {fx_rate:.4f}",-{amount:.2f},,CAD'
+        )
+    return "\n".join(lines)
+
+
+def build_benchmarks(args) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import Holding, PriceHistory
+    from app.schemas.import_schema import ImportPlatform
+    from app.services import history_backfill
+    from app.services.holding_recompute_service import HoldingRecomputeService
+    from app.services.import_service import ImportService
+    from app.services.snapshot_service import SnapshotService
+
+    # No startup events: background loaders would fetch live prices
+    client = TestClient(app)
+    history_backfill.get_historical_prices = stored_history
+
+    db = SessionLocal()
+    last_day = db.query(PriceHistory.date).order_by(PriceHistory.date.desc()).first()[0]
+    days = business_days(1)
+    snapshot_day = days[-22]
+    backfill_start = days[-args.backfill_days]
+    us_symbols = [s for (s,) in db.query(Holding.symbol).filter(Holding.country == "US")]
+    # /holdings/enriched returns active holdings, up to the limit below
+    enriched_rows = min(db.query(Holding).filter(Holding.is_active == True).count(), 1000)
+    db.close()
+    rng = random.Random(args.seed)
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            assert response.status_code == 200, f"{url}: {response.status_code} {response.text[:200]}"
+        return run
+
+    def with_session(fn):
+        def run():
+            session = SessionLocal()
+            try:
+                fn(session)
+            finally:
+                session.close()
+        return run
+
+    def run_import(session):
+        result = ImportService.import_transactions(
+            session, wealthsimple_csv(us_symbols, args.import_rows, rng), ImportPlatform.WEALTHSIMPLE, "TFSA"
+        )
+        assert result.success, result.errors[:3]
+
+    return {
+        "summary": (get("/api/v1/analytics/portfolio/summary?fast=true"), ""),
+        "allocation": (get("/api/v1/analytics/allocation?fast=true"), ""),
+        "enriched_holdings": (get("/api/v1/holdings/enriched?limit=1000"), f"{enriched_rows:,} rows"),
+        "transactions_page": (get("/api/v1/transactions/page?limit=500"), "first page + totals"),
+        "realized_gains": (get("/api/v1/analytics/realized-gains"), ""),
+        "holding_recompute": (with_session(lambda s: HoldingRecomputeService.recompute(s)), ""),
+        "create_snapshot": (with_session(lambda s: SnapshotService.create_snapshot(s, snapshot_day)), str(snapshot_day)),
+        "backfill": (
+            with_session(lambda s: history_backfill.backfill_history(s, backfill_start, last_day)),
+            f"{backfill_start} to {last_day}",
+        ),
+        "import": (with_session(run_import), f"{args.import_rows:,} rows"),
+    }
+
+
+def measure(fn, repeat: int, memory: bool) -> tuple:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+    return min(times), statistics.median(times), peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot paths on a synthetic large portfolio")
+    parser.add_argument("--holdings", type=int, default=1000, help="Number of holdings")
+    parser.add_argument("--transactions", type=int, default=500_000, help="Total transactions")
+    parser.add_argument("--years", type=int, default=10, help="Years of daily prices and FX")
+    parser.add_argument("--import-rows", type=int, default=5000, help="Transactions per import run")
+    parser.add_argument("--backfill-days", type=int, default=10, help="Business days to backfill")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--db", help="SQLite file to use; generated if it doesn't exist, kept afterwards")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    selected = [b.strip() for b in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db).resolve() if args.db else Path(tmp) / "benchmark.db"
+        exists = db_path.exists()
+
+        # The app binds its engine on import, so point it at the benchmark database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        os.environ.setdefault("FX_REFRESH_MINUTES", "0")
+        os.environ.setdefault("BRIEFING_SCHEDULE_ENABLED", "false")
+        os.environ.setdefault("LEDGER_SYNC_SECONDS", "0")
+
+        import logging
+        logging.disable(logging.WARNING)
+
+        import app.models  # noqa: F401 (registers all tables)
+        from app.database import SessionLocal, init_db
+
+        init_db()
+        if exists:
+            print(f"Using existing database {db_path}")
+        else:
+            print(f"Generating {args.holdings:,} holdings, {args.transactions:,} transactions, "
+                  f"{args.years} years of prices and FX...")
+            started = time.perf_counter()
+            db = SessionLocal()
+            generate(db, args.holdings, args.transactions, args.years, args.seed)
+            db.close()
+            size_mb = db_path.stat().st_size / 1024 / 1024
+            print(f"Generated in {time.perf_counter() - started:.1f}s ({size_mb:,.0f} MB)")
+
+        benchmarks = build_benchmarks(args)
+        print()
+        print(f"{'Benchmark':<20} {'best':>9} {'median':>9} {'peak mem':>10}  notes")
+        for name in selected:
+            fn, note = benchmarks[name]
+            best, median, peak_mb = measure(fn, args.repeat, not args.no_memory)
+            peak = f"{peak_mb:8.1f}MB" if peak_mb is not None else f"{'-':>10}"
+            print(f"{name:<20} {best:8.3f}s {median:8.3f}s {peak}  {note}")
+
+        # ru_maxrss is KB on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss_mb = max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+        print(f"\nProcess peak RSS: {max_rss_mb:,.0f} MB")
+        if args.db:
+            print(f"Database kept at {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Check that holdings rebuilt from the transaction log keep their opening positions.
+
+Runs transaction writes through the API against a throwaway database and lets
+the ledger sync rebuild each holding afterwards, then compares quantity and
+average cost with the expected position:
+1. A manually entered holding (5 @ 10) gets a BUY of 10 @ 20 -> 15 @ 16.6667
+2. A backdated SELL 3 on it is replayed after the opening shares -> 12 @ 18.3333
+3. Deleting every transaction returns it to its opening position (5 @ 10)
+4. A holding created by an import loses its only transaction -> closed (0, inactive)
+5. A CSV import into a manually entered holding keeps the manual shares
+6. A holding given a BUY before openings were recorded (5 @ 10 + 10 @ 20, no
+   opening row) keeps its manual shares through startup and a full recompute
+7. An imported holding closed by a SELL is reactivated when the SELL is deleted
+Finally /holdings/consistency must report nothing inconsistent.
+
+Usage:
+    python scripts/check_holding_ledger.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+TD_HEADER = (
+    "As of Date,2026-01-24\nAccount,TD Direct Investing - X\n,\n"
+    "Trade Date,Settle Date,Description,Action,Quantity,Price,Commission,Net Amount\n"
+)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app binds its engine on import, so point it at the throwaway database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'ledger.db'}"
+        os.environ["LEDGER_SYNC_SECONDS"] = "0"
+
+        import logging
+        logging.disable(logging.WARNING)
+
+        from fastapi.testclient import TestClient
+
+        from app.database import SessionLocal, init_db
+        from app.main import app
+        from app.models import Holding, HoldingOpening, Transaction
+        from app.services.ledger_sync_service import LedgerSyncService
+
+        init_db()
+        # No startup events: background loaders would fetch live prices
+        client = TestClient(app)
+        failures = []
+
+        def check(name: str, holding_id: int, quantity: str, avg_price: str, active: bool = True):
+            # Imports leave their marks for the sync poll, which is off here
+            LedgerSyncService.process()
+            db = SessionLocal()
+            holding = db.query(Holding).filter(Holding.id == holding_id).one()
+            actual = (Decimal(holding.quantity), Decimal(holding.avg_purchase_price), holding.is_active)
+            db.close()
+            expected = (Decimal(quantity), Decimal(avg_price), active)
+            ok = abs(actual[0] - expected[0]) <= Decimal("0.0001") and actual[2] == expected[2] and (
+                expected[0] == 0 or abs(actual[1] - expected[1]) <= Decimal("0.001")
+            )
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: {actual[0]} @ {actual[1]} "
+                  f"({'active' if actual[2] else 'inactive'})")
+            if not ok:
+                failures.append(f"{name}: expected {quantity} @ {avg_price}, active={active}")
+
+        def create_holding(symbol: str, quantity: str, price: str, account_type: str = "TFSA") -> int:
+            response = client.post("/api/v1/holdings/", json={
+                "symbol": symbol, "company_name": symbol, "exchange": "TSX", "country": "CA",
+                "quantity": quantity, "avg_purchase_price": price, "currency": "CAD",
+                "account_type": account_type, "account_id": f"{symbol}-{account_type}",
+                "first_purchase_date": "2024-01-02",
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+        def add(holding_id: int, symbol: str, txn_type: str, quantity: str, price: str, on: str) -> int:
+            response = client.post("/api/v1/transactions/", json={
+                "holding_id": holding_id, "symbol": symbol, "transaction_type": txn_type,
+                "quantity": quantity, "price_per_share": price, "fees": "0", "transaction_date": on,
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+        # 1-3: manual holding with transactions added and removed
+        manual = create_holding("MANL", "5", "10")
+        buy = add(manual, "MANL", "BUY", "10", "20", "2025-03-03")
+        check("manual 5 @ 10 + BUY 10 @ 20", manual, "15", "16.6667")
+        sell = add(manual, "MANL", "SELL", "3", "25", "2025-01-06")
+        check("backdated SELL 3 before the BUY", manual, "12", "18.3333")
+        client.delete(f"/api/v1/transactions/{buy}").raise_for_status()
+        client.delete(f"/api/v1/transactions/{sell}").raise_for_status()
+        check("all transactions deleted", manual, "5", "10")
+
+        # 4: holding that only exists because of its transactions
+        content = TD_HEADER + "05 Jan 2025,07 Jan 2025,NVIDIA CORP,BUY,10,100,0,-1000\n"
+        client.post("/api/v1/import/transactions", json={
+            "platform": "td_direct", "file_content": content, "account_type": "RRSP",
+        }).raise_for_status()
+        db = SessionLocal()
+        imported = db.query(Holding).filter(Holding.symbol == "NVDA").one().id
+        db.close()
+        check("imported BUY 10 @ 100", imported, "10", "100")
+        txn_id = client.get(f"/api/v1/transactions/holding/{imported}").json()[0]["id"]
+        client.delete(f"/api/v1/transactions/{txn_id}").raise_for_status()
+        check("last transaction deleted", imported, "0", "0", active=False)
+
+        # 5: import into a manually entered holding
+        statement = create_holding("NVDA", "4", "50", account_type="TFSA")
+        content = TD_HEADER + "05 Feb 2025,07 Feb 2025,NVIDIA CORP,BUY,6,150,0,-900\n"
+        client.post("/api/v1/import/transactions", json={
+            "platform": "td_direct", "file_content": content, "account_type": "TFSA",
+        }).raise_for_status()
+        check("import BUY 6 @ 150 into manual 4 @ 50", statement, "10", "110")
+
+        # 6: holding from before openings were recorded, backfilled at startup
+        legacy = create_holding("LGCY", "5", "10")
+        db = SessionLocal()
+        db.add(Transaction(holding_id=legacy, symbol="LGCY", transaction_type="BUY", quantity=10,
+                           price_per_share=20, fees=0, transaction_date=date(2025, 3, 3)))
+        holding = db.query(Holding).filter(Holding.id == legacy).one()
+        holding.quantity, holding.avg_purchase_price = Decimal("15"), Decimal("16.6667")
+        db.query(HoldingOpening).filter(HoldingOpening.holding_id == legacy).delete()
+        db.commit()
+        db.close()
+        init_db()
+        client.post("/api/v1/holdings/recompute").raise_for_status()
+        check("legacy 5 @ 10 + BUY 10 @ 20 after recompute", legacy, "15", "16.6667")
+
+        # 7: imported holding closed out, then the closing SELL deleted
+        content = TD_HEADER + (
+            "05 Mar 2025,07 Mar 2025,BROADCOM INC,BUY,10,100,0,-1000\n"
+            "05 Apr 2025,07 Apr 2025,BROADCOM INC,SELL,10,120,0,1200\n"
+        )
+        client.post("/api/v1/import/transactions", json={
+            "platform": "td_direct", "file_content": content, "account_type": "RRSP",
+        }).raise_for_status()
+        db = SessionLocal()
+        closed = db.query(Holding).filter(Holding.symbol == "AVGO").one().id
+        db.close()
+        check("imported BUY 10 + SELL 10", closed, "0", "0", active=False)
+        sell_id = next(t["id"] for t in client.get(f"/api/v1/transactions/holding/{closed}").json()
+                       if t["transaction_type"] == "SELL")
+        client.delete(f"/api/v1/transactions/{sell_id}").raise_for_status()
+        check("closing SELL deleted", closed, "10", "100")
+
+        report = client.get("/api/v1/holdings/consistency").json()
+        print(f"{'ok  ' if not report['inconsistent'] else 'FAIL'} consistency: "
+              f"{report['inconsistent']} of {report['holdings_checked']} holdings inconsistent")
+        if report["inconsistent"]:
+            failures.append(f"{report['inconsistent']} inconsistent holdings")
+
+    if failures:
+        print(f"FAIL: {len(failures)} checks")
+        sys.exit(1)
+    print("OK: opening positions survive ledger rebuilds")
+
+
+if __name__ == "__main__":
+    main()
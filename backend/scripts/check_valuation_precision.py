@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Check that float64 valuation matches Decimal valuation to the cent.
+
+Generates random portfolios with NUMERIC(15,4) quantities and prices, 6-dp FX
+rates, missing prices, snapshot values in notes and previous closes, then
+values each one twice:
+1. The Decimal reference (the per-holding loop the analytics routes used)
+2. ValuationService.value_holdings (float64 arrays)
+
+Every per-holding value and every total must differ by less than half a cent.
+Also reports the time taken by each path.
+
+Usage:
+    python scripts/check_valuation_precision.py                  # 200 portfolios up to 5,000 holdings
+    python scripts/check_valuation_precision.py --portfolios 50 --max-holdings 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.currency_service import FxSnapshot
+from app.services.valuation_service import ValuationService, snapshot_value_from_notes
+
+HALF_CENT = Decimal('0.005')
+
+# Plausible upper bounds per currency so totals reach realistic magnitudes
+CURRENCIES = {
+    "CAD": (Decimal('1'), Decimal('2000')),
+    "USD": (Decimal('1.371234'), Decimal('5000')),
+    "INR": (Decimal('0.016342'), Decimal('50000')),
+}
+
+
+def random_decimal(rng: random.Random, high: Decimal, places: int) -> Decimal:
+    scale = 10 ** places
+    return Decimal(rng.randint(1, int(high * scale))) / scale
+
+
+def build_portfolio(rng: random.Random, size: int):
+    """Holdings, prices and previous closes keyed by symbol."""
+    holdings, prices, previous_closes = [], {}, {}
+    for i in range(size):
+        currency = rng.choice(list(CURRENCIES))
+        _, price_high = CURRENCIES[currency]
+        symbol = f"SYM{i:05d}"
+        notes = None
+        roll = rng.random()
+        if roll < 0.85:
+            prices[symbol] = random_decimal(rng, price_high, 4)
+        elif roll < 0.95:
+            prices[symbol] = None
+            notes = f"Folio 123 | Snapshot: ₹{rng.randint(1000, 50_000_000):,} | XIRR: 12.3"
+        else:
+            prices[symbol] = None  # Valued at cost
+        if rng.random() < 0.9:
+            previous_closes[symbol] = random_decimal(rng, price_high, 4)
+        holdings.append(SimpleNamespace(
+            symbol=symbol,
+            currency=currency,
+            quantity=random_decimal(rng, Decimal('100000'), 4),
+            avg_purchase_price=random_decimal(rng, price_high, 4),
+            notes=notes,
+        ))
+    return holdings, prices, previous_closes
+
+
+def reference_valuation(holdings, prices, previous_closes, rates):
+    """Per-holding Decimal valuation, as the routes computed it before."""
+    values, costs, previous = [], [], []
+    for h in holdings:
+        price = prices.get(h.symbol)
+        cost = h.quantity * h.avg_purchase_price
+        if price is not None:
+            market = h.quantity * price
+        else:
+            snapshot = snapshot_value_from_notes(h.notes)
+            market = Decimal(repr(snapshot)) if snapshot is not None else cost
+        prev_close = previous_closes.get(h.symbol)
+        prev = h.quantity * prev_close if prev_close else market
+        rate = rates[h.currency]
+        values.append(market * rate)
+        costs.append(cost * rate)
+        previous.append(prev * rate)
+    return values, costs, previous
+
+
+def max_error(floats, decimals) -> Decimal:
+    return max((abs(Decimal(repr(f)) - d) for f, d in zip(floats, decimals)), default=Decimal('0'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check float64 valuation precision against Decimal")
+    parser.add_argument("--portfolios", type=int, default=200, help="Random portfolios to check")
+    parser.add_argument("--max-holdings", type=int, default=5000, help="Largest portfolio size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    decimal_rates = {currency: rate for currency, (rate, _) in CURRENCIES.items()}
+    fx = FxSnapshot({c: rate for c, rate in decimal_rates.items() if c != "CAD"})
+
+    worst_holding = Decimal('0')
+    worst_total = Decimal('0')
+    largest_total = Decimal('0')
+    decimal_seconds = 0.0
+    float_seconds = 0.0
+    failures = 0
+
+    for n in range(args.portfolios):
+        size = rng.randint(1, args.max_holdings)
+        holdings, prices, previous_closes = build_portfolio(rng, size)
+
+        start = time.perf_counter()
+        values, costs, previous = reference_valuation(holdings, prices, previous_closes, decimal_rates)
+        totals = [sum(values), sum(costs), sum(previous)]
+        decimal_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        valuation = ValuationService.value_holdings(holdings, prices, fx, previous_closes)
+        float_totals = [valuation.total_value_cad, valuation.total_cost_cad, valuation.total_previous_value_cad]
+        float_seconds += time.perf_counter() - start
+
+        holding_error = max(
+            max_error(valuation.market_value_cad.tolist(), values),
+            max_error(valuation.cost_cad.tolist(), costs),
+            max_error(valuation.previous_value_cad.tolist(), previous),
+        )
+        total_error = max_error(float_totals, totals)
+        worst_holding = max(worst_holding, holding_error)
+        worst_total = max(worst_total, total_error)
+        largest_total = max(largest_total, totals[0])
+
+        if holding_error >= HALF_CENT or total_error >= HALF_CENT:
+            failures += 1
+            print(f"  portfolio {n} ({size} holdings): holding error {holding_error:.6f}, total error {total_error:.6f}")
+
+    print(f"Checked {args.portfolios} portfolios (up to {args.max_holdings} holdings, largest total {largest_total:,.2f} CAD)")
+    print(f"  worst per-holding error: {worst_holding:.2E} CAD")
+    print(f"  worst total error:       {worst_total:.2E} CAD")
+    print(f"  Decimal: {decimal_seconds * 1000:.0f} ms, float64: {float_seconds * 1000:.0f} ms "
+          f"({decimal_seconds / float_seconds:.1f}x)")
+
+    if failures:
+        print(f"FAILED: {failures} portfolios differ by half a cent or more")
+        sys.exit(1)
+    print("OK: all values match to the cent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Check that the streaming xlsx reader matches pd.read_excel.
+
+Generates random broker-style sheets (preamble rows above the table, blank
+cells, blank and duplicate headers, numbers stored as text, dates) and reads
+each one twice:
+1. pd.read_excel(header=<header row>), which the import services used to call
+2. app.utils.xlsx.read_table
+
+The frames must be identical (values, NaN placement, column names and dtypes).
+A Groww-like sheet with blank AMC and folio cells is also parsed by
+GrowwImportService and its generated symbols compared with the ones derived
+from the read_excel frame, since a 'None' vs 'nan' difference there creates
+duplicate holdings on re-import.
+
+Usage:
+    python scripts/check_xlsx_parity.py                 # 200 sheets
+    python scripts/check_xlsx_parity.py --sheets 1000 --rows 500
+"""
+
+import argparse
+import io
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from openpyxl import Workbook
+
+from app.services.groww_import_service import GrowwImportService
+from app.utils.xlsx import read_table
+
+HEADER_LABEL = "Symbol"
+
+
+def random_cell(rng: random.Random, kind: str):
+    """A cell of the column's kind, blank about one time in five."""
+    if rng.random() < 0.2:
+        return None
+    if kind == "text":
+        return rng.choice(["INFY", "TCS", "HDFC Bank", "Axis", "nan", "0"])
+    if kind == "int":
+        return rng.randint(0, 10_000)
+    if kind == "float":
+        return round(rng.uniform(0, 5000), rng.choice([0, 2, 4]))
+    if kind == "numeric_text":
+        return str(rng.randint(1000, 99999))
+    return datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 1500))
+
+
+def random_sheet(rng: random.Random, rows: int) -> tuple:
+    """Build a sheet; returns (xlsx bytes, header row position)."""
+    kinds = ["text"] + [rng.choice(["text", "int", "float", "numeric_text", "date"]) for _ in range(rng.randint(2, 8))]
+    headers = [HEADER_LABEL] + [f"Col {i}" for i in range(1, len(kinds))]
+    for i in range(1, len(headers)):
+        roll = rng.random()
+        if roll < 0.1:
+            headers[i] = None
+        elif roll < 0.2:
+            headers[i] = headers[i - 1]
+
+    workbook = Workbook()
+    sheet = workbook.active
+    preamble = rng.randint(0, 4)
+    for i in range(preamble):
+        sheet.append([f"Statement line {i}"] if rng.random() < 0.7 else [])
+    sheet.append(headers)
+    for _ in range(rows):
+        if rng.random() < 0.05:
+            sheet.append([])
+        else:
+            sheet.append([random_cell(rng, kind) for kind in kinds])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue(), preamble
+
+
+def groww_sheet(rng: random.Random, rows: int) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Groww Mutual Fund Holdings"])
+    sheet.append([])
+    sheet.append(["Scheme Name", "AMC", "Category", "Sub-category", "Folio No.", "Source",
+                  "Units", "Invested Value", "Current Value", "Returns", "XIRR"])
+    for i in range(rows):
+        blank = lambda value: None if rng.random() < 0.3 else value  # noqa: E731
+        sheet.append([
+            f"Scheme {i} Direct Plan Growth",
+            blank(rng.choice(["HDFC", "SBI", "ICICI Prudential"])),
+            blank("Equity"),
+            blank("Large Cap"),
+            blank(rng.randint(10_000_000, 99_999_999)),
+            "Groww",
+            round(rng.uniform(1, 500), 3),
+            round(rng.uniform(1000, 50000), 2),
+            round(rng.uniform(1000, 60000), 2),
+            round(rng.uniform(-500, 5000), 2),
+            blank(f"{rng.uniform(-5, 25):.2f}%"),
+        ])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the streaming xlsx reader against pd.read_excel")
+    parser.add_argument("--sheets", type=int, default=200, help="Random sheets to compare")
+    parser.add_argument("--rows", type=int, default=100, help="Maximum data rows per sheet")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+
+    for n in range(args.sheets):
+        content, header_row = random_sheet(rng, rng.randint(1, args.rows))
+        expected = pd.read_excel(io.BytesIO(content), header=header_row)
+        actual = read_table(content, HEADER_LABEL)
+        try:
+            pd.testing.assert_frame_equal(actual, expected)
+        except AssertionError as e:
+            failures += 1
+            if failures <= 5:
+                print(f"Sheet {n} differs: {e}")
+
+    content = groww_sheet(rng, args.rows)
+    expected = pd.read_excel(io.BytesIO(content), header=2)
+    expected_symbols = [
+        GrowwImportService.generate_symbol(name, str(amc), str(folio))
+        for name, amc, folio in zip(expected["Scheme Name"], expected["AMC"], expected["Folio No."])
+    ]
+    holdings, _ = GrowwImportService.parse_xlsx_content(content)
+    actual_symbols = [GrowwImportService.generate_symbol(h.scheme_name, h.amc, h.folio_no) for h in holdings]
+    if actual_symbols != expected_symbols:
+        failures += 1
+        mismatched = [(a, e) for a, e in zip(actual_symbols, expected_symbols) if a != e]
+        print(f"Groww symbols differ ({len(mismatched)}), e.g. {mismatched[:3]}")
+
+    print(f"Compared {args.sheets} sheets and {len(holdings)} Groww holdings")
+    if failures:
+        print(f"FAIL: {failures} mismatches")
+        sys.exit(1)
+    print("OK: read_table matches pd.read_excel")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,16 +24,27 @@ API_BASE_URL = "http://localhost:8000/api/v1"  # Backend API (inside Docker netw
 EXTERNAL_API_URL = "http://192.168.1.70:5173/api/v1"  # For external access
 
 
-def fetch_briefing_data(base_url: str) -> Optional[Dict]:
-    """Fetch the briefing data from the portfolio API."""
+def create_client() -> httpx.Client:
+    """One keep-alive client for every request the script makes."""
+    return httpx.Client(
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+    )
+
+
+def fetch_briefing_data(base_url: str, client: Optional[httpx.Client] = None, region: str = "all") -> Optional[Dict]:
+    """Fetch the briefing data from the portfolio API (stored after market close)."""
+    if client is None:
+        with create_client() as client:
+            return fetch_briefing_data(base_url, client, region)
     try:
-        response = httpx.get(f"{base_url}/analytics/briefing", timeout=60.0)
+        response = client.get(f"{base_url}/analytics/briefing", params={"region": region})
         response.raise_for_status()
         return response.json()
     except httpx.ConnectError:
         # Try external URL if internal fails
         if base_url != EXTERNAL_API_URL:
-            return fetch_briefing_data(EXTERNAL_API_URL)
+            return fetch_briefing_data(EXTERNAL_API_URL, client, region)
         return None
     except Exception as e:
         print(f"Error fetching briefing data: {e}", file=sys.stderr)
@@ -165,10 +176,12 @@ def main():
     parser.add_argument("--json", action="store_true", help="Output raw JSON data")
     parser.add_argument("--short", action="store_true", help="Generate short one-liner")
     parser.add_argument("--url", default=API_BASE_URL, help="API base URL")
+    parser.add_argument("--region", default="all", choices=["all", "CA", "IN"],
+                        help="Region to brief on (IN is ready after NSE close, CA after TSX close)")
     args = parser.parse_args()
     
     # Fetch data
-    data = fetch_briefing_data(args.url)
+    data = fetch_briefing_data(args.url, region=args.region)
     
     if not data:
         print("Failed to fetch portfolio data", file=sys.stderr)
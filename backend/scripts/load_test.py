@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Load-test the API with simulated dashboards.
+
+Each virtual user behaves like an open dashboard (frontend/src/services/api.js
+and the React Query hooks): on load it fires the page's queries in parallel,
+then polls the live summary and history, and after --polls rounds it reloads
+the page. Like a browser, it revalidates with If-None-Match once it has an
+ETag (disable with --no-etag).
+
+Endpoints replayed:
+    fast summary       GET /analytics/portfolio/summary?fast=true     page load
+    live summary       GET /analytics/portfolio/summary?fast=false    page load, poll
+    allocation         GET /analytics/allocation                      page load
+    account breakdown  GET /analytics/account-breakdown?fast=true     page load
+    history            GET /portfolio/history/compact?days=30         page load, poll
+    movers             GET /analytics/daily-movers                    page load
+
+Users are ramped through --users stages of --duration seconds each. Every
+stage reports requests, errors, 304s, throughput and p50/p95/p99 latency per
+endpoint, plus the time for a whole page load. The ramp stops at the first
+stage whose error rate or page-load p95 exceeds --max-error-rate / --max-p95.
+
+Run it against a server started with PRICE_PROVIDER=simulated so live
+requests are served offline, or pass --serve to start one (uvicorn, with the
+simulated provider and --db as its database).
+
+Usage:
+    python scripts/load_test.py --serve --db /tmp/bench.db                # 1, 5, 10, 25, 50 dashboards
+    python scripts/load_test.py --url http://localhost:8000/api/v1 --users 10,100 --duration 60
+    python scripts/load_test.py --serve --db /tmp/bench.db --think 5 --polls 10
+
+A large database to test against can be generated with
+    python scripts/benchmark_suite.py --db /tmp/bench.db --only summary
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+PAGE_LOAD = "page load"
+
+# name -> (path, params)
+ENDPOINTS = {
+    "fast summary": ("/analytics/portfolio/summary", {"fast": "true"}),
+    "live summary": ("/analytics/portfolio/summary", {"fast": "false"}),
+    "allocation": ("/analytics/allocation", {"fast": "false"}),
+    "account breakdown": ("/analytics/account-breakdown", {"fast": "true"}),
+    "history": ("/portfolio/history/compact", {"days": 30, "interval": "daily"}),
+    "movers": ("/analytics/daily-movers", {"limit": 5}),
+}
+PAGE_QUERIES = list(ENDPOINTS)
+POLL_QUERIES = ["live summary", "history"]
+
+# Region-aware endpoints (usePortfolioSummary / useAllocation / useAccountBreakdown)
+REGIONAL = {"fast summary", "live summary", "allocation", "account breakdown"}
+
+
+class Stats:
+    """Latencies (seconds) and outcomes per endpoint for one stage."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.not_modified = defaultdict(int)
+
+    def record(self, name: str, seconds: float, status: int = 0) -> None:
+        if status >= 500 or status == 0:
+            self.errors[name] += 1
+        else:
+            self.latencies[name].append(seconds)
+            if status == 304:
+                self.not_modified[name] += 1
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+class Dashboard:
+    """One virtual user: an open dashboard with its own ETag cache."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, args, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.args = args
+        self.rng = rng
+        self.etags = {}
+
+    async def fetch(self, name: str) -> None:
+        path, params = ENDPOINTS[name]
+        params = dict(params)
+        if name in REGIONAL:
+            params["region"] = self.args.region
+        headers = {}
+        if not self.args.no_etag and name in self.etags:
+            headers["If-None-Match"] = self.etags[name]
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.get(path, params=params, headers=headers)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        self.stats.record(name, time.perf_counter() - start, status)
+
+        if status == 200 and "etag" in response.headers:
+            self.etags[name] = response.headers["etag"]
+
+    async def load_page(self) -> None:
+        start = time.perf_counter()
+        await asyncio.gather(*(self.fetch(name) for name in PAGE_QUERIES))
+        self.stats.record(PAGE_LOAD, time.perf_counter() - start, 200)
+
+    async def run(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            await self.load_page()
+
+            for _ in range(self.args.polls):
+                await asyncio.sleep(self.args.think * self.rng.uniform(0.5, 1.5))
+                if time.perf_counter() >= deadline:
+                    return
+                await asyncio.gather(*(self.fetch(name) for name in POLL_QUERIES))
+
+
+async def run_stage(args, users: int, seed: int) -> Stats:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=users * len(PAGE_QUERIES), max_keepalive_connections=users * len(PAGE_QUERIES))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        deadline = time.perf_counter() + args.duration
+        dashboards = [Dashboard(client, stats, args, random.Random(seed + i)) for i in range(users)]
+        await asyncio.gather(*(d.run(deadline) for d in dashboards))
+    return stats
+
+
+def report(stats: Stats, users: int, elapsed: float) -> tuple:
+    """Print the stage table; returns (error rate, page-load p95)."""
+    print(f"\n{users} dashboard{'s' if users != 1 else ''}, {elapsed:.0f}s")
+    print(f"{'Endpoint':<18} {'requests':>9} {'errors':>7} {'304s':>6} {'req/s':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+
+    total = errors = 0
+    for name in PAGE_QUERIES + [PAGE_LOAD]:
+        latencies = sorted(stats.latencies[name])
+        count = len(latencies) + stats.errors[name]
+        if name != PAGE_LOAD:
+            total += count
+            errors += stats.errors[name]
+        else:
+            print("-" * 86)
+        ms = [percentile(latencies, p) * 1000 for p in (50, 95, 99, 100)]
+        print(f"{name:<18} {count:>9,} {stats.errors[name]:>7,} {stats.not_modified[name]:>6,} "
+              f"{count / elapsed:>8.1f} " + " ".join(f"{v:>6.0f}ms" for v in ms))
+
+    error_rate = errors / total if total else 0.0
+    page_p95 = percentile(sorted(stats.latencies[PAGE_LOAD]), 95)
+    print(f"{'total':<18} {total:>9,} {errors:>7,} {'':>6} {total / elapsed:>8.1f}")
+    return error_rate, page_p95
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args) -> subprocess.Popen:
+    """Start uvicorn with the simulated price provider and point --url at it."""
+    port = free_port()
+    log = open(args.server_log, "a") if args.server_log else subprocess.DEVNULL
+    env = dict(os.environ)
+    env["PRICE_PROVIDER"] = "simulated"
+    if args.db:
+        env["DATABASE_URL"] = f"sqlite:///{Path(args.db).resolve()}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    args.url = f"http://127.0.0.1:{port}/api/v1"
+    print(f"Started server on port {port} (output: {args.server_log or 'discarded'})")
+    return server
+
+
+async def wait_ready(url: str, timeout: float) -> None:
+    """Wait until /status reports the initial load finished (as the frontend does)."""
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+        while True:
+            try:
+                response = await client.get("/status")
+                if response.status_code == 200 and response.json().get("ready"):
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise SystemExit(f"Server at {url} not ready after {timeout:.0f}s")
+            await asyncio.sleep(0.5)
+
+
+async def run(args) -> None:
+    stages = [int(u) for u in args.users.split(",")]
+    await wait_ready(args.url, args.startup_timeout)
+
+    # One unrecorded page load so every stage starts with warm caches
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        await Dashboard(client, Stats(), args, random.Random(args.seed)).load_page()
+
+    print(f"Target {args.url}, region {args.region}, think {args.think}s, {args.polls} polls per page load")
+    results = []
+    for users in stages:
+        start = time.perf_counter()
+        stats = await run_stage(args, users, args.seed)
+        error_rate, page_p95 = report(stats, users, time.perf_counter() - start)
+        results.append((users, error_rate, page_p95))
+        if error_rate > args.max_error_rate or page_p95 > args.max_p95:
+            print(f"\nStopped: error rate {error_rate:.1%}, page-load p95 {page_p95:.2f}s")
+            break
+
+    survived = [users for users, error_rate, page_p95 in results
+                if error_rate <= args.max_error_rate and page_p95 <= args.max_p95]
+    print()
+    if survived:
+        print(f"Sustained {max(survived)} concurrent dashboards "
+              f"(error rate <= {args.max_error_rate:.1%}, page-load p95 <= {args.max_p95}s)")
+    else:
+        print("No stage stayed within the limits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with simulated dashboards")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/v1", help="API base URL")
+    parser.add_argument("--serve", action="store_true", help="Start a server with the simulated price provider")
+    parser.add_argument("--db", help="SQLite file for --serve (default: the app's configured database)")
+    parser.add_argument("--server-log", help="File for the --serve server's output (default: discarded)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --serve")
+    parser.add_argument("--users", default="1,5,10,25,50", help="Comma-separated concurrent dashboards per stage")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per stage")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between polls")
+    parser.add_argument("--polls", type=int, default=3, help="Poll rounds before a dashboard reloads the page")
+    parser.add_argument("--region", default="all", choices=["all", "CA", "IN"], help="Dashboard region filter")
+    parser.add_argument("--no-etag", action="store_true", help="Never send If-None-Match")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Stop the ramp above this error rate")
+    parser.add_argument("--max-p95", type=float, default=5.0, help="Stop the ramp above this page-load p95 (seconds)")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="Seconds to wait for the server to be ready")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for think times")
+    args = parser.parse_args()
+
+    server = start_server(args) if args.serve else None
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
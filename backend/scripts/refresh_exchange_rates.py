@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Fetch and store exchange rates once, outside the server's schedule.
+
+Each base currency is fetched with one API call and all of its pairs are
+stored for today. Point --url at a local stand-in to try it offline; it must
+serve {"rates": {...}} for the URL with {base} filled in.
+
+Usage:
+    python scripts/refresh_exchange_rates.py                       # Configured bases and API
+    python scripts/refresh_exchange_rates.py --bases CAD,USD
+    python scripts/refresh_exchange_rates.py --url http://localhost:8081/latest/{base}
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import init_db
+from app.services.fx_refresh_service import FxRefreshService
+
+
+async def run(bases):
+    try:
+        start = time.perf_counter()
+        count = await FxRefreshService.refresh(bases=bases)
+        elapsed = time.perf_counter() - start
+    finally:
+        await FxRefreshService.stop()
+    print(f"Stored {count} exchange rates in {elapsed * 1000:.0f} ms")
+    if FxRefreshService.last_error:
+        print(f"Errors: {FxRefreshService.last_error}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch and store exchange rates")
+    parser.add_argument("--bases", help="Comma-separated base currencies (default: FX_BASE_CURRENCIES)")
+    parser.add_argument("--url", help="Rates API URL with a {base} placeholder (default: FX_API_URL)")
+    args = parser.parse_args()
+
+    if args.url:
+        settings.fx_api_url = args.url
+    bases = [b.strip().upper() for b in args.bases.split(",")] if args.bases else None
+
+    init_db()
+    if not asyncio.run(run(bases)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ import Transactions from './pages/Transactions';
 import News from './pages/News';
 import ImportModal from './components/import/ImportModal';
 import { useRefreshPrices, usePortfolioSummary, useAppStatus } from './hooks/usePortfolio';
+import { usePortfolioStream } from './hooks/usePortfolioStream';
 import { useEffect, useRef, useState, useCallback } from 'react';
 import { holdingsAPI, transactionsAPI } from './services/api';
 
@@ -81,6 +82,7 @@ function AppContent() {
   const refreshPrices = useRefreshPrices();
   const { data: summary, refetch: refetchSummary } = usePortfolioSummary();
   const { data: status } = useAppStatus();
+  usePortfolioStream();
   const wasLoadingRef = useRef(true);
   const [isImportModalOpen, setIsImportModalOpen] = useState(false);
   const { showToast } = useToast();
@@ -8,7 +8,8 @@
  */
 import { useState } from 'react';
 import { XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Area, AreaChart } from 'recharts';
-import { usePortfolioHistory } from '../../hooks/usePortfolioHistory';
+import { usePortfolioHistoryCompact } from '../../hooks/usePortfolioHistory';
+import { usePortfolioSummary } from '../../hooks/usePortfolio';
 import Card from '../common/Card';
 import LoadingSpinner from '../common/LoadingSpinner';
 
@@ -21,9 +22,13 @@ const TIME_PERIODS = [
   { label: 'ALL', days: 3650 }, // ~10 years
 ];
 
+// Longer periods are downsampled server-side to keep the payload small
+const intervalFor = (days) => (days > 365 ? 'weekly' : 'daily');
+
 export default function PortfolioValueChart() {
   const [selectedPeriod, setSelectedPeriod] = useState(30); // Default to 30 days
-  const { data: historyData, isLoading, isError } = usePortfolioHistory(selectedPeriod);
+  const { data: historyData, isLoading, isError } = usePortfolioHistoryCompact(selectedPeriod, intervalFor(selectedPeriod));
+  const { data: summary } = usePortfolioSummary();
 
   if (isLoading) {
     return (
@@ -45,7 +50,7 @@ export default function PortfolioValueChart() {
     );
   }
 
-  if (!historyData || historyData.snapshots.length === 0) {
+  if (!historyData || historyData.dates.length === 0) {
     return (
       <Card>
         <div className="flex flex-col items-center justify-center h-80 text-secondary-500 dark:text-secondary-400">
@@ -61,32 +66,36 @@ export default function PortfolioValueChart() {
   }
 
   // Transform data for the chart
-  const chartData = historyData.snapshots.map(snapshot => ({
-    date: new Date(snapshot.snapshot_date).toLocaleDateString('en-US', {
+  const chartData = historyData.dates.map((snapshotDate, i) => ({
+    date: new Date(snapshotDate).toLocaleDateString('en-US', {
       month: 'short',
       day: 'numeric',
     }),
-    fullDate: snapshot.snapshot_date,
-    value: parseFloat(snapshot.total_value_cad),
-    gain: parseFloat(snapshot.unrealized_gain_cad),
+    fullDate: snapshotDate,
+    value: historyData.values[i],
+    gain: historyData.values[i] - historyData.costs[i],
   }));
 
-  // Add current value as the last data point if we have snapshots
-  if (historyData.current_value && chartData.length > 0) {
-    const lastSnapshot = historyData.snapshots[historyData.snapshots.length - 1];
+  // Add current value as the last data point, falling back to the last snapshot
+  const lastIndex = historyData.dates.length - 1;
+  const currentValue = summary?.total_value_cad != null
+    ? parseFloat(summary.total_value_cad)
+    : historyData.values[lastIndex];
+  if (summary?.total_value_cad != null) {
     const today = new Date().toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
 
     chartData.push({
       date: today,
       fullDate: new Date().toISOString().split('T')[0],
-      value: parseFloat(historyData.current_value),
-      gain: parseFloat(historyData.current_value) - parseFloat(lastSnapshot.total_cost_cad),
+      value: currentValue,
+      gain: currentValue - historyData.costs[lastIndex],
     });
   }
 
-  // Calculate value change
-  const valueChange = parseFloat(historyData.value_change) || 0;
-  const valueChangePct = parseFloat(historyData.value_change_pct) || 0;
+  // Calculate value change from the first point
+  const startValue = historyData.values[0];
+  const valueChange = currentValue - startValue;
+  const valueChangePct = startValue > 0 ? (valueChange / startValue) * 100 : 0;
   const isPositive = valueChange >= 0;
 
   // Format currency
@@ -204,17 +213,17 @@ export default function PortfolioValueChart() {
         <div>
           <p className="text-xs text-secondary-500 dark:text-secondary-400 uppercase">Start Date</p>
           <p className="text-sm font-semibold text-secondary-900 dark:text-secondary-100 mt-1">
-            {new Date(historyData.start_date).toLocaleDateString()}
+            {new Date(historyData.dates[0]).toLocaleDateString()}
           </p>
         </div>
         <div>
-          <p className="text-xs text-secondary-500 dark:text-secondary-400 uppercase">Days Tracked</p>
-          <p className="text-sm font-semibold text-secondary-900 dark:text-secondary-100 mt-1">{historyData.total_days}</p>
+          <p className="text-xs text-secondary-500 dark:text-secondary-400 uppercase">Data Points</p>
+          <p className="text-sm font-semibold text-secondary-900 dark:text-secondary-100 mt-1">{historyData.dates.length}</p>
         </div>
         <div>
           <p className="text-xs text-secondary-500 dark:text-secondary-400 uppercase">Current Value</p>
           <p className="text-sm font-semibold text-secondary-900 dark:text-secondary-100 mt-1">
-            {formatCurrency(historyData.current_value)}
+            {formatCurrency(currentValue)}
           </p>
         </div>
         <div>
@@ -86,6 +86,8 @@ export default function ImportModal({ isOpen, onClose }) {
         ...aggregated,
         new_symbols: Array.from(aggregated.new_symbols),
         existing_symbols: Array.from(aggregated.existing_symbols),
+        // Single-file imports can commit the previewed batch without re-uploading
+        preview_token: results.length === 1 ? results[0].preview_token : null,
       };
     },
     onSuccess: (data) => {
@@ -100,7 +102,16 @@ export default function ImportModal({ isOpen, onClose }) {
 
   // Import mutation (single file)
   const importMutation = useMutation({
-    mutationFn: async ({ file, platform, accountType, skipDuplicates }) => {
+    mutationFn: async ({ file, platform, accountType, skipDuplicates, previewToken }) => {
+      if (previewToken) {
+        try {
+          const response = await importAPI.uploadImport(file, platform, accountType || null, skipDuplicates, previewToken);
+          return response.data;
+        } catch (err) {
+          // Preview expired (410) or its options changed (409) - upload the file instead
+          if (![409, 410].includes(err.response?.status)) throw err;
+        }
+      }
       const response = await importAPI.uploadImport(file, platform, accountType || null, skipDuplicates);
       return response.data;
     },
@@ -184,6 +195,7 @@ export default function ImportModal({ isOpen, onClose }) {
         platform: selectedPlatform,
         accountType,
         skipDuplicates,
+        previewToken: previewData?.preview_token,
       });
     } else {
       // Bulk import for multiple files
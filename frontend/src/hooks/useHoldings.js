@@ -8,6 +8,13 @@ export const useHoldings = (filters = {}) => {
   });
 };
 
+export const useEnrichedHoldings = (params = {}) => {
+  return useQuery({
+    queryKey: ['holdings', 'enriched', params],
+    queryFn: () => holdingsAPI.getEnriched(params).then(res => res.data),
+  });
+};
+
 export const useAccountTypes = () => {
   return useQuery({
     queryKey: ['accountTypes'],
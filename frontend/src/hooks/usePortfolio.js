@@ -42,7 +42,8 @@ export const usePortfolioSummary = (region = 'all') => {
   const liveQuery = useQuery({
     queryKey: ['portfolio', 'summary', 'live', region],
     queryFn: () => analyticsAPI.getPortfolioSummary(false, region).then(res => res.data),
-    refetchInterval: 5 * 60 * 1000, // Refetch every 5 minutes
+    // Refetch every 5 minutes, unless the live stream is pushing updates
+    refetchInterval: () => (queryClient.getQueryData(['stream', 'connected']) ? false : 5 * 60 * 1000),
     retry: 3,
     retryDelay: (attemptIndex) => Math.min(2000 * (attemptIndex + 1), 10000),
     // Don't show loading state if we have cached data
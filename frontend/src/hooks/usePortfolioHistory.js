@@ -19,6 +19,83 @@ export const usePortfolioHistory = (days = 30) => {
   });
 };
 
+/**
+ * Decode a compact history response into parallel arrays of ISO dates, values and costs
+ */
+const decodeCompactHistory = (data) => {
+  const dates = [];
+  const values = [];
+  const costs = [];
+  if (!data.base_date) return { dates, values, costs };
+
+  // Dates as UTC midnight so day arithmetic ignores the local timezone
+  let day = Date.parse(`${data.base_date}T00:00:00Z`);
+  let value = 0;
+  let cost = 0;
+  for (let i = 0; i < data.count; i++) {
+    day += data.day_deltas[i] * 86400000;
+    value += data.value_cents[i];
+    cost += data.cost_cents[i];
+    dates.push(new Date(day).toISOString().split('T')[0]);
+    values.push(value / 100);
+    costs.push(cost / 100);
+  }
+  return { dates, values, costs };
+};
+
+/**
+ * Hook to fetch portfolio history in the compact columnar format.
+ *
+ * The first load of the day fetches the whole range; refetches only ask for
+ * points since the last date already held and replace the tail from there.
+ */
+export const usePortfolioHistoryCompact = (days = 30, interval = 'daily') => {
+  const queryClient = useQueryClient();
+  const queryKey = ['portfolio-history-compact', days, interval];
+
+  return useQuery({
+    queryKey,
+    queryFn: async () => {
+      const today = new Date().toDateString();
+      const previous = queryClient.getQueryData(queryKey);
+      // The window moves each day, so start over rather than trim old points
+      const canUpdate = previous?.fetchedOn === today && previous.dates.length > 0;
+      const since = canUpdate ? previous.dates[previous.dates.length - 1] : null;
+
+      const response = await snapshotsAPI.getHistoryCompact(days, interval, since);
+      const update = decodeCompactHistory(response.data);
+      if (!canUpdate) return { ...update, fetchedOn: today };
+
+      const first = update.dates[0];
+      const cut = first ? previous.dates.findIndex((d) => d >= first) : -1;
+      const keep = cut === -1 ? previous.dates.length : cut;
+      return {
+        dates: previous.dates.slice(0, keep).concat(update.dates),
+        values: previous.values.slice(0, keep).concat(update.values),
+        costs: previous.costs.slice(0, keep).concat(update.costs),
+        fetchedOn: today,
+      };
+    },
+    staleTime: 5 * 60 * 1000, // 5 minutes
+    refetchInterval: 5 * 60 * 1000, // Auto-refetch every 5 minutes
+  });
+};
+
+/**
+ * Hook to fetch portfolio history split by account_type, country, symbol or currency
+ */
+export const usePortfolioHistoryBreakdown = (days = 30, groupBy = 'account_type') => {
+  return useQuery({
+    queryKey: ['portfolio-history-breakdown', days, groupBy],
+    queryFn: async () => {
+      const response = await snapshotsAPI.getHistoryBreakdown(days, groupBy);
+      return response.data;
+    },
+    staleTime: 5 * 60 * 1000, // 5 minutes
+    refetchInterval: 5 * 60 * 1000, // Auto-refetch every 5 minutes
+  });
+};
+
 /**
  * Hook to create a new portfolio snapshot
  */
@@ -33,6 +110,9 @@ export const useCreateSnapshot = () => {
     onSuccess: () => {
       // Invalidate and refetch portfolio history queries
       queryClient.invalidateQueries({ queryKey: ['portfolio-history'] });
+      // Reset rather than invalidate so the next load refetches the whole range
+      queryClient.resetQueries({ queryKey: ['portfolio-history-compact'] });
+      queryClient.invalidateQueries({ queryKey: ['portfolio-history-breakdown'] });
       queryClient.invalidateQueries({ queryKey: ['portfolio-summary'] });
     },
   });
@@ -65,6 +145,8 @@ export const useBackfillSnapshots = () => {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['portfolio-history'] });
+      // Reset rather than invalidate so the next load refetches the whole range
+      queryClient.resetQueries({ queryKey: ['portfolio-history-compact'] });
     },
   });
 };
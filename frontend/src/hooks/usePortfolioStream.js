@@ -0,0 +1,52 @@
+/**
+ * Custom hook for live portfolio updates over Server-Sent Events
+ */
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { streamAPI } from '../services/api';
+
+/**
+ * Subscribe to server-pushed summary and price updates.
+ *
+ * Summary events are written straight into the live summary queries, and
+ * usePortfolioSummary stops polling while the stream is connected. Mount once.
+ */
+export const usePortfolioStream = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(streamAPI.url);
+    let connected = false;
+
+    const setConnected = (value) => {
+      connected = value;
+      queryClient.setQueryData(['stream', 'connected'], value);
+    };
+
+    source.onopen = () => setConnected(true);
+    source.onerror = () => {
+      // EventSource reconnects on its own; poll in the meantime
+      if (connected) {
+        setConnected(false);
+        queryClient.invalidateQueries({ queryKey: ['portfolio', 'summary', 'live'] });
+      }
+    };
+
+    source.addEventListener('summary', (event) => {
+      const { region, summary } = JSON.parse(event.data);
+      queryClient.setQueryData(['portfolio', 'summary', 'live', region], summary);
+    });
+
+    source.addEventListener('prices', (event) => {
+      const ticks = JSON.parse(event.data);
+      queryClient.setQueryData(['stream', 'prices'], (old = {}) => ({ ...old, ...ticks }));
+    });
+
+    return () => {
+      source.close();
+      setConnected(false);
+    };
+  }, [queryClient]);
+};
@@ -1,4 +1,4 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { transactionsAPI } from '../services/api';
 
 export const useTransactions = (filters = {}) => {
@@ -8,6 +8,17 @@ export const useTransactions = (filters = {}) => {
   });
 };
 
+// Keyset-paged transactions; totals for all matching rows come with the first page
+export const useTransactionPages = (filters = {}, limit = 100) => {
+  return useInfiniteQuery({
+    queryKey: ['transactions', 'pages', filters, limit],
+    queryFn: ({ pageParam }) =>
+      transactionsAPI.getPage({ ...filters, limit, cursor: pageParam }).then(res => res.data),
+    initialPageParam: undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+  });
+};
+
 export const useTransactionsByHolding = (holdingId) => {
   return useQuery({
     queryKey: ['transactions', 'holding', holdingId],
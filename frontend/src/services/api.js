@@ -12,6 +12,8 @@ const api = axios.create({
 // Holdings API
 export const holdingsAPI = {
   getAll: (params = {}) => api.get('/holdings/', { params }),
+  // Valued at cached prices in one SQL query; filter/sort by value and gain server-side
+  getEnriched: (params = {}) => api.get('/holdings/enriched', { params }),
   getOne: (id) => api.get(`/holdings/${id}`),
   create: (data) => api.post('/holdings/', data),
   update: (id, data) => api.put(`/holdings/${id}`, data),
@@ -22,6 +24,7 @@ export const holdingsAPI = {
 // Transactions API
 export const transactionsAPI = {
   getAll: (params = {}) => api.get('/transactions/', { params }),
+  getPage: (params = {}) => api.get('/transactions/page', { params }),
   getByHolding: (holdingId) => api.get(`/transactions/holding/${holdingId}`),
   create: (data) => api.post('/transactions/', data),
   delete: (id) => api.delete(`/transactions/${id}`),
@@ -55,6 +58,12 @@ export const snapshotsAPI = {
   getLatest: () => api.get('/snapshots/latest'),
   getByDate: (date) => api.get(`/snapshots/${date}`),
   getHistory: (days = 30) => api.get('/portfolio/history', { params: { days } }),
+  getHistoryCompact: (days = 30, interval = 'daily', since = null) => api.get('/portfolio/history/compact', {
+    params: { days, interval, since }
+  }),
+  getHistoryBreakdown: (days = 30, groupBy = 'account_type') => api.get('/portfolio/history/breakdown', {
+    params: { days, group_by: groupBy }
+  }),
   backfill: (startDate, endDate = null) => api.post('/snapshots/backfill', null, {
     params: { start_date: startDate, end_date: endDate }
   }),
@@ -76,9 +85,14 @@ export const importAPI = {
       headers: { 'Content-Type': 'multipart/form-data' },
     });
   },
-  uploadImport: (file, platform, accountType = null, skipDuplicates = true) => {
+  uploadImport: (file, platform, accountType = null, skipDuplicates = true, previewToken = null) => {
     const formData = new FormData();
-    formData.append('file', file);
+    // A preview token lets the server reuse the batch parsed during preview
+    if (previewToken) {
+      formData.append('preview_token', previewToken);
+    } else {
+      formData.append('file', file);
+    }
     formData.append('platform', platform);
     if (accountType) {
       formData.append('account_type', accountType);
@@ -102,6 +116,11 @@ export const importAPI = {
   },
 };
 
+// Live updates (Server-Sent Events)
+export const streamAPI = {
+  url: `${API_BASE_URL}/stream`,
+};
+
 // Health check
 export const healthCheck = () => api.get('/health');
 
@@ -0,0 +1,172 @@
+"""
+Embedded backend access for the MCP server.
+
+Instead of calling the Vault API over HTTP, tool data is computed in-process
+with the backend's own analytics functions against the backend's SQLite file,
+opened read-only. Results are the same shapes the API returns, with Decimals
+and dates converted to floats and ISO strings as JSON would.
+
+Enabled with VAULT_MODE=embedded. VAULT_BACKEND_PATH points at the backend
+directory (default: ../backend) and VAULT_DB_PATH at the database (default:
+data/portfolio.db inside the backend directory).
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+BACKEND_PATH = Path(os.getenv("VAULT_BACKEND_PATH", Path(__file__).resolve().parent.parent / "backend"))
+DB_PATH = Path(os.getenv("VAULT_DB_PATH", BACKEND_PATH / "data" / "portfolio.db"))
+
+
+class EmbeddedError(Exception):
+    """Raised for endpoints the embedded mode does not serve (like an HTTP 404)."""
+
+
+def _plain(value: Any) -> Any:
+    """Convert a result to JSON-equivalent Python types."""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return _plain(value.model_dump())
+    return value
+
+
+def _flag(params: dict, name: str, default: bool) -> bool:
+    value = params.get(name)
+    if value is None:
+        return default
+    return str(value).lower() in ("1", "true", "yes")
+
+
+class EmbeddedBackend:
+    """Read-only, in-process access to the backend's analytics."""
+
+    def __init__(self, db_path: Path = DB_PATH, backend_path: Path = BACKEND_PATH):
+        self.db_path = Path(db_path).resolve()
+        self.backend_path = Path(backend_path).resolve()
+        self._session_factory = None
+        self._routes: Optional[Dict[str, Callable]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Import the backend and open the database read-only (first call only)."""
+        with self._lock:
+            if self._routes is None:
+                self._routes = self._setup()
+
+    def _setup(self) -> Dict[str, Callable]:
+        if not self.db_path.exists():
+            raise EmbeddedError(f"Database not found: {self.db_path}")
+
+        read_only_url = f"sqlite:///file:{self.db_path}?mode=ro&uri=true"
+        # Any engine the backend creates on import must not be able to write either
+        os.environ["DATABASE_URL"] = read_only_url
+        if str(self.backend_path) not in sys.path:
+            sys.path.insert(0, str(self.backend_path))
+
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.orm import sessionmaker
+        from starlette.requests import Request
+        from starlette.responses import Response
+
+        import app.models  # noqa: F401 (registers all tables)
+        from app.routers import analytics, holdings
+        from app.schemas.holding import HoldingResponse
+
+        engine = create_engine(read_only_url, connect_args={"check_same_thread": False})
+
+        @event.listens_for(engine, "connect")
+        def set_query_only(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def request() -> Request:
+            return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+        def summary(db, params):
+            return analytics.calculate_portfolio_summary(
+                db, fast=_flag(params, "fast", False), region=params.get("region", "all")
+            )
+
+        def holdings_list(db, params):
+            rows = holdings.get_holdings(
+                request(), Response(),
+                skip=int(params.get("skip", 0)),
+                limit=int(params.get("limit", 100)),
+                country=params.get("country"),
+                exchange=params.get("exchange"),
+                account_type=params.get("account_type"),
+                account_id=params.get("account_id"),
+                db=db,
+            )
+            return [HoldingResponse.model_validate(h) for h in rows]
+
+        def holdings_enriched(db, params):
+            return holdings.get_enriched_holdings(
+                request(), Response(),
+                skip=int(params.get("skip", 0)),
+                limit=int(params.get("limit", 100)),
+                country=params.get("country"),
+                exchange=params.get("exchange"),
+                account_type=params.get("account_type"),
+                account_id=params.get("account_id"),
+                min_value_cad=None,
+                max_value_cad=None,
+                min_gain_pct=None,
+                max_gain_pct=None,
+                priced=None,
+                sort_by=params.get("sort_by", "market_value_cad"),
+                order=params.get("order", "desc"),
+                db=db,
+            )
+
+        return {
+            "/analytics/summary": summary,
+            "/analytics/portfolio/summary": summary,
+            "/analytics/allocation": lambda db, params: analytics.get_allocation(
+                request(), Response(), db=db,
+                fast=_flag(params, "fast", False), region=params.get("region", "all"),
+            ),
+            "/analytics/recommendations": lambda db, params: analytics.get_recommendations(
+                db=db, fast=_flag(params, "fast", True)
+            ),
+            "/holdings": holdings_list,
+            "/holdings/": holdings_list,
+            "/holdings/enriched": holdings_enriched,
+        }
+
+    def _call(self, endpoint: str, params: dict) -> Any:
+        """Run one endpoint with its own session (in a worker thread)."""
+        self._load()
+        handler = self._routes.get(endpoint)
+        if handler is None:
+            raise EmbeddedError(f"Not available in embedded mode: {endpoint}")
+        db = self._session_factory()
+        try:
+            result = handler(db, params)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            return _plain(result)
+        finally:
+            db.rollback()
+            db.close()
+
+    async def fetch(self, endpoint: str, params: Optional[dict] = None) -> Any:
+        # Backend analytics block on SQLite, so each call runs in its own thread
+        return await asyncio.to_thread(self._call, endpoint, dict(params or {}))
@@ -7,10 +7,13 @@ Enables AI assistants to provide personalized investment recommendations.
 """
 
 import asyncio
+import copy
+import importlib.util
 import json
 import os
 import sys
-from typing import Any, Optional
+import time
+from typing import Any, Dict, Optional, Tuple
 from decimal import Decimal
 import httpx
 from mcp.server import Server
@@ -19,6 +22,10 @@ from mcp.server.stdio import stdio_server
 
 # Configuration
 VAULT_API_URL = os.getenv("VAULT_API_URL", "http://10.43.27.109:8000/api/v1")
+# Backend responses are reused for this long, so a burst of tool calls costs one valuation
+CACHE_TTL_SECONDS = float(os.getenv("VAULT_CACHE_TTL", "30"))
+# "http" calls VAULT_API_URL; "embedded" runs the backend analytics in-process (see embedded.py)
+VAULT_MODE = os.getenv("VAULT_MODE", "http").lower()
 
 server = Server("vault-portfolio")
 
@@ -30,13 +37,134 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class ApiClient:
+    """
+    One pooled, keep-alive client for every tool call, created on first use.
+
+    Counts requests and newly opened connections so reuse can be checked
+    (logged to stderr on shutdown).
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+        self.limits = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0)
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.connections_opened = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={"request": [self._on_request]},
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: dict) -> None:
+        # Only emitted when no idle pooled connection could be reused
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def stats(self) -> dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": reused,
+            "http2": self.http2,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+api = ApiClient(VAULT_API_URL.rstrip("/") + "/")
+
+
+class ResponseCache:
+    """
+    Short-TTL cache of backend responses, keyed by endpoint and params.
+
+    Concurrent requests for the same key share one in-flight call. Stored
+    values are decoded (or copied) per caller, so handlers can sort or edit
+    results freely. Failed calls are not cached.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple, Tuple[float, bytes]] = {}
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[dict]) -> Tuple:
+        return (endpoint, tuple(sorted((params or {}).items())))
+
+    async def get(self, key: Tuple, fetch, decode=json.loads) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self.hits += 1
+            return decode(entry[1])
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.hits += 1
+            return decode(await asyncio.shield(in_flight))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            body = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        future.set_result(body)
+        if self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+        return decode(body)
+
+
+cache = ResponseCache(CACHE_TTL_SECONDS)
+
+embedded = None
+if VAULT_MODE == "embedded":
+    from embedded import EmbeddedBackend
+    embedded = EmbeddedBackend()
+
+
 async def fetch_api(endpoint: str, params: Optional[dict] = None) -> dict:
-    """Fetch data from Vault API."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        url = f"{VAULT_API_URL}{endpoint}"
-        response = await client.get(url, params=params)
+    """Fetch data from Vault API, or the embedded backend (cached for CACHE_TTL_SECONDS)."""
+    key = ResponseCache.key(endpoint, params)
+    if embedded is not None:
+        return await cache.get(key, lambda: embedded.fetch(endpoint, params), decode=copy.deepcopy)
+
+    async def fetch() -> bytes:
+        response = await api.client.get(endpoint.lstrip("/"), params=params)
         response.raise_for_status()
-        return response.json()
+        return response.content
+
+    return await cache.get(key, fetch)
 
 
 @server.list_tools()
@@ -245,36 +373,28 @@ async def handle_portfolio_summary() -> list[TextContent]:
 
 
 async def handle_holdings(arguments: dict) -> list[TextContent]:
-    """Get holdings list."""
-    params = {"fast": "true"}
+    """Get holdings list (valued, filtered and sorted by the backend)."""
+    # Day change needs live prices; the enriched list is valued at cached prices
+    sort_columns = {"gain_pct": "unrealized_gain_pct"}
+    params = {
+        "sort_by": sort_columns.get(arguments.get("sort_by", "value"), "market_value_cad"),
+        "order": "desc",
+        "limit": arguments.get("limit", 20),
+    }
     if arguments.get("account_type"):
         params["account_type"] = arguments["account_type"]
     
-    data = await fetch_api("/holdings", params)
-    
-    holdings = data if isinstance(data, list) else data.get('holdings', [])
-    
-    # Sort if specified
-    sort_by = arguments.get("sort_by", "value")
-    if sort_by == "value":
-        holdings.sort(key=lambda x: x.get('current_value', 0) or 0, reverse=True)
-    elif sort_by == "gain_pct":
-        holdings.sort(key=lambda x: x.get('gain_pct', 0) or 0, reverse=True)
-    elif sort_by == "day_change":
-        holdings.sort(key=lambda x: abs(x.get('day_change_pct', 0) or 0), reverse=True)
-    
-    # Limit
-    limit = arguments.get("limit", 20)
-    holdings = holdings[:limit]
+    holdings = await fetch_api("/holdings/enriched", params)
     
     result = "## Holdings\n\n"
-    result += "| Symbol | Company | Qty | Avg Cost | Price | Value | Gain % | Account |\n"
-    result += "|--------|---------|-----|----------|-------|-------|--------|----------|\n"
+    result += "| Symbol | Company | Qty | Avg Cost | Price | Value (CAD) | Gain % | Account |\n"
+    result += "|--------|---------|-----|----------|-------|-------------|--------|----------|\n"
     
     for h in holdings:
-        gain_pct = h.get('gain_pct', 0) or 0
+        gain_pct = float(h.get('unrealized_gain_pct') or 0)
         gain_indicator = "🟢" if gain_pct > 0 else "🔴" if gain_pct < 0 else "⚪"
-        result += f"| {h.get('symbol', '')} | {h.get('company_name', '')[:20]} | {h.get('quantity', 0)} | ${h.get('average_cost', 0):.2f} | ${h.get('current_price', 0):.2f} | ${h.get('current_value', 0):,.0f} | {gain_indicator} {gain_pct:+.1f}% | {h.get('account_type', '')} |\n"
+        price = f"${float(h['current_price']):.2f}" if h.get('current_price') is not None else "n/a"
+        result += f"| {h.get('symbol', '')} | {(h.get('company_name') or '')[:20]} | {h.get('quantity', 0)} | ${float(h.get('avg_purchase_price') or 0):.2f} | {price} | ${float(h.get('market_value_cad') or 0):,.0f} | {gain_indicator} {gain_pct:+.1f}% | {h.get('account_type') or ''} |\n"
     
     return [TextContent(type="text", text=result)]
 
@@ -340,8 +460,10 @@ async def handle_suggest_investment(arguments: dict) -> list[TextContent]:
     risk_tolerance = arguments.get("risk_tolerance", "moderate")
     
     # Get current allocation to identify underweight areas
-    allocation_data = await fetch_api("/analytics/allocation", {"fast": "true", "group_by": "sector"})
-    holdings_data = await fetch_api("/holdings", {"fast": "true"})
+    allocation_data, holdings_data = await asyncio.gather(
+        fetch_api("/analytics/allocation", {"fast": "true", "group_by": "sector"}),
+        fetch_api("/holdings", {"fast": "true"}),
+    )
     
     holdings = holdings_data if isinstance(holdings_data, list) else holdings_data.get('holdings', [])
     
@@ -438,10 +560,11 @@ Based on your current portfolio and {risk_tolerance} risk tolerance, here's how
 
 async def handle_account_balances() -> list[TextContent]:
     """Get account balances and contribution room."""
-    data = await fetch_api("/analytics/summary", {"fast": "true"})
-    
-    # Get holdings grouped by account
-    holdings_data = await fetch_api("/holdings", {"fast": "true"})
+    # Summary and holdings (grouped by account below)
+    data, holdings_data = await asyncio.gather(
+        fetch_api("/analytics/summary", {"fast": "true"}),
+        fetch_api("/holdings", {"fast": "true"}),
+    )
     holdings = holdings_data if isinstance(holdings_data, list) else holdings_data.get('holdings', [])
     
     # Calculate per-account totals
@@ -511,14 +634,18 @@ async def handle_performance(arguments: dict) -> list[TextContent]:
     """Get portfolio performance."""
     period = arguments.get("period", "1m")
     
-    # Try to get performance data from snapshots
-    try:
-        data = await fetch_api("/snapshots/performance", {"period": period})
-    except:
+    # Snapshot performance (optional), current summary and holdings, fetched together
+    data, summary, holdings_data = await asyncio.gather(
+        fetch_api("/snapshots/performance", {"period": period}),
+        fetch_api("/analytics/summary", {"fast": "true"}),
+        fetch_api("/holdings", {"fast": "true"}),
+        return_exceptions=True,
+    )
+    if isinstance(data, Exception):
         data = {}
-    
-    # Get current summary for basic stats
-    summary = await fetch_api("/analytics/summary", {"fast": "true"})
+    for response in (summary, holdings_data):
+        if isinstance(response, Exception):
+            raise response
     
     result = f"""## Portfolio Performance
 
@@ -530,8 +657,7 @@ async def handle_performance(arguments: dict) -> list[TextContent]:
 ### Top Performers (by gain %)
 """
     
-    # Get holdings to show top/bottom performers
-    holdings_data = await fetch_api("/holdings", {"fast": "true"})
+    # Holdings to show top/bottom performers
     holdings = holdings_data if isinstance(holdings_data, list) else holdings_data.get('holdings', [])
     
     # Sort by gain %
@@ -552,8 +678,13 @@ async def handle_performance(arguments: dict) -> list[TextContent]:
 
 async def main():
     """Run the MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        stats = {**api.stats(), "cache_hits": cache.hits, "cache_misses": cache.misses}
+        print(f"Vault API client: {json.dumps(stats)}", file=sys.stderr)
+        await api.aclose()
 
 
 if __name__ == "__main__":